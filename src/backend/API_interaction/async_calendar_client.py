@@ -0,0 +1,177 @@
+"""
+Async Google Calendar REST client
+googleapiclient is built on httplib2, so every .execute() blocks the event loop for a full
+round-trip. This client talks to the same REST endpoints through one pooled httpx.AsyncClient
+(keep-alive, and HTTP/2 when the h2 package is installed), so a single worker can have many
+calendar requests in flight at once.
+"""
+import importlib.util
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import quote
+
+import httpx
+from google.oauth2.credentials import Credentials
+
+from event_generation.config.settings import get_settings
+from event_generation.monitoring import annotate, counter, stage
+
+logger = logging.getLogger("google_calendar_api")
+
+DEFAULT_ROOT_URL = "https://www.googleapis.com/"
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+GOOGLE_API_ERRORS = counter(
+    "calendarize_google_api_errors_total",
+    "Calendar API error responses",
+    ("status",),
+)
+
+
+class CalendarApiError(Exception):
+    """Error response from the Calendar API"""
+
+    def __init__(self, status_code: int, message: str, reason: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.reason = reason
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "CalendarApiError":
+        message, reason = response.reason_phrase or "Calendar API error", None
+        try:
+            error = response.json().get("error", {})
+            message = error.get("message", message)
+            reason = (error.get("errors") or [{}])[0].get("reason")
+        except (ValueError, AttributeError):
+            pass
+        return cls(response.status_code, f"<HttpError {response.status_code}: {message}>", reason)
+
+
+class AsyncCalendarClient:
+    """Calendar v3 client sharing one connection pool between all users"""
+
+    def __init__(
+        self,
+        root_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        # the pool limits are fixed for the client's lifetime; the root URL and timeout follow
+        # the settings on every request unless given here
+        settings = get_settings()
+        self._root_url = root_url
+        self._timeout = timeout
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+            limits=httpx.Limits(
+                max_connections=max_connections or settings.google_max_connections,
+                max_keepalive_connections=settings.google_max_keepalive_connections,
+            ),
+            transport=transport,
+        )
+
+    def _url(self, path: str) -> str:
+        root_url = self._root_url or get_settings().google_api_root_url or DEFAULT_ROOT_URL
+        return f"{root_url.rstrip('/')}/calendar/v3{path}"
+
+    async def _request(self, credentials: Credentials, method: str, path: str, **kwargs) -> Optional[Dict[str, Any]]:
+        headers = {"Authorization": f"Bearer {credentials.token}"}
+        timeout = self._timeout if self._timeout is not None else get_settings().google_http_timeout
+        with stage("google_api"):
+            annotate(**{"http.method": method})
+            response = await self._client.request(method, self._url(path), headers=headers, timeout=timeout, **kwargs)
+            annotate(**{"http.status_code": response.status_code})
+        if response.status_code >= 400:
+            GOOGLE_API_ERRORS.labels(status=response.status_code).inc()
+            raise CalendarApiError.from_response(response)
+        if response.status_code == 204 or not response.content:
+            return None
+        return response.json()
+
+    async def insert_event(self, credentials: Credentials, event: Dict[str, Any], calendar_id: str = 'primary') -> Dict[str, Any]:
+        """Insert an event and return the created resource"""
+        return await self._request(credentials, "POST", f"/calendars/{quote(calendar_id)}/events", json=event)
+
+    async def get_event(self, credentials: Credentials, event_id: str, calendar_id: str = 'primary') -> Dict[str, Any]:
+        """Get an event, deleted events are returned with status 'cancelled'"""
+        return await self._request(credentials, "GET", f"/calendars/{quote(calendar_id)}/events/{quote(event_id)}")
+
+    async def update_event(
+        self, credentials: Credentials, event_id: str, event: Dict[str, Any], calendar_id: str = 'primary'
+    ) -> Dict[str, Any]:
+        """Replace an event and return the updated resource"""
+        return await self._request(
+            credentials, "PUT", f"/calendars/{quote(calendar_id)}/events/{quote(event_id)}", json=event
+        )
+
+    async def delete_event(self, credentials: Credentials, event_id: str, calendar_id: str = 'primary'):
+        """Delete an event"""
+        await self._request(credentials, "DELETE", f"/calendars/{quote(calendar_id)}/events/{quote(event_id)}")
+
+    async def list_events(self, credentials: Credentials, calendar_id: str = 'primary', **params) -> Dict[str, Any]:
+        """
+        List events, one page at a time
+
+        Args:
+            credentials: Valid Google OAuth credentials
+            calendar_id: Calendar to list
+            **params: Query parameters, e.g. timeMin, timeMax, pageToken, syncToken, singleEvents
+
+        Returns:
+            The events list resource (items, nextPageToken / nextSyncToken)
+        """
+        params = {key: _query_value(value) for key, value in params.items() if value is not None}
+        return await self._request(credentials, "GET", f"/calendars/{quote(calendar_id)}/events", params=params)
+
+    async def freebusy(
+        self,
+        credentials: Credentials,
+        time_min: datetime,
+        time_max: datetime,
+        calendar_ids: Iterable[str] = ('primary',),
+    ) -> Dict[str, Any]:
+        """Query busy intervals of the given calendars between time_min and time_max"""
+        body = {
+            "timeMin": _query_value(time_min),
+            "timeMax": _query_value(time_max),
+            "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+        }
+        return await self._request(credentials, "POST", "/freeBusy", json=body)
+
+    async def warm_up(self):
+        """Open a pooled connection (DNS, TCP and TLS) before the first real request needs it"""
+        # any response will do, the connection stays in the keep-alive pool
+        await self._client.head(self._url("/"))
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+def _query_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat() if value.tzinfo else value.isoformat() + "Z"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+_client: Optional[AsyncCalendarClient] = None
+
+
+def get_async_client() -> AsyncCalendarClient:
+    """Shared client, created on first use"""
+    global _client
+    if _client is None:
+        _client = AsyncCalendarClient()
+    return _client
+
+
+async def close_async_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
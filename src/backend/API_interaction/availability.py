@@ -0,0 +1,188 @@
+"""
+Free/busy conflict detection
+A batch of candidate events is checked with a single freebusy query covering its whole time
+span. Busy intervals are cached per user and window for a short time and indexed in an
+interval tree, so checking hundreds of candidates is one API call plus in-memory lookups.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from event_generation.config.settings import get_settings
+from event_generation.event.recurrence import get_occurrences
+
+Interval = Tuple[datetime, datetime]
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over half-open [start, end) intervals
+
+    Built once from the busy list; overlaps() runs in O(log n + k) for k matches.
+    """
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals: Sequence[Interval]):
+        self.left = self.right = None
+        self.by_start: List[Interval] = []
+        self.by_end: List[Interval] = []
+        self.center = None
+        # empty intervals never overlap anything
+        intervals = [interval for interval in intervals if interval[0] < interval[1]]
+        if not intervals:
+            return
+
+        # the median start always lands in this node, so every subtree is strictly smaller
+        starts = sorted(interval[0] for interval in intervals)
+        self.center = starts[len(starts) // 2]
+
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] <= self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        self.by_start = sorted(here, key=lambda interval: interval[0])
+        self.by_end = sorted(here, key=lambda interval: interval[1], reverse=True)
+        if left:
+            self.left = IntervalTree(left)
+        if right:
+            self.right = IntervalTree(right)
+
+    def overlaps(self, start: datetime, end: datetime) -> List[Interval]:
+        """Every stored interval that overlaps [start, end)"""
+        found = []
+        node = self
+        while node is not None and node.center is not None:
+            if end <= node.center:
+                # query lies left of center: intervals here overlap iff they start before end
+                for interval in node.by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval)
+                node = node.left
+            elif start > node.center:
+                # query lies right of center: intervals here overlap iff they end after start
+                for interval in node.by_end:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval)
+                node = node.right
+            else:
+                # query contains the center, so does every interval here
+                found.extend(node.by_start)
+                if node.left is not None:
+                    found.extend(node.left.overlaps(start, end))
+                node = node.right
+        return found
+
+
+class BusyCache:
+    """Busy intervals per user and time window, kept for ttl seconds"""
+
+    def __init__(self, ttl: Optional[float] = None, max_size: Optional[int] = None):
+        # the size is fixed for the cache's lifetime, the ttl follows the settings unless given
+        self._ttl = ttl
+        self.max_size = max_size or get_settings().busy_cache_size
+        self._entries: Dict[Tuple[str, datetime, datetime], Tuple[float, IntervalTree]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self) -> float:
+        """Seconds a window stays fresh"""
+        return self._ttl if self._ttl is not None else get_settings().busy_cache_ttl
+
+    def get(self, user_key: str, time_min: datetime, time_max: datetime) -> Optional[IntervalTree]:
+        """Cached busy intervals of any fresh window for this user that covers [time_min, time_max)"""
+        now = time.monotonic()
+        ttl = self.ttl
+        with self._lock:
+            for (key_user, key_min, key_max), (stored, tree) in list(self._entries.items()):
+                if now - stored > ttl:
+                    del self._entries[(key_user, key_min, key_max)]
+                elif key_user == user_key and key_min <= time_min and key_max >= time_max:
+                    self.hits += 1
+                    return tree
+            self.misses += 1
+            return None
+
+    def put(self, user_key: str, time_min: datetime, time_max: datetime, tree: IntervalTree):
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                oldest = min(self._entries, key=lambda key: self._entries[key][0])
+                del self._entries[oldest]
+            self._entries[(user_key, time_min, time_max)] = (time.monotonic(), tree)
+
+    def invalidate(self, user_key: str):
+        """Forget a user's windows, e.g. after events were added to their calendar"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_key]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def to_utc(value: datetime, time_zone: str) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=ZoneInfo(time_zone))
+    return value.astimezone(timezone.utc)
+
+
+def parse_rfc3339(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+def candidate_intervals(event) -> List[Interval]:
+    """UTC intervals an event occupies, recurring events are expanded over CONFLICT_HORIZON_DAYS"""
+    settings = get_settings()
+    occurrences, _ = get_occurrences(
+        event,
+        event.start_time,
+        event.start_time + timedelta(days=settings.conflict_horizon_days),
+        settings.conflict_max_occurrences,
+    )
+    return [(to_utc(start, event.time_zone), to_utc(end, event.time_zone)) for start, end in occurrences]
+
+
+def busy_tree_from_freebusy(response: Dict[str, Any], calendar_ids: Sequence[str] = ('primary',)) -> IntervalTree:
+    busy = [
+        (parse_rfc3339(interval["start"]), parse_rfc3339(interval["end"]))
+        for calendar_id in calendar_ids
+        for interval in response.get("calendars", {}).get(calendar_id, {}).get("busy", [])
+    ]
+    return IntervalTree(busy)
+
+
+def find_conflicts(events: Sequence, candidates: Sequence[List[Interval]], busy: IntervalTree) -> List[Dict[str, Any]]:
+    """
+    Check every candidate event against the busy intervals
+
+    Args:
+        events: The candidate Event objects
+        candidates: candidate_intervals() of each event
+        busy: Busy intervals of the user's calendar
+
+    Returns:
+        One entry per conflicting event with the busy intervals it overlaps
+    """
+    conflicts = []
+    for index, (event, intervals) in enumerate(zip(events, candidates)):
+        overlapping = set()
+        for start, end in intervals:
+            overlapping.update(busy.overlaps(start, end))
+        if overlapping:
+            conflicts.append({
+                "index": index,
+                "title": event.title,
+                "busy": [{"start": start, "end": end} for start, end in sorted(overlapping)],
+            })
+    return conflicts
@@ -0,0 +1,199 @@
+"""
+Cached Google Calendar service objects
+build('calendar', 'v3', ...) re-reads and parses the discovery document and creates a new
+HTTP stack on every call. Here the discovery document is parsed once, and each user keeps
+an authorized HTTP transport (with its keep-alive connections) in a small LRU cache.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+from event_generation.config.settings import get_settings
+
+logger = logging.getLogger("google_calendar_api")
+
+
+@lru_cache(maxsize=4)
+def get_discovery_document(root_url: Optional[str] = None) -> dict:
+    """Load and parse the Calendar v3 discovery document bundled with googleapiclient, once"""
+    document = discovery_cache.get_static_doc('calendar', 'v3')
+    if document is None:
+        raise RuntimeError("Static discovery document for calendar v3 not found")
+    document = json.loads(document)
+    if root_url:
+        # rootUrl is used for both regular requests and the batch endpoint
+        document["rootUrl"] = root_url.rstrip("/") + "/"
+    return document
+
+
+def credential_key(credentials: Credentials) -> str:
+    """
+    Stable cache key for a user's credentials
+
+    The refresh token stays the same across access token refreshes, so it identifies
+    the user; the access token is only used when there is no refresh token.
+    """
+    secret = credentials.refresh_token or credentials.token or ""
+    return hashlib.sha256(secret.encode("utf-8")).hexdigest()
+
+
+def account_key(credentials: Credentials) -> str:
+    """
+    Stable key for the Google account behind the credentials
+
+    Login stores the account's OpenID subject in `credentials.account`, which stays the same
+    across token refreshes and the new refresh token every consent issues. Sessions created
+    before it was stored fall back to credential_key.
+    """
+    if not credentials.account:
+        return credential_key(credentials)
+    return hashlib.sha256(f"account:{credentials.account}".encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    def __init__(self, service, authorized_http: AuthorizedHttp):
+        self.service = service
+        self.authorized_http = authorized_http
+        self.last_used = time.monotonic()
+        # httplib2 connections are not thread-safe, so one worker thread uses them at a time
+        self.in_use = threading.Lock()
+
+
+class CalendarServiceCache:
+    """LRU cache of Calendar service objects keyed by user, with idle expiry"""
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        root_url: Optional[str] = None,
+    ):
+        # the size is fixed for the cache's lifetime; ttl and root_url follow the settings unless given
+        self.max_size = max_size or get_settings().service_cache_size
+        self._ttl = ttl
+        self._root_url = root_url
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl(self) -> float:
+        """Seconds a service may sit unused"""
+        return self._ttl if self._ttl is not None else get_settings().service_cache_ttl
+
+    @property
+    def root_url(self) -> Optional[str]:
+        """Override for https://www.googleapis.com/, e.g. a local fake Calendar server"""
+        return self._root_url or get_settings().google_api_root_url
+
+    def get(self, credentials: Credentials):
+        """
+        Get the Calendar service for these credentials, building it on a miss
+
+        Args:
+            credentials: Valid Google OAuth credentials
+
+        Returns:
+            Google Calendar API service
+        """
+        return self._entry(credentials).service
+
+    @contextmanager
+    def lease(self, credentials: Credentials):
+        """
+        Hold the user's cached service and transport for exclusive use, e.g. from a worker thread
+
+        Requests for the same user wait for each other; other users are not affected.
+
+        Args:
+            credentials: Valid Google OAuth credentials
+
+        Yields:
+            (service, authorized_http)
+        """
+        entry = self._entry(credentials)
+        with entry.in_use:
+            yield entry.service, entry.authorized_http
+
+    def _entry(self, credentials: Credentials) -> _Entry:
+        key = credential_key(credentials)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.last_used > self.ttl:
+                self._close(self._entries.pop(key))
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                entry = self._build(credentials)
+                self._entries[key] = entry
+                while len(self._entries) > self.max_size:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._close(evicted)
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                # the cookie may carry a refreshed access token, so always use the newest credentials
+                entry.authorized_http.credentials = credentials
+
+            entry.last_used = now
+            return entry
+
+    def invalidate(self, credentials: Credentials):
+        with self._lock:
+            entry = self._entries.pop(credential_key(credentials), None)
+            if entry is not None:
+                self._close(entry)
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                self._close(entry)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _build(self, credentials: Credentials) -> _Entry:
+        authorized_http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=get_settings().google_http_timeout))
+        service = build_from_document(get_discovery_document(self.root_url), http=authorized_http)
+        return _Entry(service, authorized_http)
+
+    @staticmethod
+    def _close(entry: _Entry):
+        # an entry evicted while leased keeps its connections until it is garbage collected
+        if not entry.in_use.acquire(blocking=False):
+            return
+        try:
+            entry.authorized_http.http.close()
+        except Exception as e:
+            logger.warning(f"Error closing calendar HTTP connections: {str(e)}")
+        finally:
+            entry.in_use.release()
+
+
+service_cache = CalendarServiceCache()
+
+
+def get_calendar_service(credentials: Credentials, cache: Optional[CalendarServiceCache] = None):
+    """Get a cached Calendar service for the user's credentials"""
+    return (cache or service_cache).get(credentials)
+
+
+def lease_calendar_service(credentials: Credentials, cache: Optional[CalendarServiceCache] = None):
+    """Hold the user's cached Calendar service and transport, see CalendarServiceCache.lease"""
+    return (cache or service_cache).lease(credentials)
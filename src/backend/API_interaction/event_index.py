@@ -0,0 +1,286 @@
+"""
+Local index of each user's upcoming calendar events
+Checking parsed events for duplicates used to mean listing the whole calendar. Here every
+user's events from SYNC_LOOKBACK_DAYS ago onwards are mirrored in SQLite: the first sync lists
+them once, later syncs pass the stored syncToken to events.list and only receive what
+changed since. When Google answers 410 Gone the token has expired and the user is fully
+resynced. Duplicate checks are then plain index lookups.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from google.oauth2.credentials import Credentials
+
+from API_interaction.async_calendar_client import CalendarApiError, get_async_client
+from API_interaction.availability import to_utc
+from API_interaction.calendar_service import account_key
+from event_generation.config.settings import get_settings
+
+logger = logging.getLogger("google_calendar_api")
+
+DEFAULT_EVENT_INDEX_PATH = os.path.join(os.path.dirname(__file__), 'events.db')
+SYNC_PAGE_SIZE = 2500  # events.list maximum
+
+# (normalized title, start, end) - start/end are UTC ISO strings, or dates for all-day events
+EventKey = Tuple[str, str, str]
+
+
+def title_key(title: Optional[str]) -> str:
+    return " ".join((title or "").split()).casefold()
+
+
+def _time_key(value: datetime, time_zone: str) -> str:
+    return to_utc(value, time_zone).replace(tzinfo=None).isoformat(timespec='seconds')
+
+
+def event_key(event) -> EventKey:
+    """Index key of a parsed Event, recurring events are matched on their first occurrence"""
+    if event.is_all_day:
+        return title_key(event.title), event.start_time.date().isoformat(), event.end_time.date().isoformat()
+    return (
+        title_key(event.title),
+        _time_key(event.start_time, event.time_zone),
+        _time_key(event.end_time, event.time_zone),
+    )
+
+
+def _google_time_key(value: Dict[str, Any], default_tz: str) -> str:
+    if "date" in value:
+        return date.fromisoformat(value["date"]).isoformat()
+    parsed = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+    return _time_key(parsed, value.get("timeZone") or default_tz)
+
+
+def google_event_key(item: Dict[str, Any], default_tz: str = "UTC") -> EventKey:
+    """Index key of an event resource returned by the Calendar API"""
+    return (
+        title_key(item.get("summary")),
+        _google_time_key(item["start"], default_tz),
+        _google_time_key(item["end"], default_tz),
+    )
+
+
+class EventIndex:
+    """SQLite table of (user, event id) -> event key, plus each user's sync token"""
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or get_settings().event_index_path or DEFAULT_EVENT_INDEX_PATH
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " user_key TEXT NOT NULL, event_id TEXT NOT NULL,"
+            " title TEXT NOT NULL, start TEXT NOT NULL, end TEXT NOT NULL,"
+            " PRIMARY KEY (user_key, event_id));"
+            "CREATE INDEX IF NOT EXISTS events_by_key ON events (user_key, title, start, end);"
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " user_key TEXT PRIMARY KEY, sync_token TEXT, synced REAL NOT NULL, stale INTEGER NOT NULL DEFAULT 0);"
+        )
+
+    def sync_state(self, user_key: str) -> Tuple[Optional[str], Optional[float], bool]:
+        """(sync token, time of the last sync, whether the user changed their calendar since)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sync_token, synced, stale FROM sync_state WHERE user_key = ?", (user_key,)
+            ).fetchone()
+        return (row[0], row[1], bool(row[2])) if row else (None, None, True)
+
+    def apply(self, user_key: str, items: Iterable[Dict[str, Any]], sync_token: Optional[str], full: bool = False,
+              default_tz: str = "UTC") -> int:
+        """
+        Store the events.list results of a sync in one transaction
+
+        Args:
+            user_key: See calendar_service.account_key
+            items: Event resources; cancelled ones are removed from the index
+            sync_token: nextSyncToken of the last page
+            full: Replace everything indexed for the user (full sync)
+            default_tz: Time zone for dateTimes without an offset
+
+        Returns:
+            Number of events stored or removed
+        """
+        upserts, deletes = [], []
+        for item in items:
+            if item.get("status") == "cancelled":
+                deletes.append((user_key, item["id"]))
+                continue
+            try:
+                upserts.append((user_key, item["id"], *google_event_key(item, default_tz)))
+            except (KeyError, ValueError) as e:
+                logger.warning(f"Skipping event {item.get('id')} in sync: {str(e)}")
+
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if full:
+                    self._db.execute("DELETE FROM events WHERE user_key = ?", (user_key,))
+                self._db.executemany("DELETE FROM events WHERE user_key = ? AND event_id = ?", deletes)
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO events (user_key, event_id, title, start, end) VALUES (?, ?, ?, ?, ?)",
+                    upserts,
+                )
+                if sync_token is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO sync_state (user_key, sync_token, synced, stale) VALUES (?, ?, ?, 0)",
+                        (user_key, sync_token, time.time()),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(upserts) + len(deletes)
+
+    def find(self, user_key: str, keys: Sequence[EventKey]) -> Dict[EventKey, str]:
+        """Indexed event id for each key that is already in the user's calendar"""
+        found = {}
+        with self._lock:
+            for key in set(keys):
+                row = self._db.execute(
+                    "SELECT event_id FROM events WHERE user_key = ? AND title = ? AND start = ? AND end = ? LIMIT 1",
+                    (user_key, *key),
+                ).fetchone()
+                if row:
+                    found[key] = row[0]
+        return found
+
+    def prune(self, before: datetime):
+        """Drop events that ended before `before` (UTC)"""
+        cutoff = before.astimezone(timezone.utc).replace(tzinfo=None).isoformat(timespec='seconds')
+        with self._lock:
+            self._db.execute("DELETE FROM events WHERE end < ?", (cutoff,))
+
+    def mark_stale(self, user_key: str):
+        """The user's calendar changed through us, sync again on the next check"""
+        with self._lock:
+            self._db.execute("UPDATE sync_state SET stale = 1 WHERE user_key = ?", (user_key,))
+
+    def clear(self, user_key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM events WHERE user_key = ?", (user_key,))
+            self._db.execute("DELETE FROM sync_state WHERE user_key = ?", (user_key,))
+
+    def count(self, user_key: str) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM events WHERE user_key = ?", (user_key,)).fetchone()[0]
+
+
+class CalendarSync:
+    """Keeps the EventIndex up to date with incremental events.list syncs"""
+
+    def __init__(
+        self,
+        index: EventIndex,
+        client=None,
+        min_interval: Optional[float] = None,
+        lookback: Optional[timedelta] = None,
+        default_tz: Optional[str] = None,
+    ):
+        # unset values follow the settings (SYNC_MIN_INTERVAL, SYNC_LOOKBACK_DAYS, TIMEZONE)
+        self.index = index
+        self.client = client
+        self._min_interval = min_interval
+        self._lookback = lookback
+        self._default_tz = default_tz
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @property
+    def min_interval(self) -> float:
+        """Seconds before an unchanged user is synced again"""
+        return self._min_interval if self._min_interval is not None else get_settings().sync_min_interval
+
+    @property
+    def lookback(self) -> timedelta:
+        """Events that ended more than this long ago are not indexed"""
+        return self._lookback if self._lookback is not None else timedelta(days=get_settings().sync_lookback_days)
+
+    @property
+    def default_tz(self) -> str:
+        """Time zone for dateTimes without an offset"""
+        return self._default_tz or get_settings().timezone
+
+    async def sync(self, credentials: Credentials, force: bool = False) -> str:
+        """
+        Bring a user's index up to date
+
+        Args:
+            credentials: Valid Google OAuth credentials
+            force: Sync even if the user was synced less than min_interval ago
+
+        Returns:
+            "skipped", "incremental" or "full"
+        """
+        user_key = account_key(credentials)
+        lock = self._locks.setdefault(user_key, asyncio.Lock())
+        async with lock:
+            # SQLite calls block, so the index is only used from worker threads
+            sync_token, synced, stale = await asyncio.to_thread(self.index.sync_state, user_key)
+            if not force and not stale and synced is not None and time.time() - synced < self.min_interval:
+                return "skipped"
+
+            if sync_token:
+                try:
+                    await self._pull(credentials, user_key, sync_token=sync_token)
+                    return "incremental"
+                except CalendarApiError as e:
+                    if e.status_code != 410:
+                        raise
+                    logger.info("Sync token expired, running a full sync")
+
+            await self._pull(credentials, user_key)
+            return "full"
+
+    async def _pull(self, credentials: Credentials, user_key: str, sync_token: Optional[str] = None):
+        client = self.client or get_async_client()
+        params = {"maxResults": SYNC_PAGE_SIZE}
+        if sync_token:
+            params["syncToken"] = sync_token
+        else:
+            params["timeMin"] = datetime.now(timezone.utc) - self.lookback
+
+        # a full sync replaces the index only once every page has arrived
+        pages, page_token = [], None
+        while True:
+            page = await client.list_events(credentials, pageToken=page_token, **params)
+            pages.append(page.get("items", []))
+            page_token = page.get("nextPageToken")
+            if not page_token:
+                break
+
+        items = [item for page_items in pages for item in page_items]
+        changed = await asyncio.to_thread(self._store, user_key, items, page.get("nextSyncToken"), sync_token is None)
+        logger.info(f"{'Incremental' if sync_token else 'Full'} sync: {changed} events")
+
+    def _store(self, user_key: str, items: List[Dict[str, Any]], sync_token: Optional[str], full: bool) -> int:
+        changed = self.index.apply(user_key, items, sync_token, full=full, default_tz=self.default_tz)
+        self.index.prune(datetime.now(timezone.utc) - self.lookback)
+        return changed
+
+    async def find_duplicates(self, credentials: Credentials, events: Sequence) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Find parsed events that are already in the user's calendar
+
+        Args:
+            credentials: Valid Google OAuth credentials
+            events: Event objects to check
+
+        Returns:
+            One entry per duplicate with the id of the existing event, and the sync mode used
+        """
+        mode = await self.sync(credentials)
+        keys = [event_key(event) for event in events]
+        found = await asyncio.to_thread(self.index.find, account_key(credentials), keys)
+        duplicates = [
+            {"index": index, "title": event.title, "eventId": found[key]}
+            for index, (event, key) in enumerate(zip(events, keys))
+            if key in found
+        ]
+        return duplicates, mode
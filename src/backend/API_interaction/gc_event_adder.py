@@ -1,55 +1,95 @@
 """
 Google Calendar Integration API
 Provides endpoints for authenticating with Google and managing calendar events.
+The endpoints live on `router`; main.py mounts it under /calendar, and `app` serves it
+on its own (port 8004) for local development.
 """
+import asyncio
+import base64
+import hashlib
 import json
 import os
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Tuple, Union
 
-from fastapi import FastAPI, Response, Request, HTTPException, Depends, status
+from fastapi import APIRouter, FastAPI, Response, Request, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse, HTMLResponse
-from pydantic import BaseModel, validator
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request as GoogleRequest
+from pydantic import BaseModel, Field, validator
+from google.auth import jwt
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-
-<<<<<<< HEAD
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+
+from API_interaction.async_calendar_client import CalendarApiError, close_async_client, get_async_client
+from API_interaction.calendar_service import account_key, get_calendar_service, lease_calendar_service, service_cache
+from API_interaction.session_store import SESSION_COOKIE, CredentialSessionStore, create_session_store
+from API_interaction.availability import BusyCache, busy_tree_from_freebusy, candidate_intervals, find_conflicts
+from API_interaction.event_index import CalendarSync, EventIndex
+from event_generation.config.settings import get_settings, install_reload_handler
+from event_generation.event.event import Event
+from event_generation.monitoring.logs import configure_logging, log_payload
+
+# Logging goes through the background writer set up in calendar_lifespan, see event_generation/monitoring/logs.py
 logger = logging.getLogger("google_calendar_api")
 
-# Environment Configuration
-ENV = os.getenv("ENV", "development")
+# Environment Configuration, the rest is read from event_generation/config/settings.py when used
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", "8004"))
-FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
-CALLBACK_URL = os.getenv("CALLBACK_URL", "http://localhost:8004/callback")
-TIMEZONE = os.getenv("TIMEZONE", "America/Los_Angeles")
-DEBUG = ENV == "development"
 
 # Constants
-SCOPES = ['https://www.googleapis.com/auth/calendar.events']
+# openid adds an id_token whose subject identifies the account (see with_account_id),
+# userinfo.email adds the address /check-auth reports
+SCOPES = [
+    'openid',
+    'https://www.googleapis.com/auth/userinfo.email',
+    'https://www.googleapis.com/auth/calendar.events',
+]
 CLIENT_SECRET_PATH = os.path.join(os.path.dirname(__file__), 'client_secret.json')
+LEGACY_TOKEN_COOKIE = 'google_auth_token'
+MAX_BATCH_SIZE = 50  # Calendar API limit on requests per batch
+
+# Server-side OAuth sessions, see session_store.py; created on first use, not at import
+_session_store: Optional[CredentialSessionStore] = None
+# Short-lived busy intervals for /conflicts, see availability.py
+busy_cache = BusyCache()
+# Local mirror of users' upcoming events for /duplicates, see event_index.py; the SQLite
+# file is opened on first use, so importing this module creates nothing on disk
+_event_index: Optional[EventIndex] = None
+_calendar_sync: Optional[CalendarSync] = None
+
+
+def get_session_store() -> CredentialSessionStore:
+    """Shared session store, created on first use"""
+    global _session_store
+    if _session_store is None:
+        _session_store = create_session_store(SCOPES)
+    return _session_store
+
+
+def get_event_index() -> EventIndex:
+    """Shared event index, opened on first use"""
+    global _event_index
+    if _event_index is None:
+        _event_index = EventIndex()
+    return _event_index
+
+
+def get_calendar_sync() -> CalendarSync:
+    """Shared syncer of the event index, created on first use"""
+    global _calendar_sync
+    if _calendar_sync is None:
+        _calendar_sync = CalendarSync(get_event_index())
+    return _calendar_sync
 
 # Request/Response Models
-=======
-
->>>>>>> 0ebfbf5d6e11135fda5b861fc37ee322a13c5e86
 class EventRequest(BaseModel):
     title: str
     description: str
     start_time: str
     end_time: str
 
-<<<<<<< HEAD
     @validator('start_time', 'end_time')
     def validate_datetime(cls, v):
         try:
@@ -58,44 +98,85 @@ class EventRequest(BaseModel):
         except ValueError:
             raise ValueError('Invalid datetime format. Expected ISO 8601 format (YYYY-MM-DDTHH:MM:SS)')
 
+def check_events_per_request(events: list) -> list:
+    """Limit the events in one request to MAX_EVENTS_PER_REQUEST"""
+    limit = get_settings().max_events_per_request
+    if len(events) > limit:
+        raise ValueError(f'At most {limit} events per request')
+    return events
+
 class EventResponse(BaseModel):
     message: str
     eventId: str
     htmlLink: Optional[str] = None
 
+class BatchEventRequest(BaseModel):
+    events: List[EventRequest] = Field(..., min_length=1)
+
+    @validator('events')
+    def validate_events(cls, v):
+        return check_events_per_request(v)
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: str  # "created", "restored", "exists" or "failed"
+    eventId: Optional[str] = None
+    htmlLink: Optional[str] = None
+    statusCode: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchEventResponse(BaseModel):
+    message: str
+    created: int
+    failed: int
+    results: List[BatchItemResult]
+
+class ConflictRequest(BaseModel):
+    events: List[Event] = Field(..., min_length=1)
+
+    @validator('events')
+    def validate_events(cls, v):
+        return check_events_per_request(v)
+
 class AuthStatus(BaseModel):
     status: str
     email: Optional[str] = None
     expires: Optional[str] = None
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="Google Calendar Integration API",
-    description="API for integrating with Google Calendar",
-    version="1.0.0",
-    docs_url="/docs" if DEBUG else None,
-    redoc_url="/redoc" if DEBUG else None,
-)
-=======
-
-app = FastAPI()
->>>>>>> 0ebfbf5d6e11135fda5b861fc37ee322a13c5e86
-
+@asynccontextmanager
+async def calendar_lifespan(app: FastAPI):
+    """Background work and pooled connections of the calendar endpoints, entered by the app serving the router"""
+    # Structured logs, written by a background thread (no-op if the app already set it up)
+    configure_logging()
+    # Re-read the settings on SIGHUP instead of restarting workers
+    install_reload_handler(asyncio.get_running_loop())
+    # Refresh access tokens in the background before they expire
+    refresher = asyncio.create_task(get_session_store().run_refresher())
+    try:
+        yield
+    finally:
+        refresher.cancel()
+        # Close the pooled Calendar connections on shutdown
+        await close_async_client()
+        service_cache.clear()
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[FRONTEND_URL],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+router = APIRouter(tags=["calendar"])
 
-<<<<<<< HEAD
 # Helper Functions
-def get_credentials(request: Request, response: Optional[Response] = None) -> Optional[Credentials]:
+def set_session_cookie(response: Response, session_id: str):
+    """Store the opaque session id in the browser, the tokens stay on the server"""
+    response.set_cookie(
+        key=SESSION_COOKIE,
+        value=session_id,
+        httponly=True,
+        secure=get_settings().env != "development",  # Use secure cookies in production
+        samesite='lax',
+        max_age=get_settings().session_max_age
+    )
+
+async def get_credentials(request: Request, response: Optional[Response] = None) -> Optional[Credentials]:
     """
-    Get and validate Google OAuth credentials from cookies
+    Get valid Google OAuth credentials for the request's session
     
     Args:
         request: The FastAPI request object
@@ -105,89 +186,45 @@ def get_credentials(request: Request, response: Optional[Response] = None) -> Op
         Valid Google OAuth credentials or None
     """
     try:
-        token_json = request.cookies.get('google_auth_token')
-        if not token_json:
-            return None
-        
-        creds = Credentials.from_authorized_user_info(json.loads(token_json), SCOPES)
-        
-        # Check if credentials need refreshing
-        if not creds.valid:
-            if creds.expired and creds.refresh_token:
-                logger.info("Refreshing expired token")
-=======
-# Define the scopes (permissions) your app needs
-SCOPES = ['https://www.googleapis.com/auth/calendar.events']
-
-# Get the absolute path to the client_secret.json file
-CLIENT_SECRET_PATH = os.path.join(os.path.dirname(__file__), 'client_secret.json')
-print(f"Looking for client_secret.json at: {CLIENT_SECRET_PATH}")
-
-
-# Helper function to authenticate the user
-def authenticate_google(request: Request, response: Response):
-    try:
-        creds = None
-        token_json = request.cookies.get('google_auth_token')
+        creds = await get_session_store().get_credentials(request.cookies.get(SESSION_COOKIE))
+        if creds:
+            return creds
 
-        if token_json:
-            print("Found existing token in cookies")
+        # Older clients still carry the whole token in a cookie; move it into a session
+        token_json = request.cookies.get(LEGACY_TOKEN_COOKIE)
+        if token_json and response is not None:
             creds = Credentials.from_authorized_user_info(json.loads(token_json), SCOPES)
-
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                print("Refreshing expired token")
->>>>>>> 0ebfbf5d6e11135fda5b861fc37ee322a13c5e86
-                creds.refresh(GoogleRequest())
-                # Update cookie if we have a response object
-                if response:
-                    response.set_cookie(
-                        key='google_auth_token',
-                        value=creds.to_json(),
-                        httponly=True,
-                        secure=ENV != "development",
-                        samesite='lax',
-                        max_age=3600
-                    )
-<<<<<<< HEAD
-                return creds
-            return None
-=======
-
-                print("Starting OAuth flow")
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    CLIENT_SECRET_PATH, SCOPES)
-                flow.redirect_uri = 'http://localhost:8004/callback'
-                creds = flow.run_local_server(port=8004)
-                print("OAuth flow completed successfully")
-
-            response.set_cookie(
-                key='google_auth_token',
-                value=creds.to_json(),
-                httponly=True,
-                secure=False,
-                samesite='lax',
-                max_age=3600
-            )
-            print("Set new token in cookies")
->>>>>>> 0ebfbf5d6e11135fda5b861fc37ee322a13c5e86
-        return creds
+            session_id = await get_session_store().create(creds)
+            set_session_cookie(response, session_id)
+            response.delete_cookie(LEGACY_TOKEN_COOKIE)
+            return await get_session_store().get_credentials(session_id)
+        return None
     except Exception as e:
         logger.error(f"Error getting credentials: {str(e)}")
         return None
 
-<<<<<<< HEAD
 def build_calendar_service(credentials: Credentials):
     """
-    Build the Google Calendar API service
-    
+    Get the Google Calendar API service
+
+    The service is reused across requests for the same user, see calendar_service.py
+
     Args:
         credentials: Valid Google OAuth credentials
-        
+
     Returns:
         Google Calendar API service
     """
-    return build('calendar', 'v3', credentials=credentials)
+    return get_calendar_service(credentials)
+
+def create_oauth_flow(request: Request):
+    """OAuth flow for login and callback, redirecting back to the callback route"""
+    # google_auth_oauthlib is only needed here, importing it lazily keeps cold starts short
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_PATH, SCOPES)
+    # defaults to the callback route of whichever app serves the router
+    flow.redirect_uri = get_settings().callback_url or str(request.url_for('callback'))
+    return flow
 
 def format_event(event_request: EventRequest) -> Dict[str, Any]:
     """
@@ -207,19 +244,206 @@ def format_event(event_request: EventRequest) -> Dict[str, Any]:
     if start_time == end_time:
         end_time = start_time + timedelta(hours=1)
     
+    timezone = get_settings().timezone
     return {
         'summary': event_request.title,
         'description': event_request.description,
         'start': {
             'dateTime': start_time.isoformat(),
-            'timeZone': TIMEZONE,
+            'timeZone': timezone,
         },
         'end': {
             'dateTime': end_time.isoformat(),
-            'timeZone': TIMEZONE,
+            'timeZone': timezone,
         },
     }
 
+def make_event_id(calendar_event: Dict[str, Any], user_key: str) -> str:
+    """
+    Derive the Google Calendar event ID from the event content and the user
+
+    The same event added twice by the same user (double-click, client retry, re-sent batch)
+    gets the same ID, so the second insert fails with 409 Conflict instead of creating a
+    duplicate. The ID is a base32hex SHA-256 digest, which satisfies Google's ID rules
+    (characters a-v and 0-9, 5 to 1024 characters).
+
+    Google keeps the IDs of deleted events, so re-adding an event that was deleted from the
+    calendar also fails with 409; it is then restored instead, see restore_if_cancelled.
+
+    Args:
+        calendar_event: Event formatted with format_event, without an 'id'
+        user_key: Stable identifier of the user, see calendar_service.account_key
+
+    Returns:
+        A 52 character event ID
+    """
+    content = json.dumps(calendar_event, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(f"{user_key}\n{content}".encode('utf-8')).digest()
+    return base64.b32hexencode(digest).decode('ascii').rstrip('=').lower()
+
+def with_event_id(calendar_event: Dict[str, Any], credentials: Credentials) -> Dict[str, Any]:
+    """Copy of the formatted event with its content-derived ID set"""
+    return {**calendar_event, 'id': make_event_id(calendar_event, account_key(credentials))}
+
+def id_token_claims(credentials: Credentials) -> Dict[str, Any]:
+    """Claims of the credentials' OpenID id_token, empty if there is none"""
+    if not credentials.id_token:
+        return {}
+    # the id_token came straight from Google's token endpoint over TLS, no signature check needed
+    return jwt.decode(credentials.id_token, verify=False)
+
+def with_account_id(credentials: Credentials) -> Credentials:
+    """Store the account's OpenID subject from the login's id_token, see calendar_service.account_key"""
+    claims = id_token_claims(credentials)
+    if 'sub' not in claims:
+        return credentials
+    with_account = credentials.with_account(claims['sub'])
+    # the copy drops the expiry, without it the session would never be refreshed
+    with_account.expiry = credentials.expiry
+    return with_account
+
+async def restore_if_cancelled(credentials: Credentials, calendar_event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Restore an event whose insert failed with 409 because it was deleted from the calendar
+
+    Deleted events keep their ID and come back from events.get with status "cancelled";
+    updating them with status "confirmed" puts them back on the calendar.
+
+    Returns:
+        The restored event, or None if the event really exists
+    """
+    client = get_async_client()
+    existing = await client.get_event(credentials, calendar_event['id'])
+    if existing.get('status') != 'cancelled':
+        return None
+    logger.info(f"Restoring deleted event {calendar_event['id']}")
+    return await client.update_event(credentials, calendar_event['id'], {**calendar_event, 'status': 'confirmed'})
+
+def execute_in_batches(service, requests: List[Tuple[int, Any]], callback, http=None):
+    """
+    Execute (index, request) pairs with batch requests of MAX_BATCH_SIZE
+
+    Args:
+        service: Google Calendar API service
+        requests: Indexes and the API requests to run
+        callback: Called as callback(index, response, exception) once per request; when a
+            whole batch request fails (network, auth...) every request in it gets that error
+        http: Optional transport to send the batches with, defaults to the service's
+    """
+    answered = set()
+
+    def on_response(request_id, response, exception):
+        answered.add(int(request_id))
+        callback(int(request_id), response, exception)
+
+    for offset in range(0, len(requests), MAX_BATCH_SIZE):
+        chunk = requests[offset:offset + MAX_BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=on_response)
+        for index, api_request in chunk:
+            batch.add(api_request, request_id=str(index))
+        try:
+            batch.execute(http=http)
+        except Exception as e:
+            logger.error(f"Batch request failed: {str(e)}")
+            for index, _ in chunk:
+                if index not in answered:
+                    callback(index, None, e)
+
+def insert_events_cached(credentials: Credentials, calendar_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    insert_events_batch with the user's cached service and keep-alive transport
+
+    Blocking, call it from a worker thread. Batches of the same user wait for each other,
+    since httplib2 connections are not thread-safe.
+    """
+    with lease_calendar_service(credentials) as (service, http):
+        return insert_events_batch(service, calendar_events, http)
+
+
+def insert_events_batch(service, calendar_events: List[Dict[str, Any]], http=None) -> List[Dict[str, Any]]:
+    """
+    Insert events using the Calendar batch API, MAX_BATCH_SIZE events per HTTP request
+
+    Events that fail with 409 because they were deleted from the calendar are restored,
+    with one batch of events.get and one of events.update (see restore_if_cancelled).
+
+    Args:
+        service: Google Calendar API service
+        calendar_events: Events formatted with format_event
+        http: Optional transport to send the batches with, defaults to the service's
+
+    Returns:
+        One result per event, in the same order, with either the created event or the error
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(calendar_events)
+
+    def failed(index, exception):
+        return {
+            "index": index,
+            "status": "failed",
+            "statusCode": getattr(exception, 'status_code', None),
+            "error": str(exception),
+        }
+
+    def on_insert(index, created_event, exception):
+        if getattr(exception, 'status_code', None) == 409:
+            # The event was inserted by an earlier attempt (IDs are content-derived)
+            results[index] = {
+                "index": index,
+                "status": "exists",
+                "eventId": calendar_events[index].get('id'),
+            }
+        elif exception is None:
+            results[index] = {
+                "index": index,
+                "status": "created",
+                "eventId": created_event.get('id'),
+                "htmlLink": created_event.get('htmlLink'),
+            }
+        else:
+            results[index] = failed(index, exception)
+
+    execute_in_batches(service, [
+        (index, service.events().insert(calendarId='primary', body=calendar_event))
+        for index, calendar_event in enumerate(calendar_events)
+    ], on_insert, http)
+
+    cancelled = []
+
+    def on_get(index, existing, exception):
+        if exception is None and existing.get('status') == 'cancelled':
+            cancelled.append(index)
+
+    def on_update(index, restored_event, exception):
+        if exception is None:
+            results[index] = {
+                "index": index,
+                "status": "restored",
+                "eventId": restored_event.get('id'),
+                "htmlLink": restored_event.get('htmlLink'),
+            }
+        else:
+            results[index] = failed(index, exception)
+
+    existing = [result["index"] for result in results if result["status"] == "exists"]
+    if existing:
+        execute_in_batches(service, [
+            (index, service.events().get(calendarId='primary', eventId=calendar_events[index]['id']))
+            for index in existing
+        ], on_get, http)
+    if cancelled:
+        logger.info(f"Restoring {len(cancelled)} deleted events")
+        execute_in_batches(service, [
+            (index, service.events().update(
+                calendarId='primary',
+                eventId=calendar_events[index]['id'],
+                body={**calendar_events[index], 'status': 'confirmed'},
+            ))
+            for index in sorted(cancelled)
+        ], on_update, http)
+
+    return results
+
 def create_success_page() -> str:
     """Generate HTML for successful authentication"""
     return """
@@ -274,12 +498,12 @@ def create_error_page(error: str) -> str:
                      font-size: 16px; margin: 4px 2px; cursor: pointer; border-radius: 4px; }}
         </style>
         <script>
-            window.onload = function() {
+            window.onload = function() {{
                 // Notify the opener window that auth failed
-                if (window.opener && !window.opener.closed) {
+                if (window.opener && !window.opener.closed) {{
                     window.opener.postMessage('google-auth-failed', '*');
-                }
-            };
+                }}
+            }};
         </script>
     </head>
     <body>
@@ -305,7 +529,7 @@ async def require_auth(request: Request, response: Response) -> Credentials:
     Raises:
         HTTPException: If user is not authenticated
     """
-    creds = get_credentials(request, response)
+    creds = await get_credentials(request, response)
     if not creds:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -314,7 +538,7 @@ async def require_auth(request: Request, response: Response) -> Credentials:
     return creds
 
 # API Endpoints
-@app.post('/add-event', response_model=EventResponse)
+@router.post('/add-event', response_model=EventResponse)
 async def add_event(
     event: EventRequest, 
     request: Request, 
@@ -323,68 +547,143 @@ async def add_event(
 ):
     """Add an event to Google Calendar"""
     try:
-        logger.info(f"Adding event: {event.title}")
-        
-        # Format the event
-        calendar_event = format_event(event)
-        
-        # Get calendar service
-        service = build_calendar_service(credentials)
+        # Format the event, with an ID derived from its content so retries can't duplicate it
+        calendar_event = with_event_id(format_event(event), credentials)
+        logger.info(f"Adding event {calendar_event['id']}")
+        log_payload(logger, "Adding event", event=event)
         
-        # Create the event
-        created_event = service.events().insert(calendarId='primary', body=calendar_event).execute()
+        # Create the event without blocking the event loop
+        try:
+            created_event = await get_async_client().insert_event(credentials, calendar_event)
+        except CalendarApiError as e:
+            if e.status_code != 409:
+                raise
+            created_event = await restore_if_cancelled(credentials, calendar_event)
+            if created_event is None:
+                logger.info(f"Event {calendar_event['id']} already exists")
+                return {
+                    "message": "Event already exists",
+                    "eventId": calendar_event['id'],
+                    "htmlLink": None
+                }
         logger.info(f"Event created with ID: {created_event.get('id')}")
+        busy_cache.invalidate(account_key(credentials))
+        await run_in_threadpool(get_event_index().mark_stale, account_key(credentials))
         
-=======
+        return {
+            "message": f"Event created: {created_event.get('htmlLink')}",
+            "eventId": created_event.get('id'),
+            "htmlLink": created_event.get('htmlLink')
+        }
+    except CalendarApiError as e:
+        logger.error(f"Google API error: {str(e)}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating event: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-@app.post('/add-event')
-async def add_event(request: Request, response: Response, event: EventRequest):
+
+@router.post('/add-events', response_model=BatchEventResponse)
+async def add_events(
+    batch: BatchEventRequest,
+    request: Request,
+    response: Response,
+    credentials: Credentials = Depends(require_auth)
+):
+    """Add several events to Google Calendar with batch requests, reporting the result of each"""
     try:
-        print(f"Received event: {event}")
-        creds = authenticate_google(request, response)
-
-        # Parse the datetime strings
-        start_time = datetime.fromisoformat(event.start_time)
-        end_time = datetime.fromisoformat(event.end_time)
-
-        # If start and end time are the same, add 1 hour duration
-        if start_time == end_time:
-            end_time = start_time + timedelta(hours=1)
-
-        service = build('calendar', 'v3', credentials=creds)
-
-        calendar_event = {
-            'summary': event.title,
-            'description': event.description,
-            'start': {
-                'dateTime': start_time.isoformat(),
-                'timeZone': 'America/Los_Angeles',
-            },
-            'end': {
-                'dateTime': end_time.isoformat(),
-                'timeZone': 'America/Los_Angeles',
-            },
+        logger.info(f"Adding {len(batch.events)} events")
+
+        calendar_events = [with_event_id(format_event(event), credentials) for event in batch.events]
+        results = await run_in_threadpool(insert_events_cached, credentials, calendar_events)
+
+        # events that already existed count as created, re-sending a batch is safe
+        created = sum(1 for result in results if result["status"] in ("created", "restored", "exists"))
+        failed = len(results) - created
+        logger.info(f"Batch insert finished: {created} created, {failed} failed")
+        busy_cache.invalidate(account_key(credentials))
+        await run_in_threadpool(get_event_index().mark_stale, account_key(credentials))
+
+        return {
+            "message": f"{created} of {len(results)} events created",
+            "created": created,
+            "failed": failed,
+            "results": results,
         }
+    except Exception as e:
+        logger.error(f"Error creating events: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-        print(f"Creating event: {json.dumps(calendar_event, default=str)}")
-        created_event = service.events().insert(calendarId='primary', body=calendar_event).execute()
-        print(f"Event created successfully with ID: {created_event.get('id')}")
 
->>>>>>> 0ebfbf5d6e11135fda5b861fc37ee322a13c5e86
+@router.post('/conflicts')
+async def conflicts(
+    check: ConflictRequest,
+    request: Request,
+    response: Response,
+    credentials: Credentials = Depends(require_auth)
+):
+    """Find candidate events that overlap the user's existing schedule"""
+    try:
+        candidates = [candidate_intervals(event) for event in check.events]
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid event: {str(e)}")
+
+    intervals = [interval for event_intervals in candidates for interval in event_intervals]
+    if not intervals:
+        return {"checked": len(check.events), "conflicts": [], "cached": False}
+
+    try:
+        # One freebusy query covers the whole batch
+        time_min = min(start for start, _ in intervals)
+        time_max = max(end for _, end in intervals)
+        user_key = account_key(credentials)
+
+        busy = busy_cache.get(user_key, time_min, time_max)
+        cached = busy is not None
+        if busy is None:
+            result = await get_async_client().freebusy(credentials, time_min, time_max)
+            busy = busy_tree_from_freebusy(result)
+            busy_cache.put(user_key, time_min, time_max, busy)
+
+        found = find_conflicts(check.events, candidates, busy)
+        logger.info(f"Checked {len(check.events)} events, {len(found)} conflicts")
+
         return {
-            "message": f"Event created: {created_event.get('htmlLink')}",
-            "eventId": created_event.get('id'),
-            "htmlLink": created_event.get('htmlLink')
+            "checked": len(check.events),
+            "conflicts": found,
+            "timeMin": time_min,
+            "timeMax": time_max,
+            "cached": cached,
         }
-    except HttpError as e:
+    except CalendarApiError as e:
         logger.error(f"Google API error: {str(e)}")
         raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
-        logger.error(f"Error creating event: {str(e)}")
+        logger.error(f"Error checking conflicts: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post('/duplicates')
+async def duplicates(
+    check: ConflictRequest,
+    request: Request,
+    response: Response,
+    credentials: Credentials = Depends(require_auth)
+):
+    """Find candidate events that are already in the user's calendar"""
+    try:
+        found, sync_mode = await get_calendar_sync().find_duplicates(credentials, check.events)
+        logger.info(f"Checked {len(check.events)} events, {len(found)} duplicates ({sync_mode} sync)")
+        return {"checked": len(check.events), "duplicates": found, "sync": sync_mode}
+    except CalendarApiError as e:
+        logger.error(f"Google API error: {str(e)}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error checking duplicates: {str(e)}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@app.delete('/delete-event/{event_id}')
+@router.delete('/delete-event/{event_id}')
 async def delete_event(
     event_id: str, 
     request: Request, 
@@ -393,23 +692,16 @@ async def delete_event(
 ):
     """Delete an event from Google Calendar"""
     try:
-<<<<<<< HEAD
         logger.info(f"Deleting event: {event_id}")
         
-        # Get calendar service
-        service = build_calendar_service(credentials)
-        
         # Delete the event
-=======
-        creds = authenticate_google(request, response)
-        service = build('calendar', 'v3', credentials=creds)
-
->>>>>>> 0ebfbf5d6e11135fda5b861fc37ee322a13c5e86
-        service.events().delete(calendarId='primary', eventId=event_id).execute()
+        await get_async_client().delete_event(credentials, event_id)
         logger.info(f"Event {event_id} deleted successfully")
+        busy_cache.invalidate(account_key(credentials))
+        await run_in_threadpool(get_event_index().mark_stale, account_key(credentials))
         
         return {"message": "Event deleted successfully"}
-    except HttpError as e:
+    except CalendarApiError as e:
         logger.error(f"Google API error: {str(e)}")
         raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
@@ -417,7 +709,7 @@ async def delete_event(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-@app.get('/login')
+@router.get('/login')
 async def login(request: Request, response: Response):
     """Start the OAuth flow by redirecting to Google's authorization page"""
     try:
@@ -432,8 +724,7 @@ async def login(request: Request, response: Response):
         logger.info("Starting OAuth flow")
         
         # Create OAuth flow
-        flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_PATH, SCOPES)
-        flow.redirect_uri = CALLBACK_URL
+        flow = create_oauth_flow(request)
         
         # Generate authorization URL with forced prompt
         auth_url, _ = flow.authorization_url(
@@ -454,11 +745,10 @@ async def login(request: Request, response: Response):
         )
 
 
-@app.get('/callback')
+@router.get('/callback')
 async def callback(request: Request, response: Response):
     """Handle the OAuth callback from Google"""
     try:
-<<<<<<< HEAD
         # Get the authorization code
         code = request.query_params.get('code')
         if not code:
@@ -468,60 +758,20 @@ async def callback(request: Request, response: Response):
         logger.info("Received authorization code")
         
         # Create OAuth flow
-        flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRET_PATH, SCOPES)
-        flow.redirect_uri = CALLBACK_URL
+        flow = create_oauth_flow(request)
         
         # Exchange code for credentials
         flow.fetch_token(code=code)
-        creds = flow.credentials
+        creds = with_account_id(flow.credentials)
         logger.info("Successfully exchanged code for credentials")
         
-        # Store credentials in cookie
-        response.set_cookie(
-            key='google_auth_token',
-            value=creds.to_json(),
-            httponly=True,
-            secure=ENV != "development",  # Use secure cookies in production
-            samesite='lax',
-            max_age=3600  # 1 hour
-        )
-        
-        # Return success page
-        return HTMLResponse(content=create_success_page())
-=======
-        authenticate_google(request, response)
-        html_content = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Authentication Successful</title>
-            <style>
-                body { font-family: Arial, sans-serif; text-align: center; padding-top: 50px; }
-                .success { color: green; font-size: 24px; margin-bottom: 20px; }
-                .message { margin-bottom: 30px; }
-                .button { background-color: #4CAF50; border: none; color: white; padding: 15px 32px;
-                         text-align: center; text-decoration: none; display: inline-block;
-                         font-size: 16px; margin: 4px 2px; cursor: pointer; border-radius: 4px; }
-            </style>
-            <script>
-                window.onload = function() {
-                    setTimeout(function() {
-                        window.close();
-                    }, 3000);
-                };
-            </script>
-        </head>
-        <body>
-            <div class="success">✓ Authentication Successful!</div>
-            <div class="message">You can now close this window and return to the app.</div>
-            <div>This window will close automatically in 3 seconds.</div>
-            <button class="button" onclick="window.close()">Close Window</button>
-        </body>
-        </html>
-        """
-        from fastapi.responses import HTMLResponse
-        return HTMLResponse(content=html_content)
->>>>>>> 0ebfbf5d6e11135fda5b861fc37ee322a13c5e86
+        # Keep the credentials server-side, the browser only gets the session id.
+        # The cookie has to go on the returned response itself, headers set on the
+        # injected `response` are dropped when a Response object is returned.
+        session_id = await get_session_store().create(creds)
+        success_page = HTMLResponse(content=create_success_page())
+        set_session_cookie(success_page, session_id)
+        return success_page
     except Exception as e:
         logger.error(f"Callback error: {str(e)}")
         return HTMLResponse(
@@ -529,20 +779,21 @@ async def callback(request: Request, response: Response):
             status_code=status.HTTP_401_UNAUTHORIZED
         )
 
-@app.get('/check-auth', response_model=AuthStatus)
+@router.get('/check-auth', response_model=AuthStatus)
 async def check_auth(request: Request, response: Response):
     """Check if the user is authenticated with Google"""
     try:
-        creds = get_credentials(request, response)
+        creds = await get_credentials(request, response)
         if not creds:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Not authenticated"
             )
         
-        # Get user info if available
-        email = getattr(creds, 'id_token', {}).get('email', 'Unknown') if hasattr(creds, 'id_token') else None
-        expires = creds.expiry.isoformat() if hasattr(creds, 'expiry') else None
+        # The id_token comes with the login and every refresh, sessions loaded from the
+        # store only have it again after their next refresh
+        email = id_token_claims(creds).get('email')
+        expires = creds.expiry.isoformat() if creds.expiry else None
         
         return {
             "status": "authenticated",
@@ -559,28 +810,55 @@ async def check_auth(request: Request, response: Response):
         )
 
 
-@app.get('/logout')
-async def logout(response: Response):
+@router.get('/logout')
+async def logout(request: Request, response: Response):
     """Log out the user by clearing credentials"""
-    response.delete_cookie('google_auth_token')
+    creds = await get_credentials(request)
+    if creds:
+        service_cache.invalidate(creds)
+        await run_in_threadpool(get_event_index().clear, account_key(creds))
+    await get_session_store().delete(request.cookies.get(SESSION_COOKIE))
+    response.delete_cookie(SESSION_COOKIE)
+    response.delete_cookie(LEGACY_TOKEN_COOKIE)
     logger.info("User logged out")
     return {"message": "Logged out successfully"}
 
-@app.get('/')
+@router.get('/')
 async def root():
     """Root endpoint with API information"""
     return {
         "api": "Google Calendar Integration API",
         "version": "1.0.0",
-        "docs": "/docs" if DEBUG else "Disabled in production"
+        "docs": "/docs" if get_settings().env == "development" else "Disabled in production"
     }
 
 # Health check endpoint
-@app.get('/health')
+@router.get('/health')
 async def health_check():
     """Health check endpoint for monitoring"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+# Standalone app for local development, docs and CORS are fixed when it is built
+DEBUG = get_settings().env == "development"
+app = FastAPI(
+    title="Google Calendar Integration API",
+    description="API for integrating with Google Calendar",
+    version="1.0.0",
+    docs_url="/docs" if DEBUG else None,
+    redoc_url="/redoc" if DEBUG else None,
+    lifespan=calendar_lifespan,
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[get_settings().frontend_url],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.include_router(router)
+
 if __name__ == '__main__':
     # Verify client secret file exists
     if not os.path.exists(CLIENT_SECRET_PATH):
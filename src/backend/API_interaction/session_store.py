@@ -0,0 +1,285 @@
+"""
+Server-side OAuth credential sessions
+The browser only holds an opaque session id; the token JSON lives here. Parsed Credentials
+are cached in memory and refreshed under a per-session lock so concurrent requests never hit
+the token endpoint more than once. Sessions used within TOKEN_REFRESH_WINDOW are refreshed in
+the background shortly before they expire; older ones are refreshed on their next request.
+"""
+import asyncio
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+import requests
+from fastapi.concurrency import run_in_threadpool
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request as GoogleRequest
+from google.oauth2.credentials import Credentials
+
+from event_generation.config.settings import get_settings
+
+logger = logging.getLogger("google_calendar_api")
+
+SESSION_COOKIE = 'calendarize_session'
+DEFAULT_SESSION_DB_PATH = os.path.join(os.path.dirname(__file__), 'sessions.db')
+
+# token endpoint requests share one connection pool
+_token_session = requests.Session()
+
+
+def refresh_credentials(credentials: Credentials):
+    """Refresh an access token (blocking)"""
+    credentials.refresh(GoogleRequest(session=_token_session))
+
+
+class MemorySessionBackend:
+    """Keeps token JSON in process memory, sessions are lost on restart"""
+
+    def __init__(self):
+        self._sessions: Dict[str, tuple] = {}
+
+    def load(self, session_id: str) -> Optional[str]:
+        session = self._sessions.get(session_id)
+        return session[0] if session else None
+
+    def save(self, session_id: str, token_json: str):
+        self._sessions[session_id] = (token_json, time.time())
+
+    def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def touch(self, session_ids: Iterable[str]):
+        now = time.time()
+        for session_id in session_ids:
+            if session_id in self._sessions:
+                self._sessions[session_id] = (self._sessions[session_id][0], now)
+
+    def purge(self, max_age: float):
+        cutoff = time.time() - max_age
+        for session_id, (_, updated) in list(self._sessions.items()):
+            if updated < cutoff:
+                del self._sessions[session_id]
+
+
+class SQLiteSessionBackend:
+    """Keeps token JSON in a SQLite file, shared by every worker on the host and kept across restarts"""
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or get_settings().session_db_path or DEFAULT_SESSION_DB_PATH
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, token_json TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def load(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT token_json FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, token_json: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, token_json, updated) VALUES (?, ?, ?)",
+                (session_id, token_json, time.time()),
+            )
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def touch(self, session_ids: Iterable[str]):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE sessions SET updated = ? WHERE session_id = ?",
+                [(now, session_id) for session_id in session_ids],
+            )
+
+    def purge(self, max_age: float):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE updated < ?", (time.time() - max_age,))
+
+
+class CredentialSessionStore:
+    """Maps session ids to Google OAuth credentials"""
+
+    def __init__(
+        self,
+        backend=None,
+        scopes=None,
+        refresh_margin: Optional[float] = None,
+        max_age: Optional[float] = None,
+        refresh: Callable[[Credentials], None] = refresh_credentials,
+        refresh_window: Optional[float] = None,
+    ):
+        # unset values follow the settings (TOKEN_REFRESH_MARGIN, SESSION_MAX_AGE, TOKEN_REFRESH_WINDOW)
+        self.backend = backend or MemorySessionBackend()
+        self.scopes = scopes
+        self._refresh_margin = refresh_margin
+        self._max_age = max_age
+        self._refresh_window = refresh_window
+        self._refresh = refresh
+        self._credentials: Dict[str, Credentials] = {}
+        self._last_used: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # sessions used since the last background pass have their backend timestamp touched
+        self._last_pass = time.monotonic()
+
+    @property
+    def refresh_margin(self) -> timedelta:
+        """Tokens are refreshed this long before they expire"""
+        margin = self._refresh_margin if self._refresh_margin is not None else get_settings().token_refresh_margin
+        return timedelta(seconds=margin)
+
+    @property
+    def max_age(self) -> float:
+        """Seconds a session may sit unused"""
+        return self._max_age if self._max_age is not None else get_settings().session_max_age
+
+    @property
+    def refresh_window(self) -> float:
+        """Seconds since last use during which a session is refreshed in the background"""
+        return self._refresh_window if self._refresh_window is not None else get_settings().token_refresh_window
+
+    async def create(self, credentials: Credentials) -> str:
+        """Store new credentials and return the session id for the cookie"""
+        session_id = secrets.token_urlsafe(32)
+        credentials = self._with_token_uri(credentials)
+        self.backend.save(session_id, credentials.to_json())
+        self._remember(session_id, credentials)
+        return session_id
+
+    async def get_credentials(self, session_id: Optional[str]) -> Optional[Credentials]:
+        """
+        Get valid credentials for a session
+
+        Args:
+            session_id: Session id from the cookie
+
+        Returns:
+            Valid Google OAuth credentials, or None if the session is unknown or can't be refreshed
+        """
+        if not session_id:
+            return None
+
+        credentials = self._credentials.get(session_id)
+        if credentials is None:
+            token_json = self.backend.load(session_id)
+            if token_json is None:
+                return None
+            credentials = self._with_token_uri(
+                Credentials.from_authorized_user_info(json.loads(token_json), self.scopes)
+            )
+            self._remember(session_id, credentials)
+
+        self._last_used[session_id] = time.monotonic()
+        if self._needs_refresh(credentials):
+            return await self.refresh(session_id)
+        return credentials
+
+    async def refresh(self, session_id: str) -> Optional[Credentials]:
+        """Refresh a session's token, at most once at a time per session"""
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            credentials = self._credentials.get(session_id)
+            if credentials is None:
+                return None
+            # another request may have refreshed it while we waited for the lock
+            if not self._needs_refresh(credentials):
+                return credentials
+            if not credentials.refresh_token:
+                return None if credentials.expired else credentials
+
+            try:
+                logger.info("Refreshing access token")
+                await run_in_threadpool(self._refresh, credentials)
+            except RefreshError as e:
+                logger.warning(f"Token refresh failed, ending session: {str(e)}")
+                await self.delete(session_id)
+                return None
+
+            self.backend.save(session_id, credentials.to_json())
+            return credentials
+
+    async def delete(self, session_id: Optional[str]):
+        if not session_id:
+            return
+        self.backend.delete(session_id)
+        self._credentials.pop(session_id, None)
+        self._last_used.pop(session_id, None)
+        self._locks.pop(session_id, None)
+
+    async def refresh_expiring(self):
+        """
+        One background pass
+
+        Records which sessions were used since the last pass, so the backend purges by last
+        use, refreshes tokens of recently used sessions that are about to expire, and drops
+        the in-memory copy of the others: they are reloaded and refreshed on their next request.
+        """
+        now = time.monotonic()
+        used = [session_id for session_id, last_used in self._last_used.items() if last_used >= self._last_pass]
+        self._last_pass = now
+        if used:
+            self.backend.touch(used)
+
+        window = self.refresh_window
+        for session_id in list(self._credentials):
+            if now - self._last_used.get(session_id, now) > window:
+                self._forget(session_id)
+            elif self._needs_refresh(self._credentials[session_id]):
+                await self.refresh(session_id)
+        self.backend.purge(self.max_age)
+
+    async def run_refresher(self, interval: Optional[float] = None):
+        """Run refresh_expiring forever, meant to be started as a task in the app lifespan"""
+        while True:
+            await asyncio.sleep(interval or get_settings().token_refresh_interval)
+            try:
+                await self.refresh_expiring()
+            except Exception as e:
+                logger.error(f"Background token refresh failed: {str(e)}")
+
+    def _needs_refresh(self, credentials: Credentials) -> bool:
+        if credentials.expiry is None:
+            # an unknown expiry can't be trusted, refresh once to learn it
+            return not credentials.token or bool(credentials.refresh_token)
+        return credentials.expiry - datetime.utcnow() < self.refresh_margin
+
+    @staticmethod
+    def _with_token_uri(credentials: Credentials) -> Credentials:
+        # override for https://oauth2.googleapis.com/token, e.g. to point at a local fake Calendar server
+        token_uri = get_settings().google_token_uri
+        if token_uri and credentials.token_uri != token_uri:
+            # the copy drops the expiry, which decides when the token is refreshed
+            with_token_uri = credentials.with_token_uri(token_uri)
+            with_token_uri.expiry = credentials.expiry
+            return with_token_uri
+        return credentials
+
+    def _remember(self, session_id: str, credentials: Credentials):
+        self._credentials[session_id] = credentials
+        self._last_used[session_id] = time.monotonic()
+
+    def _forget(self, session_id: str):
+        # drop the in-memory copy only, the backend keeps the session
+        self._credentials.pop(session_id, None)
+        self._last_used.pop(session_id, None)
+        self._locks.pop(session_id, None)
+
+
+def create_session_store(scopes=None) -> CredentialSessionStore:
+    """Session store configured by SESSION_STORE / SESSION_DB_PATH"""
+    backend = SQLiteSessionBackend() if get_settings().session_store == "sqlite" else MemorySessionBackend()
+    return CredentialSessionStore(backend, scopes=scopes)
@@ -0,0 +1,44 @@
+"""
+Per-request latency of getting a Calendar service object
+
+Compares googleapiclient's build('calendar', 'v3', ...) (what every /add-event and
+/delete-event used to do) with the cached service from calendar_service.py.
+No network access is needed: both use the bundled static discovery document.
+
+Run from src/backend:
+    python -m API_interaction.testing.bench_calendar_service
+"""
+import timeit
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from API_interaction.calendar_service import CalendarServiceCache
+
+USERS = 50
+
+
+def make_credentials(user: int) -> Credentials:
+    return Credentials(token=f"token-{user}", refresh_token=f"refresh-{user}")
+
+
+def main(number=200):
+    credentials = [make_credentials(user) for user in range(USERS)]
+    cache = CalendarServiceCache(max_size=USERS)
+
+    def uncached():
+        build('calendar', 'v3', credentials=credentials[0], static_discovery=True)
+
+    rotation = iter(range(10 ** 9))
+
+    def cached():
+        cache.get(credentials[next(rotation) % USERS])
+
+    for label, func in (("build()", uncached), ("cached", cached)):
+        best = min(timeit.repeat(func, repeat=5, number=number)) / number
+        print(f"{label:<10}{best * 1e3:>10.3f} ms/request")
+    print("cache:", cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+from google.oauth2.credentials import Credentials
+
+import API_interaction.async_calendar_client as async_calendar_client
+import API_interaction.calendar_service as calendar_service
+import API_interaction.gc_event_adder as gc
+from API_interaction.async_calendar_client import AsyncCalendarClient
+from API_interaction.availability import BusyCache
+from API_interaction.event_index import CalendarSync, EventIndex
+from API_interaction.testing.fake_calendar_server import FakeCalendarServer
+
+CREDENTIALS = Credentials(token="token", refresh_token="refresh")
+CACHES = ("service_cache", "busy_cache")
+
+
+@pytest.fixture(autouse=True)
+def event_index(monkeypatch):
+    """In-memory event index, so the endpoints never open the SQLite file next to the code"""
+    index = EventIndex(":memory:")
+    monkeypatch.setattr(gc, "_event_index", index)
+    monkeypatch.setattr(gc, "_calendar_sync", CalendarSync(index))
+    return index
+
+
+@pytest.fixture
+def server():
+    """Fake Calendar API on a background thread, see fake_calendar_server.py"""
+    with FakeCalendarServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(request, server, monkeypatch):
+    """
+    TestClient of the standalone calendar app, signed in and talking to `server`
+
+    Options, given with @pytest.mark.parametrize("client", [{...}], indirect=True):
+        credentials: What require_auth returns, defaults to CREDENTIALS
+        caches: Module caches replaced by empty ones pointing at the server, defaults to CACHES
+    """
+    options = getattr(request, "param", {})
+    caches = options.get("caches", CACHES)
+    monkeypatch.setattr(async_calendar_client, "_client", AsyncCalendarClient(root_url=server.url, http2=False))
+    if "service_cache" in caches:
+        monkeypatch.setattr(calendar_service, "service_cache", calendar_service.CalendarServiceCache(root_url=server.url))
+    if "busy_cache" in caches:
+        monkeypatch.setattr(gc, "busy_cache", BusyCache())
+
+    credentials = options.get("credentials", CREDENTIALS)
+    gc.app.dependency_overrides[gc.require_auth] = lambda: credentials
+    try:
+        with TestClient(gc.app) as client:
+            yield client
+    finally:
+        gc.app.dependency_overrides.pop(gc.require_auth, None)
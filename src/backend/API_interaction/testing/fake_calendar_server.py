@@ -0,0 +1,521 @@
+"""
+Local stand-in for the Google Calendar v3 API
+Implements the subset of the API that gc_event_adder.py uses (events insert, get, update,
+delete and list, batch, freeBusy and the OAuth token refresh), so the calendar code can be tested and load
+tested without a Google account. Latency, random errors and per-user quotas are configurable.
+
+Point the backend at it with:
+    GOOGLE_API_ROOT_URL=http://127.0.0.1:8005/
+    GOOGLE_TOKEN_URI=http://127.0.0.1:8005/token
+
+Run from src/backend:
+    python -m API_interaction.testing.fake_calendar_server --port 8005 --latency-ms 80 --error-rate 0.01
+"""
+import argparse
+import email.parser
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+EVENTS_PATH = re.compile(r"^/calendar/v3/calendars/([^/]+)/events$")
+EVENT_PATH = re.compile(r"^/calendar/v3/calendars/([^/]+)/events/([^/]+)$")
+FREEBUSY_PATH = "/calendar/v3/freeBusy"
+TOKEN_PATH = "/token"
+MAX_BATCH_SIZE = 50
+
+# (status, headers, body) of a single API response
+ApiResponse = Tuple[int, Dict[str, str], bytes]
+
+
+def _json_response(status: int, payload: dict) -> ApiResponse:
+    return status, {"Content-Type": "application/json; charset=UTF-8"}, json.dumps(payload).encode("utf-8")
+
+
+def _error(status: int, reason: str, message: str) -> ApiResponse:
+    return _json_response(status, {
+        "error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}
+    })
+
+
+def _to_utc(value: datetime) -> datetime:
+    # naive times are treated as UTC, the fake ignores the event's timeZone field
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _parse_query_time(value: str) -> datetime:
+    return _to_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def _parse_time(value: dict) -> datetime:
+    return _to_utc(datetime.fromisoformat(value.get("dateTime") or value["date"]))
+
+
+@dataclass
+class FakeCalendarConfig:
+    """Behaviour knobs, can be changed while running through POST /_fake/config"""
+    latency_ms: float = 0.0  # added to every HTTP request (a batch counts once)
+    jitter_ms: float = 0.0  # uniform random extra latency on top of latency_ms
+    error_rate: float = 0.0  # probability that an API call fails with error_status
+    error_status: int = 503
+    quota_per_minute: int = 0  # API calls allowed per access token per minute, 0 = unlimited
+    require_auth: bool = True  # reject API calls without a bearer token
+    token_lifetime: int = 3600  # expires_in of refreshed access tokens
+    seed: Optional[int] = None
+
+    def update(self, values: dict):
+        known = {field.name for field in fields(self)}
+        for name, value in values.items():
+            if name in known:
+                setattr(self, name, value)
+
+
+class FakeCalendarState:
+    """Calendars and events held by the fake server, keyed by calendar id"""
+
+    def __init__(self, config: Optional[FakeCalendarConfig] = None):
+        self.config = config or FakeCalendarConfig()
+        self.calendars = {}
+        # like Google, deleted events keep their id: inserting it again is a 409 and
+        # events.get returns them with status "cancelled" until they are updated
+        self.deleted: Dict[str, Dict[str, dict]] = {}  # calendar -> event id -> cancelled event
+        self.lock = threading.Lock()
+        self.random = random.Random(self.config.seed)
+        self.request_count = 0  # API calls, each batch item counts
+        self.http_request_count = 0
+        self.error_count = 0
+        self.throttled_count = 0
+        self.token_refresh_count = 0
+        self.revoked_refresh_tokens = set()
+        # change log for syncToken: every insert/delete gets the next sequence number, deleted
+        # events stay as cancelled tombstones; bumping the epoch invalidates all sync tokens
+        self.sequence = 0
+        self.sync_epoch = 0
+        self.changes: Dict[str, Dict[str, Tuple[int, dict]]] = {}  # calendar -> event id -> (seq, event)
+        self._quota_windows: Dict[str, Tuple[int, int]] = {}  # token -> (minute, calls)
+        self._fail_next = []  # statuses to return for the next API calls
+
+    def reset(self):
+        with self.lock:
+            self.calendars.clear()
+            self.deleted.clear()
+            self.changes.clear()
+            self.sync_epoch += 1
+            self._quota_windows.clear()
+            self._fail_next.clear()
+            self.request_count = self.http_request_count = 0
+            self.error_count = self.throttled_count = self.token_refresh_count = 0
+
+    def expire_sync_tokens(self):
+        """Make every outstanding syncToken fail with 410 Gone"""
+        with self.lock:
+            self.sync_epoch += 1
+
+    def _record_change(self, calendar_id: str, event: dict):
+        self.sequence += 1
+        self.changes.setdefault(calendar_id, {})[event["id"]] = (self.sequence, event)
+
+    def fail_next(self, count: int = 1, status: int = 500):
+        """Make the next `count` API calls fail with `status`"""
+        with self.lock:
+            self._fail_next.extend([status] * count)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.request_count,
+                "http_requests": self.http_request_count,
+                "errors": self.error_count,
+                "throttled": self.throttled_count,
+                "token_refreshes": self.token_refresh_count,
+                "events": sum(len(events) for events in self.calendars.values()),
+                "config": asdict(self.config),
+            }
+
+    def delay(self):
+        """Sleep for the configured latency, once per HTTP request"""
+        with self.lock:
+            self.http_request_count += 1
+            seconds = (self.config.latency_ms + self.random.uniform(0, self.config.jitter_ms)) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def _check_call(self, token: Optional[str]) -> Optional[ApiResponse]:
+        """Auth, injected errors and quota for one API call; returns the error response if any"""
+        with self.lock:
+            self.request_count += 1
+            if self.config.require_auth and not token:
+                return _error(401, "authError", "Request is missing required authentication credential.")
+
+            if self._fail_next or (self.config.error_rate and self.random.random() < self.config.error_rate):
+                self.error_count += 1
+                status = self._fail_next.pop(0) if self._fail_next else self.config.error_status
+                return _error(status, "backendError", "Injected error from the fake Calendar server.")
+
+            if self.config.quota_per_minute:
+                minute = int(time.monotonic() // 60)
+                window, calls = self._quota_windows.get(token or "", (minute, 0))
+                calls = calls + 1 if window == minute else 1
+                self._quota_windows[token or ""] = (minute, calls)
+                if calls > self.config.quota_per_minute:
+                    self.throttled_count += 1
+                    return _error(429, "rateLimitExceeded", "Rate Limit Exceeded")
+        return None
+
+    def refresh_token(self, body: bytes) -> ApiResponse:
+        """OAuth token endpoint, only the refresh_token grant"""
+        form = {key: values[-1] for key, values in parse_qs(body.decode("utf-8")).items()}
+        if form.get("grant_type") != "refresh_token" or not form.get("refresh_token"):
+            return _json_response(400, {"error": "unsupported_grant_type"})
+        if form["refresh_token"] in self.revoked_refresh_tokens:
+            return _json_response(400, {"error": "invalid_grant", "error_description": "Token has been expired or revoked."})
+        with self.lock:
+            self.token_refresh_count += 1
+        return _json_response(200, {
+            "access_token": f"fake-{uuid.uuid4().hex}",
+            "expires_in": self.config.token_lifetime,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/calendar.events",
+        })
+
+    def handle(self, method: str, path: str, body: bytes, token: Optional[str] = None) -> ApiResponse:
+        """Dispatch a single (non-batch) Calendar API request"""
+        rejected = self._check_call(token)
+        if rejected:
+            return rejected
+        url = urlsplit(path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        match = EVENTS_PATH.match(url.path)
+        if match and method == "POST":
+            return self.insert_event(unquote(match.group(1)), body)
+        if match and method == "GET":
+            return self.list_events(unquote(match.group(1)), query)
+        match = EVENT_PATH.match(url.path)
+        if match and method == "GET":
+            return self.get_event(unquote(match.group(1)), unquote(match.group(2)))
+        if match and method == "PUT":
+            return self.update_event(unquote(match.group(1)), unquote(match.group(2)), body)
+        if match and method == "DELETE":
+            return self.delete_event(unquote(match.group(1)), unquote(match.group(2)))
+        if url.path == FREEBUSY_PATH and method == "POST":
+            return self.freebusy(body)
+        return _error(404, "notFound", "Not Found")
+
+    @staticmethod
+    def _parse_event(body: bytes) -> Tuple[Optional[dict], Optional[ApiResponse]]:
+        """The event in a request body, or the error response for an invalid one"""
+        try:
+            event = json.loads(body or b"{}")
+            if _parse_time(event["end"]) <= _parse_time(event["start"]):
+                return None, _error(400, "timeRangeEmpty", "The specified time range is empty.")
+        except (ValueError, KeyError, TypeError):
+            return None, _error(400, "required", "Missing or invalid start/end time.")
+        return event, None
+
+    def insert_event(self, calendar_id: str, body: bytes) -> ApiResponse:
+        event, invalid = self._parse_event(body)
+        if invalid:
+            return invalid
+
+        event_id = event.get("id") or uuid.uuid4().hex
+        event.update({
+            "id": event_id,
+            "kind": "calendar#event",
+            "status": "confirmed",
+            "htmlLink": f"https://calendar.google.com/event?eid={event_id}",
+        })
+        with self.lock:
+            events = self.calendars.setdefault(calendar_id, {})
+            if event_id in events or event_id in self.deleted.get(calendar_id, {}):
+                return _error(409, "duplicate", "The requested identifier already exists.")
+            events[event_id] = event
+            self._record_change(calendar_id, event)
+        return _json_response(200, event)
+
+    def get_event(self, calendar_id: str, event_id: str) -> ApiResponse:
+        with self.lock:
+            event = self.calendars.get(calendar_id, {}).get(event_id) or self.deleted.get(calendar_id, {}).get(event_id)
+        if event is None:
+            return _error(404, "notFound", "Not Found")
+        return _json_response(200, event)
+
+    def update_event(self, calendar_id: str, event_id: str, body: bytes) -> ApiResponse:
+        """Replace an event; updating a deleted event with status "confirmed" restores it"""
+        event, invalid = self._parse_event(body)
+        if invalid:
+            return invalid
+        event.update({
+            "id": event_id,
+            "kind": "calendar#event",
+            "status": event.get("status") or "confirmed",
+            "htmlLink": f"https://calendar.google.com/event?eid={event_id}",
+        })
+        with self.lock:
+            events = self.calendars.setdefault(calendar_id, {})
+            deleted = self.deleted.setdefault(calendar_id, {})
+            if event_id not in events and event_id not in deleted:
+                return _error(404, "notFound", "Not Found")
+            events.pop(event_id, None)
+            deleted.pop(event_id, None)
+            (deleted if event["status"] == "cancelled" else events)[event_id] = event
+            self._record_change(calendar_id, event)
+        return _json_response(200, event)
+
+    def delete_event(self, calendar_id: str, event_id: str) -> ApiResponse:
+        with self.lock:
+            if event_id in self.deleted.get(calendar_id, {}):
+                return _error(410, "deleted", "Resource has been deleted")
+            event = self.calendars.get(calendar_id, {}).pop(event_id, None)
+            if event is not None:
+                self.deleted.setdefault(calendar_id, {})[event_id] = {**event, "status": "cancelled"}
+                self._record_change(calendar_id, {"id": event_id, "kind": "calendar#event", "status": "cancelled"})
+        if event is None:
+            return _error(404, "notFound", "Not Found")
+        return 204, {}, b""
+
+    def _events_between(self, calendar_id: str, time_min: str = None, time_max: str = None) -> list:
+        start = _parse_query_time(time_min) if time_min else datetime.min
+        end = _parse_query_time(time_max) if time_max else datetime.max
+        with self.lock:
+            events = list(self.calendars.get(calendar_id, {}).values())
+        events = [
+            event for event in events
+            if _parse_time(event["start"]) < end and _parse_time(event["end"]) > start
+        ]
+        return sorted(events, key=lambda event: _parse_time(event["start"]))
+
+    def list_events(self, calendar_id: str, query: dict) -> ApiResponse:
+        with self.lock:
+            next_sync_token = f"{self.sync_epoch}-{self.sequence}"
+        if query.get("syncToken"):
+            if query.get("timeMin") or query.get("timeMax"):
+                return _error(400, "invalid", "syncToken cannot be combined with timeMin or timeMax.")
+            events = self._changes_since(calendar_id, query["syncToken"])
+            if events is None:
+                return _error(410, "fullSyncRequired", "Sync token is no longer valid, a full sync is required.")
+        else:
+            events = self._events_between(calendar_id, query.get("timeMin"), query.get("timeMax"))
+
+        offset = int(query.get("pageToken") or 0)
+        page_size = int(query.get("maxResults") or 250)
+        page = {"kind": "calendar#events", "items": events[offset:offset + page_size]}
+        if offset + page_size < len(events):
+            page["nextPageToken"] = str(offset + page_size)
+        else:
+            page["nextSyncToken"] = next_sync_token
+        return _json_response(200, page)
+
+    def _changes_since(self, calendar_id: str, sync_token: str) -> Optional[list]:
+        """Events changed after the sync token was issued, None if the token is invalid"""
+        epoch, _, sequence = sync_token.partition("-")
+        with self.lock:
+            if not sequence.isdigit() or epoch != str(self.sync_epoch):
+                return None
+            changed = [change for change in self.changes.get(calendar_id, {}).values() if change[0] > int(sequence)]
+        return [event for _, event in sorted(changed, key=lambda change: change[0])]
+
+    def freebusy(self, body: bytes) -> ApiResponse:
+        try:
+            request = json.loads(body)
+            time_min, time_max = request["timeMin"], request["timeMax"]
+        except (ValueError, KeyError):
+            return _error(400, "badRequest", "timeMin and timeMax are required.")
+
+        calendars = {}
+        for item in request.get("items", []):
+            busy = [
+                {"start": _parse_time(event["start"]).isoformat() + "Z", "end": _parse_time(event["end"]).isoformat() + "Z"}
+                for event in self._events_between(item["id"], time_min, time_max)
+            ]
+            calendars[item["id"]] = {"busy": busy}
+        return _json_response(200, {"kind": "calendar#freeBusy", "timeMin": time_min, "timeMax": time_max, "calendars": calendars})
+
+
+class FakeCalendarHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: FakeCalendarState = None
+
+    def do_GET(self):
+        self.state.delay()
+        if urlsplit(self.path).path == "/_fake/stats":
+            self._send(*_json_response(200, self.state.stats()))
+        else:
+            self._send(*self.state.handle("GET", self.path, b"", self._token(self.headers)))
+
+    def do_DELETE(self):
+        self.state.delay()
+        self._send(*self.state.handle("DELETE", self.path, b"", self._token(self.headers)))
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.state.delay()
+        self._send(*self.state.handle("PUT", self.path, body, self._token(self.headers)))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = urlsplit(self.path).path
+        if path == "/_fake/config":
+            self.state.config.update(json.loads(body or b"{}"))
+            self._send(*_json_response(200, self.state.stats()))
+            return
+        if path == "/_fake/reset":
+            self.state.reset()
+            self._send(*_json_response(200, self.state.stats()))
+            return
+
+        self.state.delay()
+        if path == TOKEN_PATH:
+            self._send(*self.state.refresh_token(body))
+        elif path.startswith("/batch/"):
+            self._send(*self.handle_batch(body))
+        else:
+            self._send(*self.state.handle("POST", self.path, body, self._token(self.headers)))
+
+    @staticmethod
+    def _token(headers) -> Optional[str]:
+        authorization = headers.get("Authorization") or ""
+        return authorization[7:] if authorization.lower().startswith("bearer ") else None
+
+    def handle_batch(self, body: bytes) -> ApiResponse:
+        """Run every part of a multipart/mixed batch request and wrap the responses the same way"""
+        content_type = self.headers.get("Content-Type", "")
+        message = email.parser.BytesParser().parsebytes(
+            b"Content-Type: " + content_type.encode("utf-8") + b"\r\n\r\n" + body
+        )
+        if not message.is_multipart():
+            return _error(400, "badRequest", "Batch request must be multipart/mixed.")
+        if len(message.get_payload()) > MAX_BATCH_SIZE:
+            return _error(400, "badRequest", f"A batch can contain at most {MAX_BATCH_SIZE} requests.")
+
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for part in message.get_payload():
+            inner = part.get_payload()
+            head, _, inner_body = inner.replace("\r\n", "\n").partition("\n\n")
+            request_line, *header_lines = head.split("\n")
+            method, path = request_line.split(" ")[:2]
+            inner_headers = dict(line.split(": ", 1) for line in header_lines if ": " in line)
+            # each item carries its own Authorization header, fall back to the outer one
+            token = self._token({"Authorization": inner_headers.get("authorization") or inner_headers.get("Authorization")})
+            status, headers, response_body = self.state.handle(
+                method, path, inner_body.encode("utf-8"), token or self._token(self.headers)
+            )
+
+            content_id = part.get("Content-ID", "").strip("<>")
+            lines = [
+                f"--{boundary}",
+                "Content-Type: application/http",
+                f"Content-ID: <response-{content_id}>",
+                "",
+                f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}",
+            ]
+            lines += [f"{name}: {value}" for name, value in headers.items()]
+            lines += ["", response_body.decode("utf-8")]
+            parts.append("\r\n".join(lines))
+
+        payload = "\r\n".join(parts) + f"\r\n--{boundary}--\r\n"
+        return 200, {"Content-Type": f"multipart/mixed; boundary={boundary}"}, payload.encode("utf-8")
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    # concurrent tests and load runs open many connections at once; with the default listen
+    # backlog of 5 some of them are reset before a thread accepts them
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeCalendarServer:
+    """
+    Runs the fake Calendar API on a background thread
+
+    Usage:
+        with FakeCalendarServer() as server:
+            service_cache = CalendarServiceCache(root_url=server.url)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[FakeCalendarConfig] = None):
+        self.state = FakeCalendarState(config)
+        handler = type("Handler", (FakeCalendarHandler,), {"state": self.state})
+        self.httpd = _FakeHTTPServer((host, port), handler)
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def token_uri(self) -> str:
+        return self.url.rstrip("/") + TOKEN_PATH
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Google Calendar API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8005)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency added to every HTTP request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform random extra latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected error per API call")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--quota-per-minute", type=int, default=0, help="API calls per access token per minute, 0 = unlimited")
+    parser.add_argument("--no-auth", action="store_true", help="accept API calls without a bearer token")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeCalendarConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        quota_per_minute=args.quota_per_minute,
+        require_auth=not args.no_auth,
+        seed=args.seed,
+    )
+    server = FakeCalendarServer(args.host, args.port, config)
+    print(f"Fake Calendar API listening on {server.url}")
+    print(f"  GOOGLE_API_ROOT_URL={server.url}")
+    print(f"  GOOGLE_TOKEN_URI={server.token_uri}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from API_interaction.async_calendar_client import AsyncCalendarClient, CalendarApiError
+
+CREDENTIALS = Credentials(token="token")
+
+
+def make_event(day, hour=10):
+    return {
+        "summary": f"Meeting {day}",
+        "start": {"dateTime": f"2025-03-{day:02d}T{hour:02d}:00:00", "timeZone": "UTC"},
+        "end": {"dateTime": f"2025-03-{day:02d}T{hour + 1:02d}:00:00", "timeZone": "UTC"},
+    }
+
+
+def run(coroutine_function, server):
+    async def main():
+        client = AsyncCalendarClient(root_url=server.url, http2=False)
+        try:
+            return await coroutine_function(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_concurrent_inserts_share_one_client(server):
+    async def insert_all(client):
+        return await asyncio.gather(*(client.insert_event(CREDENTIALS, make_event(day)) for day in range(1, 21)))
+
+    created = run(insert_all, server)
+    assert len({event["id"] for event in created}) == 20
+    assert len(server.state.calendars["primary"]) == 20
+
+
+def test_list_delete_and_freebusy(server):
+    async def scenario(client):
+        first = await client.insert_event(CREDENTIALS, make_event(3))
+        await client.insert_event(CREDENTIALS, make_event(4))
+        await client.insert_event(CREDENTIALS, make_event(20))
+
+        page = await client.list_events(
+            CREDENTIALS, timeMin=datetime(2025, 3, 1), timeMax=datetime(2025, 3, 10), maxResults=1
+        )
+        assert [event["summary"] for event in page["items"]] == ["Meeting 3"]
+        assert page["nextPageToken"]
+
+        await client.delete_event(CREDENTIALS, first["id"])
+        with pytest.raises(CalendarApiError) as error:
+            await client.delete_event(CREDENTIALS, first["id"])
+        assert error.value.status_code == 410  # already deleted
+
+        return await client.freebusy(CREDENTIALS, datetime(2025, 3, 1), datetime(2025, 3, 10))
+
+    busy = run(scenario, server)["calendars"]["primary"]["busy"]
+    assert busy == [{"start": "2025-03-04T10:00:00Z", "end": "2025-03-04T11:00:00Z"}]
+
+
+def test_api_errors_carry_status_and_reason(server):
+    async def insert_invalid(client):
+        await client.insert_event(CREDENTIALS, make_event(5, hour=10) | {"end": {"dateTime": "2025-03-05T09:00:00"}})
+
+    with pytest.raises(CalendarApiError) as error:
+        run(insert_invalid, server)
+    assert error.value.status_code == 400
+    assert error.value.reason == "timeRangeEmpty"
+
+
+def test_add_and_delete_event_endpoints(client, server):
+    response = client.post("/add-event", json={
+        "title": "Dentist",
+        "description": "Checkup",
+        "start_time": "2025-03-15T10:00:00",
+        "end_time": "2025-03-15T10:00:00",
+    })
+    assert response.status_code == 200
+    event_id = response.json()["eventId"]
+    assert event_id in server.state.calendars["primary"]
+
+    assert client.delete(f"/delete-event/{event_id}").status_code == 200
+    assert client.delete(f"/delete-event/{event_id}").status_code == 410
@@ -0,0 +1,67 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from API_interaction.availability import BusyCache, IntervalTree
+
+BASE = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def hours(start, end):
+    return BASE + timedelta(hours=start), BASE + timedelta(hours=end)
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    intervals = []
+    for _ in range(300):
+        start = rng.randint(0, 500)
+        intervals.append(hours(start, start + rng.randint(1, 10)))
+    tree = IntervalTree(intervals)
+
+    for _ in range(300):
+        start = rng.randint(0, 510)
+        query = hours(start, start + rng.randint(1, 12))
+        expected = sorted(i for i in intervals if i[0] < query[1] and i[1] > query[0])
+        assert sorted(tree.overlaps(*query)) == expected
+
+
+def test_interval_tree_touching_intervals_do_not_overlap():
+    tree = IntervalTree([hours(1, 2), hours(1, 2)])
+    assert tree.overlaps(*hours(2, 3)) == []
+    assert len(tree.overlaps(*hours(0, 5))) == 2
+
+
+def test_busy_cache_reuses_covering_window():
+    cache = BusyCache(ttl=60)
+    tree = IntervalTree([])
+    cache.put("user", *hours(0, 48), tree)
+    assert cache.get("user", *hours(10, 20)) is tree
+    assert cache.get("user", *hours(10, 50)) is None
+    assert cache.get("other", *hours(10, 20)) is None
+    cache.invalidate("user")
+    assert cache.get("user", *hours(10, 20)) is None
+
+
+def test_conflicts_endpoint_uses_one_freebusy_query(client, server):
+    # existing event 10:00-11:00 UTC on March 3rd
+    client.post("/add-event", json={
+        "title": "Standup", "description": "",
+        "start_time": "2025-03-03T10:00:00", "end_time": "2025-03-03T11:00:00",
+    })
+    candidates = [
+        {"title": "Overlaps", "time_zone": "UTC",
+         "start_time": "2025-03-03T10:30:00", "end_time": "2025-03-03T11:30:00"},
+        {"title": "Free", "time_zone": "UTC",
+         "start_time": "2025-03-03T11:00:00", "end_time": "2025-03-03T12:00:00"},
+        {"title": "Daily", "time_zone": "UTC", "is_recurring": True,
+         "recurrence_pattern": "DAILY", "recurrence_count": 5,
+         "start_time": "2025-03-01T10:45:00", "end_time": "2025-03-01T11:15:00"},
+    ]
+    requests_before = server.state.request_count
+
+    first = client.post("/conflicts", json={"events": candidates}).json()
+    second = client.post("/conflicts", json={"events": candidates[:1]}).json()
+
+    assert [conflict["title"] for conflict in first["conflicts"]] == ["Overlaps", "Daily"]
+    assert not first["cached"] and second["cached"]
+    assert server.state.request_count - requests_before == 1
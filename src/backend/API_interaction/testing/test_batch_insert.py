@@ -0,0 +1,49 @@
+from google.oauth2.credentials import Credentials
+
+import API_interaction.calendar_service as calendar_service
+import API_interaction.gc_event_adder as gc
+
+
+def make_event(index, valid=True):
+    return {
+        "title": f"Lecture {index}",
+        "description": "Intro to PDEs",
+        "start_time": "2025-03-03T10:00:00",
+        "end_time": "2025-03-03T11:00:00" if valid else "2025-03-03T09:00:00",
+    }
+
+
+def test_insert_events_batch_splits_and_reports_each_item(server):
+    cache = calendar_service.CalendarServiceCache(root_url=server.url)
+    service = cache.get(Credentials(token="token"))
+    events = [
+        gc.format_event(gc.EventRequest(**make_event(index, valid=index != 70)))
+        for index in range(120)
+    ]
+
+    results = gc.insert_events_batch(service, events)
+
+    assert [result["index"] for result in results] == list(range(120))
+    assert results[70]["status"] == "failed" and results[70]["statusCode"] == 400
+    assert sum(result["status"] == "created" for result in results) == 119
+    assert len(server.state.calendars["primary"]) == 119
+
+
+def test_add_events_endpoint_partial_failure(client, server):
+    response = client.post("/add-events", json={"events": [make_event(0), make_event(1, valid=False)]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (1, 1)
+    assert body["results"][0]["eventId"] in server.state.calendars["primary"]
+    assert "time range is empty" in body["results"][1]["error"]
+
+
+def test_add_events_rejects_empty_list(client):
+    assert client.post("/add-events", json={"events": []}).status_code == 422
+
+
+def test_add_events_reuses_the_cached_service(client):
+    for index in range(2):
+        assert client.post("/add-events", json={"events": [make_event(index)]}).status_code == 200
+    assert calendar_service.service_cache.stats() == {"size": 1, "hits": 1, "misses": 1}
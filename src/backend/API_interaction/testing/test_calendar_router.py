@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+from google.oauth2.credentials import Credentials
+
+import API_interaction.async_calendar_client as async_calendar_client
+import API_interaction.gc_event_adder as gc
+import main
+from API_interaction.async_calendar_client import AsyncCalendarClient
+from API_interaction.testing.fake_calendar_server import FakeCalendarServer
+
+
+def test_main_app_serves_calendar_endpoints_and_closes_pools(monkeypatch):
+    with FakeCalendarServer() as server:
+        monkeypatch.setattr(async_calendar_client, "_client", AsyncCalendarClient(root_url=server.url, http2=False))
+        main.app.dependency_overrides[gc.require_auth] = lambda: Credentials(token="token", refresh_token="refresh")
+        try:
+            with TestClient(main.app) as client:
+                assert client.get("/calendar/health").json()["status"] == "healthy"
+                response = client.post("/calendar/add-event", json={
+                    "title": "Seminar", "description": "",
+                    "start_time": "2025-03-03T10:00:00", "end_time": "2025-03-03T11:00:00",
+                })
+                assert response.status_code == 200
+                assert response.json()["eventId"] in server.state.calendars["primary"]
+        finally:
+            main.app.dependency_overrides.clear()
+
+    # the main app's lifespan shut the shared Calendar client down
+    assert async_calendar_client._client is None
+
+
+def test_calendar_routes_do_not_shadow_main_routes():
+    client = TestClient(main.app)
+    assert "Calendarize" in client.get("/").json()["message"]
+    assert client.get("/calendar/").json()["api"] == "Google Calendar Integration API"
@@ -0,0 +1,64 @@
+import threading
+
+from google.oauth2.credentials import Credentials
+
+from API_interaction.calendar_service import CalendarServiceCache
+
+
+def make_credentials(user, token="token"):
+    return Credentials(token=f"{token}-{user}", refresh_token=f"refresh-{user}")
+
+
+def test_service_is_reused_per_user():
+    cache = CalendarServiceCache(max_size=4)
+    service = cache.get(make_credentials(1))
+    assert cache.get(make_credentials(1)) is service
+    assert cache.get(make_credentials(2)) is not service
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 2}
+
+
+def test_refreshed_token_is_used_by_cached_service():
+    cache = CalendarServiceCache()
+    service = cache.get(make_credentials(1))
+    refreshed = make_credentials(1, token="refreshed")
+    assert cache.get(refreshed) is service
+    assert service._http.credentials is refreshed
+
+
+def test_least_recently_used_is_evicted():
+    cache = CalendarServiceCache(max_size=2)
+    first = cache.get(make_credentials(1))
+    cache.get(make_credentials(2))
+    cache.get(make_credentials(1))
+    cache.get(make_credentials(3))  # evicts user 2
+    assert cache.get(make_credentials(1)) is first
+    assert cache.stats()["size"] == 2
+    cache.get(make_credentials(2))
+    assert cache.stats()["misses"] == 4
+
+
+def test_idle_entries_expire():
+    cache = CalendarServiceCache(ttl=-1)
+    service = cache.get(make_credentials(1))
+    assert cache.get(make_credentials(1)) is not service
+
+
+def test_lease_is_exclusive_per_user():
+    cache = CalendarServiceCache()
+    entered = {user: threading.Event() for user in (1, 2)}
+
+    def lease(user):
+        with cache.lease(make_credentials(user)):
+            entered[user].set()
+
+    with cache.lease(make_credentials(1)) as (service, http):
+        assert cache.get(make_credentials(1)) is service
+        assert service._http is http
+        threads = [threading.Thread(target=lease, args=(user,)) for user in (1, 2)]
+        for thread in threads:
+            thread.start()
+        assert entered[2].wait(5)
+        assert not entered[1].wait(0.1)
+    for thread in threads:
+        thread.join(5)
+    assert entered[1].is_set()
@@ -0,0 +1,150 @@
+import asyncio
+import base64
+import json
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from google.oauth2.credentials import Credentials
+
+import API_interaction.gc_event_adder as gc
+from API_interaction.calendar_service import account_key, credential_key
+from API_interaction.session_store import SESSION_COOKIE, CredentialSessionStore
+
+EVENT = {
+    "title": "Dentist",
+    "description": "Checkup",
+    "start_time": "2025-03-15T10:00:00",
+    "end_time": "2025-03-15T11:00:00",
+}
+
+
+def test_event_id_is_deterministic_and_valid():
+    calendar_event = gc.format_event(gc.EventRequest(**EVENT))
+    event_id = gc.make_event_id(calendar_event, "user-a")
+
+    assert re.fullmatch(r"[a-v0-9]{5,1024}", event_id)
+    assert gc.make_event_id(dict(reversed(list(calendar_event.items()))), "user-a") == event_id
+    assert gc.make_event_id(calendar_event, "user-b") != event_id
+    assert gc.make_event_id({**calendar_event, "summary": "Doctor"}, "user-a") != event_id
+
+
+def test_account_key_survives_new_refresh_tokens():
+    first_login = Credentials(token="a", refresh_token="r1", account="sub-1")
+    next_login = Credentials(token="b", refresh_token="r2", account="sub-1")
+    other_user = Credentials(token="c", refresh_token="r3", account="sub-2")
+
+    assert account_key(first_login) == account_key(next_login) != account_key(other_user)
+    # sessions stored before the account was known keep their old key
+    legacy = Credentials(token="a", refresh_token="r1")
+    assert account_key(legacy) == credential_key(legacy)
+
+
+def login_credentials(expires_in=3600):
+    """Credentials as /callback gets them from the token endpoint"""
+    def part(value):
+        return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+    id_token = ".".join([part({"alg": "RS256"}), part({"sub": "1234", "email": "a@example.com"}), "c2ln"])
+    return Credentials(
+        token="old-token", refresh_token="r1", id_token=id_token, client_id="client", client_secret="secret",
+        token_uri="https://oauth2.googleapis.com/token", expiry=datetime.utcnow() + timedelta(seconds=expires_in),
+    )
+
+
+def refresh(credentials):
+    credentials.token = "new-token"
+    credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+def test_login_stores_the_openid_subject():
+    login = login_credentials()
+    credentials = gc.with_account_id(login)
+
+    assert credentials.account == "1234"
+    assert credentials.expiry == login.expiry and credentials.id_token == login.id_token
+    # the session keeps it across restarts and refreshes
+    stored = Credentials.from_authorized_user_info(json.loads(credentials.to_json()))
+    assert account_key(stored) == account_key(credentials)
+
+
+def test_expired_login_session_is_refreshed():
+    async def scenario():
+        store = CredentialSessionStore(refresh=refresh)
+        on_request = await store.create(gc.with_account_id(login_credentials(expires_in=-10)))
+        in_background = await store.create(gc.with_account_id(login_credentials(expires_in=-10)))
+
+        assert (await store.get_credentials(on_request)).token == "new-token"
+        await store.refresh_expiring()
+        assert store._credentials[in_background].token == "new-token"
+
+    asyncio.run(scenario())
+
+
+def test_check_auth_reports_the_logged_in_account(monkeypatch):
+    store = CredentialSessionStore(refresh=refresh)
+    monkeypatch.setattr(gc, "_session_store", store)
+    session_id = asyncio.run(store.create(gc.with_account_id(login_credentials())))
+
+    client = TestClient(gc.app)
+    client.cookies.set(SESSION_COOKIE, session_id)
+    response = client.get("/check-auth")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "authenticated"
+    assert response.json()["email"] == "a@example.com"
+    assert response.json()["expires"]
+
+
+@pytest.mark.parametrize("client", [{"credentials": Credentials(token="b", refresh_token="r2", account="sub-1")}], indirect=True)
+def test_event_id_is_the_same_after_logging_in_again(client):
+    first_login = Credentials(token="a", refresh_token="r1", account="sub-1")
+    expected = gc.make_event_id(gc.format_event(gc.EventRequest(**EVENT)), account_key(first_login))
+
+    assert client.post("/add-event", json=EVENT).json()["eventId"] == expected
+
+
+def test_retried_add_event_does_not_duplicate(client, server):
+    first = client.post("/add-event", json=EVENT)
+    retry = client.post("/add-event", json=EVENT)
+
+    assert first.status_code == retry.status_code == 200
+    assert first.json()["eventId"] == retry.json()["eventId"]
+    assert retry.json()["message"] == "Event already exists"
+    assert len(server.state.calendars["primary"]) == 1
+
+
+def test_resent_batch_reports_existing_events(client, server):
+    events = [{**EVENT, "title": f"Lecture {index}"} for index in range(3)]
+    client.post("/add-event", json=events[0])
+
+    body = client.post("/add-events", json={"events": events}).json()
+
+    assert [result["status"] for result in body["results"]] == ["exists", "created", "created"]
+    assert (body["created"], body["failed"]) == (3, 0)
+    assert len(server.state.calendars["primary"]) == 3
+
+
+def test_deleted_event_is_restored_when_added_again(client, server):
+    event_id = client.post("/add-event", json=EVENT).json()["eventId"]
+    assert client.delete(f"/delete-event/{event_id}").status_code == 200
+
+    again = client.post("/add-event", json=EVENT)
+
+    assert again.status_code == 200
+    assert again.json()["eventId"] == event_id
+    assert again.json()["message"].startswith("Event created")
+    assert server.state.calendars["primary"][event_id]["status"] == "confirmed"
+
+
+def test_resent_batch_restores_deleted_events(client, server):
+    events = [{**EVENT, "title": f"Lecture {index}"} for index in range(3)]
+    first = client.post("/add-events", json={"events": events}).json()
+    client.delete(f"/delete-event/{first['results'][1]['eventId']}")
+
+    body = client.post("/add-events", json={"events": events}).json()
+
+    assert [result["status"] for result in body["results"]] == ["exists", "restored", "exists"]
+    assert (body["created"], body["failed"]) == (3, 0)
+    assert len(server.state.calendars["primary"]) == 3
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+import API_interaction.gc_event_adder as gc
+from API_interaction.async_calendar_client import AsyncCalendarClient
+from API_interaction.event_index import CalendarSync, EventIndex, event_key
+from API_interaction.testing.fake_calendar_server import FakeCalendarServer
+from event_generation.config.settings import get_settings
+from event_generation.event.event import Event
+
+CREDENTIALS = Credentials(token="token", refresh_token="refresh")
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+DAY = (datetime.now() + timedelta(days=7)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+
+def calendar_event(event_id, title, hour):
+    return {
+        "id": event_id,
+        "summary": title,
+        "start": {"dateTime": (DAY + timedelta(hours=hour)).isoformat(), "timeZone": "America/Los_Angeles"},
+        "end": {"dateTime": (DAY + timedelta(hours=hour + 1)).isoformat(), "timeZone": "America/Los_Angeles"},
+    }
+
+
+def parsed_event(title, hour):
+    return Event(title=title, time_zone="America/Los_Angeles",
+                 start_time=DAY + timedelta(hours=hour), end_time=DAY + timedelta(hours=hour + 1))
+
+
+@pytest.fixture
+def setup():
+    with FakeCalendarServer() as server:
+        async def run(coroutine_factory):
+            client = AsyncCalendarClient(root_url=server.url, http2=False)
+            try:
+                return await coroutine_factory(client)
+            finally:
+                await client.aclose()
+        yield server, lambda factory: asyncio.run(run(factory))
+
+
+def insert(server, *events):
+    for event in events:
+        server.state.insert_event("primary", json.dumps(event).encode())
+
+
+def test_incremental_sync_only_fetches_changes(setup):
+    server, run = setup
+    index = EventIndex(":memory:")
+    insert(server, calendar_event("a1", "Standup", 0), calendar_event("b1", "Lecture", 2))
+
+    def sync(client):
+        return CalendarSync(index, client, min_interval=0).sync(CREDENTIALS)
+
+    assert run(sync) == "full"
+    user_key = gc.account_key(CREDENTIALS)
+    assert index.count(user_key) == 2
+
+    insert(server, calendar_event("c1", "Lab", 4))
+    server.state.delete_event("primary", "a1")
+    requests_before = server.state.request_count
+    assert run(sync) == "incremental"
+    assert server.state.request_count - requests_before == 1
+    lab, standup = event_key(parsed_event("Lab", 4)), event_key(parsed_event("Standup", 0))
+    assert index.find(user_key, [lab, standup]) == {lab: "c1"}
+
+
+def test_expired_sync_token_triggers_full_resync(setup):
+    server, run = setup
+    index = EventIndex(":memory:")
+    insert(server, calendar_event("a1", "Standup", 0))
+
+    def sync(client):
+        return CalendarSync(index, client, min_interval=0).sync(CREDENTIALS)
+
+    run(sync)
+    server.state.expire_sync_tokens()
+    insert(server, calendar_event("b1", "Lecture", 2))
+    assert run(sync) == "full"
+    assert index.count(gc.account_key(CREDENTIALS)) == 2
+
+
+def test_recent_sync_is_skipped_until_marked_stale(setup):
+    server, run = setup
+    index = EventIndex(":memory:")
+
+    def sync(client):
+        return CalendarSync(index, client, min_interval=60).sync(CREDENTIALS)
+
+    assert run(sync) == "full"
+    assert run(sync) == "skipped"
+    index.mark_stale(gc.account_key(CREDENTIALS))
+    assert run(sync) == "incremental"
+
+
+def test_duplicates_match_across_time_zones(setup):
+    server, run = setup
+    index = EventIndex(":memory:")
+    insert(server, calendar_event("a1", "Office  Hours", 0))
+    # same instant as 10:00 in Los Angeles
+    start = DAY.replace(tzinfo=ZoneInfo("America/Los_Angeles")).astimezone(ZoneInfo("America/New_York"))
+    candidates = [
+        Event(title="office hours", time_zone="America/New_York",
+              start_time=start.replace(tzinfo=None), end_time=(start + timedelta(hours=1)).replace(tzinfo=None)),
+        parsed_event("Office Hours", 1),
+    ]
+
+    found, mode = run(lambda client: CalendarSync(index, client).find_duplicates(CREDENTIALS, candidates))
+
+    assert mode == "full"
+    assert found == [{"index": 0, "title": "office hours", "eventId": "a1"}]
+
+
+class ThreadRecordingIndex(EventIndex):
+    """EventIndex that remembers which threads its SQLite methods ran on"""
+
+    def __init__(self):
+        super().__init__(":memory:")
+        self.threads = set()
+
+    def sync_state(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().sync_state(*args, **kwargs)
+
+    def apply(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().apply(*args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().find(*args, **kwargs)
+
+
+def test_sync_keeps_sqlite_off_the_event_loop(setup):
+    server, run = setup
+    index = ThreadRecordingIndex()
+    insert(server, calendar_event("a1", "Standup", 0))
+
+    async def find(client):
+        found = await CalendarSync(index, client).find_duplicates(CREDENTIALS, [parsed_event("Standup", 0)])
+        return found, threading.get_ident()
+
+    (found, mode), loop_thread = run(find)
+
+    assert mode == "full" and len(found) == 1
+    assert index.threads and loop_thread not in index.threads
+
+
+def test_duplicates_endpoint_sees_events_added_through_the_api(client):
+    candidate = {"title": "Seminar", "time_zone": get_settings().timezone,
+                 "start_time": DAY.isoformat(), "end_time": (DAY + timedelta(hours=1)).isoformat()}
+
+    first = client.post("/duplicates", json={"events": [candidate]}).json()
+    created = client.post("/add-event", json={
+        "title": "Seminar", "description": "",
+        "start_time": candidate["start_time"], "end_time": candidate["end_time"],
+    }).json()
+    second = client.post("/duplicates", json={"events": [candidate]}).json()
+
+    assert first["duplicates"] == [] and first["sync"] == "full"
+    assert second["sync"] == "incremental"
+    assert second["duplicates"] == [{"index": 0, "title": "Seminar", "eventId": created["eventId"]}]
+
+
+def test_importing_the_app_creates_no_files(tmp_path):
+    environment = {**os.environ, "EVENT_INDEX_PATH": str(tmp_path / "events.db"),
+                   "SESSION_STORE": "sqlite", "SESSION_DB_PATH": str(tmp_path / "sessions.db")}
+    subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, env=environment, check=True)
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+from API_interaction.async_calendar_client import AsyncCalendarClient, CalendarApiError
+from API_interaction.session_store import refresh_credentials
+from API_interaction.testing.fake_calendar_server import FakeCalendarConfig, FakeCalendarServer
+
+EVENT = {
+    "summary": "Lecture",
+    "start": {"dateTime": "2025-03-03T10:00:00", "timeZone": "UTC"},
+    "end": {"dateTime": "2025-03-03T11:00:00", "timeZone": "UTC"},
+}
+
+
+def insert(server, token="token"):
+    async def run():
+        client = AsyncCalendarClient(root_url=server.url)
+        try:
+            return await client.insert_event(Credentials(token=token), EVENT)
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def test_requires_bearer_token():
+    with FakeCalendarServer() as server:
+        response = httpx.post(server.url + "calendar/v3/calendars/primary/events", json=EVENT)
+        assert response.status_code == 401
+        assert server.state.calendars == {}
+
+
+def test_latency_is_added_per_request():
+    with FakeCalendarServer(config=FakeCalendarConfig(latency_ms=50)) as server:
+        started = time.perf_counter()
+        insert(server)
+        assert time.perf_counter() - started >= 0.05
+
+
+def test_error_injection():
+    config = FakeCalendarConfig(error_rate=1.0, error_status=503)
+    with FakeCalendarServer(config=config) as server:
+        with pytest.raises(CalendarApiError) as error:
+            insert(server)
+        assert error.value.status_code == 503
+        assert server.state.stats()["errors"] == 1
+
+        server.state.config.error_rate = 0
+        server.state.fail_next(status=500)
+        with pytest.raises(CalendarApiError) as error:
+            insert(server)
+        assert error.value.status_code == 500
+        assert insert(server)["status"] == "confirmed"
+
+
+def test_quota_is_per_token():
+    with FakeCalendarServer(config=FakeCalendarConfig(quota_per_minute=2)) as server:
+        insert(server, "alice")
+        insert(server, "alice")
+        with pytest.raises(CalendarApiError) as error:
+            insert(server, "alice")
+        assert (error.value.status_code, error.value.reason) == (429, "rateLimitExceeded")
+        insert(server, "bob")
+        assert server.state.throttled_count == 1
+
+
+def test_token_refresh():
+    with FakeCalendarServer() as server:
+        credentials = Credentials(
+            token=None,
+            refresh_token="refresh",
+            client_id="client",
+            client_secret="secret",
+            token_uri=server.token_uri,
+        )
+        refresh_credentials(credentials)
+        assert credentials.token.startswith("fake-") and credentials.expiry is not None
+        assert insert(server, credentials.token)["status"] == "confirmed"
+
+        server.state.revoked_refresh_tokens.add("refresh")
+        with pytest.raises(RefreshError):
+            refresh_credentials(credentials)
+
+
+def test_admin_endpoints():
+    with FakeCalendarServer() as server:
+        insert(server)
+        stats = httpx.post(server.url + "_fake/config", json={"latency_ms": 5, "unknown": 1}).json()
+        assert stats["config"]["latency_ms"] == 5
+        assert stats["events"] == 1
+
+        httpx.post(server.url + "_fake/reset")
+        assert httpx.get(server.url + "_fake/stats").json()["events"] == 0
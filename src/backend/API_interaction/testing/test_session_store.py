@@ -0,0 +1,139 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+from API_interaction.session_store import CredentialSessionStore, MemorySessionBackend, SQLiteSessionBackend
+
+
+def make_credentials(expires_in):
+    return Credentials(
+        token="old-token",
+        refresh_token="refresh",
+        client_id="client",
+        client_secret="secret",
+        token_uri="https://oauth2.googleapis.com/token",
+        expiry=datetime.utcnow() + timedelta(seconds=expires_in),
+    )
+
+
+class CountingRefresh:
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+
+    def __call__(self, credentials):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        credentials.token = f"new-token-{self.calls}"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    return MemorySessionBackend()
+
+
+def test_credentials_are_cached_per_session(backend):
+    async def scenario():
+        store = CredentialSessionStore(backend, refresh=CountingRefresh())
+        session_id = await store.create(make_credentials(3600))
+        first = await store.get_credentials(session_id)
+        assert await store.get_credentials(session_id) is first
+        assert await store.get_credentials("unknown") is None
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_requests_refresh_once(backend):
+    async def scenario():
+        refresh = CountingRefresh()
+        store = CredentialSessionStore(backend, refresh=refresh)
+        session_id = await store.create(make_credentials(60))  # inside the refresh margin
+        results = await asyncio.gather(*(store.get_credentials(session_id) for _ in range(20)))
+        assert refresh.calls == 1
+        assert {credentials.token for credentials in results} == {"new-token-1"}
+
+        # a fresh store (e.g. another worker) loads the refreshed token from the backend
+        other = CredentialSessionStore(backend, refresh=refresh)
+        assert (await other.get_credentials(session_id)).token == "new-token-1"
+
+    asyncio.run(scenario())
+
+
+def test_background_pass_refreshes_before_expiry(backend):
+    async def scenario():
+        refresh = CountingRefresh()
+        store = CredentialSessionStore(backend, refresh=refresh, refresh_margin=600)
+        expiring = await store.create(make_credentials(300))
+        await store.create(make_credentials(3600))
+        await store.refresh_expiring()
+        assert refresh.calls == 1
+        assert store._credentials[expiring].token == "new-token-1"
+
+    asyncio.run(scenario())
+
+
+def test_background_pass_leaves_idle_sessions_to_the_next_request(backend):
+    async def scenario():
+        refresh = CountingRefresh()
+        store = CredentialSessionStore(backend, refresh=refresh, refresh_margin=600, refresh_window=7200)
+        idle = await store.create(make_credentials(300))
+        store._last_used[idle] -= 3 * 3600
+        await store.refresh_expiring()
+        assert refresh.calls == 0
+        assert idle not in store._credentials
+
+        assert (await store.get_credentials(idle)).token == "new-token-1"
+
+    asyncio.run(scenario())
+
+
+def test_sessions_are_purged_by_last_use(backend, monkeypatch):
+    async def scenario():
+        store = CredentialSessionStore(backend, refresh=CountingRefresh(), max_age=3600)
+        used = await store.create(make_credentials(3600))
+        unused = await store.create(make_credentials(3600))
+        store._forget(unused)
+
+        saved = time.time()
+        monkeypatch.setattr(time, "time", lambda: saved + 3000)
+        await store.get_credentials(used)
+        await store.refresh_expiring()  # records the use
+        monkeypatch.setattr(time, "time", lambda: saved + 4000)
+        await store.refresh_expiring()
+
+        assert backend.load(used) is not None
+        assert backend.load(unused) is None
+
+    asyncio.run(scenario())
+
+
+def test_unknown_expiry_is_refreshed(backend):
+    async def scenario():
+        refresh = CountingRefresh()
+        store = CredentialSessionStore(backend, refresh=refresh)
+        credentials = make_credentials(3600)
+        credentials.expiry = None
+        session_id = await store.create(credentials)
+
+        assert (await store.get_credentials(session_id)).token == "new-token-1"
+        assert refresh.calls == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_ends_session(backend):
+    async def scenario():
+        store = CredentialSessionStore(backend, refresh=CountingRefresh(RefreshError("revoked")))
+        session_id = await store.create(make_credentials(-10))
+        assert await store.get_credentials(session_id) is None
+        assert backend.load(session_id) is None
+
+    asyncio.run(scenario())
@@ -2,6 +2,8 @@ from dotenv import load_dotenv
 import os
 from pathlib import Path
 
+from event_generation.config.settings import get_settings
+
 
 def load_environment():
     """Load environment variables from .env file"""
@@ -16,9 +18,10 @@ def load_environment():
     return os.environ
 
 
+# The getters read the cached settings (see settings.py) instead of re-reading .env on every call
+
 def get_openai_key():
-    load_environment()
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = get_settings().openai_api_key
     if not api_key:
         raise ValueError(
             "API key not found. Make sure you have a .env file with "
@@ -28,8 +31,7 @@ def get_openai_key():
 
 
 def get_gemini_key():
-    load_environment()
-    api_key = os.getenv("GEMINI_API_KEY")
+    api_key = get_settings().gemini_api_key
     if not api_key:
         raise ValueError(
             "API key not found. Make sure you have a .env file with "
@@ -39,8 +41,7 @@ def get_gemini_key():
 
 
 def get_model():
-    load_environment()
-    model = os.getenv("MODEL")
+    model = get_settings().model
     if not model:
         raise ValueError(
             "Model not found. Make sure you have a .env file with "
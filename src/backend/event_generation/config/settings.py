@@ -0,0 +1,208 @@
+"""
+Application settings, loaded once
+config/.env and the process environment (which wins) are read into an immutable Settings
+object at first use. Handlers take a reference with get_settings() and keep using it for
+the whole request; reload_settings() (also run on SIGHUP) builds a new object and swaps it
+in atomically, so running requests never see a half-updated configuration.
+
+Everything else is read from get_settings() when it is used, so a reload takes effect on
+the next request. The keys in RESTART_REQUIRED are the exception: they size or locate
+long-lived resources (connection pools, caches, SQLite files, the log and trace writers,
+CORS) that are built once per process, and reload_settings() warns when one of them changed.
+"""
+import logging
+import os
+import signal
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping, Optional
+
+from dotenv import dotenv_values
+
+logger = logging.getLogger(__name__)
+
+DOTENV_PATH = Path(__file__).resolve().parent / '.env'
+
+
+# read once when the resource they configure is built, changing them needs a restart
+RESTART_REQUIRED = frozenset({
+    "frontend_url",  # CORS allow_origins
+    "google_max_connections", "google_max_keepalive_connections",  # Calendar connection pool
+    "service_cache_size", "busy_cache_size",
+    "session_store", "session_db_path", "event_index_path",
+    "log_level", "log_levels", "log_format", "log_queue_size",
+    "trace_exporter", "trace_file", "trace_file_max_bytes", "trace_file_backups", "trace_otlp_endpoint",
+    "profile_max_concurrent",
+    "warmup_time_zones", "warmup_connections", "warmup_timeout",  # startup warm-up runs once
+})
+
+
+@dataclass(frozen=True)
+class Settings:
+    # LLM providers
+    model: Optional[str] = None  # provider to use: "gemini" or "openai"
+    gemini_api_key: Optional[str] = None
+    openai_api_key: Optional[str] = None
+    gemini_model: str = "gemini-2.0-flash-lite"
+    openai_model: str = "gpt-4o-mini"
+    provider_timeout: float = 60.0  # seconds per provider call
+    token_prices: str = ""  # USD per million tokens, "model=input/output,...", see monitoring/usage.py
+    gemini_base_url: Optional[str] = None  # e.g. a local fake API, see testing/fake_llm_server.py
+    openai_base_url: Optional[str] = None
+
+    # Google Calendar
+    env: str = "development"
+    frontend_url: str = "http://localhost:3000"
+    callback_url: Optional[str] = None
+    timezone: str = "America/Los_Angeles"
+    google_api_root_url: Optional[str] = None
+    google_token_uri: Optional[str] = None
+    google_http_timeout: int = 30
+    google_max_connections: int = 100
+    google_max_keepalive_connections: int = 20
+    max_events_per_request: int = 500
+
+    # caches
+    service_cache_size: int = 256
+    service_cache_ttl: int = 1800
+    busy_cache_ttl: int = 60
+    busy_cache_size: int = 1024
+
+    # sessions and sync
+    session_store: str = "memory"
+    session_db_path: Optional[str] = None
+    session_max_age: int = 30 * 24 * 3600
+    token_refresh_margin: int = 300
+    token_refresh_interval: int = 60
+    token_refresh_window: int = 2 * 3600  # only sessions used this recently are refreshed in the background
+    event_index_path: Optional[str] = None
+    sync_lookback_days: int = 1
+    sync_min_interval: float = 30.0
+    conflict_horizon_days: int = 90
+    conflict_max_occurrences: int = 100
+
+    # startup warm-up, see event_generation/warmup.py
+    warmup_connections: bool = True  # open provider and Google connections before reporting ready
+    warmup_timeout: float = 10.0  # seconds per warm-up step
+    warmup_time_zones: str = "America/Los_Angeles,America/New_York,America/Chicago,America/Denver,Europe/London,UTC"
+
+    # logging, see event_generation/monitoring/logs.py
+    log_level: str = "INFO"
+    log_levels: str = "httpx=WARNING"  # per-logger overrides: "name=LEVEL,name=LEVEL"
+    log_format: str = "json"  # "json" or "text"
+    log_queue_size: int = 10000  # records waiting for the writer thread; more are dropped
+    log_payload_sample_rate: float = 0.01  # share of DEBUG payload logs that are written
+    log_redact: bool = True  # hash user content in payload logs
+
+    # admin-only request options, disabled while unset (sent as the X-Admin-Token header)
+    admin_token: Optional[str] = None
+
+    # on-demand profiling of /convert?profile=1, see event_generation/monitoring/profiling.py
+    profile_dir: str = "profiles"
+    profile_max_concurrent: int = 1
+    profile_interval: float = 0.001  # seconds between stack samples of the collapsed format
+
+    # request tracing, see event_generation/monitoring/tracing.py
+    tracing: bool = False
+    trace_sample_rate: float = 0.05  # share of requests to trace_routes that get a trace
+    trace_routes: str = "/convert,/calendar/add-event,/add-event"
+    trace_exporter: str = "file"  # "file" or "otlp"
+    trace_file: str = "traces.jsonl"
+    trace_file_max_bytes: int = 10 * 1024 * 1024
+    trace_file_backups: int = 5
+    trace_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, dotenv_path: Optional[Path] = DOTENV_PATH) -> "Settings":
+        """
+        Build settings from a .env file overlaid with the environment
+
+        Args:
+            environ: Variables to read, defaults to os.environ
+            dotenv_path: .env file with defaults for unset variables, None to skip it
+
+        Returns:
+            The settings, each field read from its upper-cased name (GEMINI_API_KEY, SESSION_MAX_AGE, ...)
+        """
+        values = {}
+        if dotenv_path is not None and dotenv_path.exists():
+            values.update({key: value for key, value in dotenv_values(dotenv_path).items() if value is not None})
+        values.update(os.environ if environ is None else environ)
+
+        kwargs = {}
+        for name, field in cls.__dataclass_fields__.items():
+            raw = values.get(name.upper())
+            if raw is None or raw == "":
+                continue
+            # Optional[str] fields have a None default, everything else is typed by its default
+            kind = type(field.default) if field.default is not None else str
+            if kind is bool:
+                kwargs[name] = raw.strip().lower() in ("1", "true", "yes", "on")
+                continue
+            try:
+                kwargs[name] = kind(raw)
+            except ValueError:
+                raise ValueError(f"Invalid value for {name.upper()}: {raw!r}")
+        return cls(**kwargs)
+
+
+_settings: Optional[Settings] = None
+_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """The current settings, loaded on first use"""
+    settings = _settings
+    if settings is None:
+        with _lock:
+            if _settings is None:
+                _set(Settings.from_env())
+            settings = _settings
+    return settings
+
+
+def reload_settings() -> Settings:
+    """Re-read .env and the environment; a bad configuration keeps the previous settings"""
+    try:
+        settings = Settings.from_env()
+    except ValueError as e:
+        logger.error(f"Keeping previous settings, reload failed: {str(e)}")
+        return get_settings()
+    with _lock:
+        previous = _settings
+        _set(settings)
+    logger.info("Settings reloaded")
+    if previous is not None:
+        pending = sorted(name for name in RESTART_REQUIRED if getattr(previous, name) != getattr(settings, name))
+        if pending:
+            logger.warning(f"Changed settings only take effect after a restart: {', '.join(pending)}")
+    return settings
+
+
+def _set(settings: Settings):
+    global _settings
+    _settings = settings
+
+
+def install_reload_handler(loop=None) -> bool:
+    """
+    Reload settings on SIGHUP
+
+    Uses the event loop's signal handling when a loop is given, so the reload runs on the
+    loop between requests. Only possible in the main thread and where SIGHUP exists.
+
+    Returns:
+        Whether the handler was installed
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        if loop is not None:
+            loop.add_signal_handler(signal.SIGHUP, reload_settings)
+        else:
+            signal.signal(signal.SIGHUP, lambda signum, frame: reload_settings())
+    except (ValueError, RuntimeError, NotImplementedError) as e:
+        logger.debug(f"SIGHUP reload not installed: {str(e)}")
+        return False
+    return True
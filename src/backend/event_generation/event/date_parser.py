@@ -1,3 +1,6 @@
+import logging
+import re
+from collections import Counter
 from datetime import datetime
 from dateutil.parser import parse
 from icalendar import vRecur  # Calendar, Event as IcalEvent
@@ -5,14 +8,71 @@ from icalendar import vRecur  # Calendar, Event as IcalEvent
 # from event_generation.event.event import Event
 
 
+# The prompt asks the model for YYYYMMDDTHHMM00 / YYYYMMDD, so almost every
+# value we see matches one of these. Matching them with a precompiled regex and
+# building the datetime directly is much cheaper than dateutil's generic parser.
+_FIXED_FORMATS = (
+    # compact ISO: 20250220T170000, 20250220T1700
+    ("compact", re.compile(r"(\d{4})(\d{2})(\d{2})T(\d{2})(\d{2})(\d{2})?")),
+    # extended ISO: 2025-02-20T17:00:00, 2025-02-20 17:00
+    ("extended", re.compile(r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})(?::(\d{2}))?")),
+    # date only: 20250130, 2025-01-30
+    ("date", re.compile(r"(\d{4})-?(\d{2})-?(\d{2})")),
+)
+
+logger = logging.getLogger(__name__)
+
+# how many values each tier has handled, see get_parse_stats()
+_tier_counts = Counter()
+
+
+def _parse_fixed(text: str):
+    for _, pattern in _FIXED_FORMATS:
+        match = pattern.fullmatch(text)
+        if match:
+            return datetime(*(int(part) for part in match.groups() if part is not None))
+    return None
+
+
 def parse_datetime(text: str) -> datetime:
+    # Layered parser: fixed formats -> datetime.fromisoformat -> dateutil.
+    # Each tier falls through to the next one on a miss or an invalid value
+    # (e.g. month 13), so the result is never stricter than dateutil alone.
+    if isinstance(text, str):
+        stripped = text.strip()
+        try:
+            result = _parse_fixed(stripped)
+        except ValueError:
+            result = None
+        if result is not None:
+            _tier_counts["fixed"] += 1
+            return result
+
+        try:
+            result = datetime.fromisoformat(stripped)
+            _tier_counts["iso"] += 1
+            return result
+        except ValueError:
+            pass
+
+    _tier_counts["dateutil"] += 1
     try:
         return parse(text)
     except ValueError as ve:
-        print(f"Error parsing datetime: {ve}")
+        # the message quotes the value, which came from the user's input
+        logger.warning("Error parsing datetime", extra={"error": type(ve).__name__, "value_chars": len(str(text))})
         return None
 
 
+def get_parse_stats() -> dict:
+    """Returns how many values each parse_datetime tier has handled."""
+    return {tier: _tier_counts[tier] for tier in ("fixed", "iso", "dateutil")}
+
+
+def reset_parse_stats():
+    _tier_counts.clear()
+
+
 def parse_recurring_pattern(event) -> str:
     if event.is_recurring and event.recurrence_pattern:
         recurrence_rule = f"RRULE:FREQ={event.recurrence_pattern}"
@@ -8,6 +8,9 @@ from urllib.parse import quote
 from zoneinfo import ZoneInfo
 
 
+PRODID = "-//Calendarize//calendarize.tech//EN"
+
+
 def offset_to_timedelta(offset_str: str) -> timedelta:
     # Convert a string in the format '+HHMM' or '-HHMM' to a timedelta
     sign = 1 if offset_str[0] == '+' else -1
@@ -16,6 +19,47 @@ def offset_to_timedelta(offset_str: str) -> timedelta:
     return timedelta(hours=sign * hours, minutes=sign * minutes)
 
 
+def build_vtimezone(time_zone: str) -> Timezone:
+    # Create the VTIMEZONE component for the event's time zone (e.g. America/Los_Angeles)
+    tz = Timezone()
+    tz.add("tzid", time_zone)
+
+    # Get dynamic time zone info using ZoneInfo
+    tzinfo = ZoneInfo(time_zone)
+    # Representative dates: one for winter and one for summer
+    winter_dt = datetime(2021, 1, 1, 0, 0, 0, tzinfo=tzinfo)
+    summer_dt = datetime(2021, 7, 1, 0, 0, 0, tzinfo=tzinfo)
+
+    winter_offset = winter_dt.strftime('%z')  # e.g. "-0800"
+    summer_offset = summer_dt.strftime('%z')  # e.g. "-0700" if DST is observed
+
+    if winter_offset == summer_offset:
+        # Time zone does not observe DST; only a STANDARD block is needed.
+        tz_standard = TimezoneStandard()
+        tz_standard.add("dtstart", datetime(1970, 1, 1, 0, 0, 0))
+        tz_standard.add("tzoffsetfrom", offset_to_timedelta(winter_offset))
+        tz_standard.add("tzoffsetto", offset_to_timedelta(winter_offset))
+        tz_standard.add("tzname", winter_dt.tzname() or time_zone)
+        tz.add_component(tz_standard)
+    else:
+        # Time zone observes DST; add both STANDARD and DAYLIGHT blocks.
+        tz_standard = TimezoneStandard()
+        tz_standard.add("dtstart", datetime(1970, 1, 1, 0, 0, 0))
+        tz_standard.add("tzoffsetfrom", offset_to_timedelta(winter_offset))
+        tz_standard.add("tzoffsetto", offset_to_timedelta(winter_offset))
+        tz_standard.add("tzname", winter_dt.tzname() or time_zone)
+        tz.add_component(tz_standard)
+
+        tz_daylight = TimezoneDaylight()
+        tz_daylight.add("dtstart", datetime(1970, 7, 1, 0, 0, 0))
+        tz_daylight.add("tzoffsetfrom", offset_to_timedelta(winter_offset))
+        tz_daylight.add("tzoffsetto", offset_to_timedelta(summer_offset))
+        tz_daylight.add("tzname", summer_dt.tzname() or time_zone)
+        tz.add_component(tz_daylight)
+
+    return tz
+
+
 class Event(BaseModel):
     # pydantic model for event data
     # allows easy packing and unpacking into JSON
@@ -42,50 +86,7 @@ class Event(BaseModel):
     yahoo_link: Optional[str] = None
     ics: Optional[str] = None
 
-    def set_ical_string(self):
-        cal = Calendar()
-        cal.add("prodid", "-//Calendarize//calendarize.tech//EN")
-        cal.add("version", "2.0")
-
-        # Create the VTIMEZONE component for America/Los_Angeles
-        tz = Timezone()
-        tz.add("tzid", self.time_zone)
-
-        # Get dynamic time zone info using ZoneInfo
-        tzinfo = ZoneInfo(self.time_zone)
-        # Representative dates: one for winter and one for summer
-        winter_dt = datetime(2021, 1, 1, 0, 0, 0, tzinfo=tzinfo)
-        summer_dt = datetime(2021, 7, 1, 0, 0, 0, tzinfo=tzinfo)
-
-        winter_offset = winter_dt.strftime('%z')  # e.g. "-0800"
-        summer_offset = summer_dt.strftime('%z')  # e.g. "-0700" if DST is observed
-
-        if winter_offset == summer_offset:
-            # Time zone does not observe DST; only a STANDARD block is needed.
-            tz_standard = TimezoneStandard()
-            tz_standard.add("dtstart", datetime(1970, 1, 1, 0, 0, 0))
-            tz_standard.add("tzoffsetfrom", offset_to_timedelta(winter_offset))
-            tz_standard.add("tzoffsetto", offset_to_timedelta(winter_offset))
-            tz_standard.add("tzname", winter_dt.tzname() or self.time_zone)
-            tz.add_component(tz_standard)
-        else:
-            # Time zone observes DST; add both STANDARD and DAYLIGHT blocks.
-            tz_standard = TimezoneStandard()
-            tz_standard.add("dtstart", datetime(1970, 1, 1, 0, 0, 0))
-            tz_standard.add("tzoffsetfrom", offset_to_timedelta(winter_offset))
-            tz_standard.add("tzoffsetto", offset_to_timedelta(winter_offset))
-            tz_standard.add("tzname", winter_dt.tzname() or self.time_zone)
-            tz.add_component(tz_standard)
-
-            tz_daylight = TimezoneDaylight()
-            tz_daylight.add("dtstart", datetime(1970, 7, 1, 0, 0, 0))
-            tz_daylight.add("tzoffsetfrom", offset_to_timedelta(winter_offset))
-            tz_daylight.add("tzoffsetto", offset_to_timedelta(summer_offset))
-            tz_daylight.add("tzname", summer_dt.tzname() or self.time_zone)
-            tz.add_component(tz_daylight)
-
-        cal.add_component(tz)
-
+    def to_ical_event(self) -> IcalEvent:
         event = IcalEvent()  # Create an event object
 
         # Title
@@ -120,8 +121,17 @@ class Event(BaseModel):
         if rrule:
             event["RRULE"] = rrule
 
+        return event
+
+    def set_ical_string(self):
+        cal = Calendar()
+        cal.add("prodid", PRODID)
+        cal.add("version", "2.0")
+
+        cal.add_component(build_vtimezone(self.time_zone))
+
         # Add the event to the calendar
-        cal.add_component(event)
+        cal.add_component(self.to_ical_event())
 
         ical_str = cal.to_ical().decode('utf-8')
         self.ics = ical_str
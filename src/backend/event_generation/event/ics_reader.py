@@ -0,0 +1,223 @@
+import codecs
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from icalendar.prop import vDuration
+
+from event_generation.event.event import Event
+from event_generation.event.date_parser import parse_datetime
+
+# Streaming reader for existing .ics exports.
+# Calendar.from_ical() builds the whole component tree in memory, which is a problem
+# for exports that are tens of megabytes. This reader only ever holds one unfolded
+# line and the properties of the current VEVENT, and yields Event objects as it goes.
+
+CHUNK_SIZE = 64 * 1024
+
+# Upper bounds on what the reader buffers, in characters. A line that never ends (or is
+# folded forever) or a VEVENT without END:VEVENT would otherwise be held in memory whole.
+MAX_LINE_LENGTH = 1024 * 1024
+MAX_EVENT_SIZE = 4 * 1024 * 1024
+
+# (name, params, value) of a single content line
+ContentLine = Tuple[str, Dict[str, str], str]
+
+
+def iter_unfolded_lines(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE, max_line_length: int = MAX_LINE_LENGTH
+) -> Iterator[str]:
+    """
+    Yield logical lines from an .ics byte stream, joining folded continuation lines (RFC 5545 3.1).
+
+    Raises ValueError when a logical line grows past max_line_length characters.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""  # partial physical line at the end of the last chunk
+    current = None  # logical line being unfolded
+
+    while True:
+        chunk = stream.read(chunk_size)
+        text = pending + decoder.decode(chunk or b"", final=not chunk)
+        lines = text.split("\n")
+        pending = lines.pop() if chunk else ""
+        if len(pending) > max_line_length:
+            raise ValueError(f"Line longer than {max_line_length} characters")
+        if not chunk and lines and lines[-1] == "":
+            lines.pop()
+
+        for line in lines:
+            line = line.rstrip("\r")
+            if line[:1] in (" ", "\t"):
+                if current is not None:
+                    current += line[1:]
+                    if len(current) > max_line_length:
+                        raise ValueError(f"Line longer than {max_line_length} characters")
+                continue
+            if current:
+                yield current
+            if len(line) > max_line_length:
+                raise ValueError(f"Line longer than {max_line_length} characters")
+            current = line
+
+        if not chunk:
+            break
+
+    if current:
+        yield current
+
+
+def parse_content_line(line: str) -> ContentLine:
+    """Split 'NAME;PARAM=x;PARAM="a:b":value' into its parts, respecting quoted parameter values."""
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        raise ValueError(f"Invalid content line: {line[:80]}")
+
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw_param in raw_params:
+        key, _, param_value = raw_param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _unescape(value: str) -> str:
+    return (
+        value.replace("\\n", "\n").replace("\\N", "\n")
+        .replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+    )
+
+
+def _zone_name(params: Dict[str, str], value: str, default_tz: str) -> str:
+    if value.endswith("Z"):
+        return "UTC"
+    tzid = params.get("TZID")
+    if tzid:
+        try:
+            ZoneInfo(tzid)
+            return tzid
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return default_tz
+
+
+def _parse_value(params: Dict[str, str], value: str) -> Optional[datetime]:
+    if value.endswith("Z"):
+        parsed = parse_datetime(value[:-1])
+        return parsed.replace(tzinfo=timezone.utc) if parsed else None
+    return parse_datetime(value)
+
+
+def _apply_rrule(fields: dict, value: str):
+    parts = dict(part.partition("=")[::2] for part in value.split(";") if part)
+    fields["is_recurring"] = True
+    fields["recurrence_pattern"] = parts.get("FREQ", "").upper()
+    if parts.get("BYDAY"):
+        fields["recurrence_days"] = parts["BYDAY"].split(",")
+    if parts.get("COUNT", "").isdigit():
+        fields["recurrence_count"] = int(parts["COUNT"])
+    if parts.get("UNTIL"):
+        until = parse_datetime(parts["UNTIL"].rstrip("Z"))
+        if until:
+            fields["recurrence_end_date"] = until
+
+
+def build_event(properties: List[ContentLine], default_tz: str = "UTC") -> Optional[Event]:
+    """Build an Event from the content lines of a single VEVENT, or None if it has no start."""
+    fields = {}
+    attendees = []
+    duration = None
+
+    for name, params, value in properties:
+        if name == "SUMMARY":
+            fields["title"] = _unescape(value)
+        elif name == "DESCRIPTION":
+            fields["description"] = _unescape(value)
+        elif name == "LOCATION":
+            fields["location"] = _unescape(value)
+        elif name == "ATTENDEE":
+            attendees.append(value[7:] if value.lower().startswith("mailto:") else value)
+        elif name == "DTSTART":
+            fields["start_time"] = _parse_value(params, value)
+            fields["time_zone"] = _zone_name(params, value, default_tz)
+            fields["is_all_day"] = params.get("VALUE") == "DATE" or len(value) == 8
+        elif name == "DTEND":
+            fields["end_time"] = _parse_value(params, value)
+        elif name == "DURATION":
+            duration = vDuration.from_ical(value)
+        elif name == "RRULE":
+            _apply_rrule(fields, value)
+
+    if not fields.get("start_time"):
+        return None
+    if not fields.get("end_time"):
+        if duration is None:
+            duration = timedelta(days=1) if fields.get("is_all_day") else timedelta(0)
+        fields["end_time"] = fields["start_time"] + duration
+    if attendees:
+        fields["attendees"] = attendees
+    return Event(**fields)
+
+
+def iter_events(
+    stream: BinaryIO,
+    default_tz: str = "UTC",
+    chunk_size: int = CHUNK_SIZE,
+    max_line_length: int = MAX_LINE_LENGTH,
+    max_event_size: int = MAX_EVENT_SIZE,
+) -> Iterator[Event]:
+    """
+    Yield an Event for every VEVENT in an .ics byte stream
+
+    Args:
+        stream: A binary file-like object (e.g. UploadFile.file)
+        default_tz: Time zone for floating times and unknown TZIDs
+        chunk_size: Number of bytes read from the stream at a time
+        max_line_length: Longest unfolded line accepted, in characters
+        max_event_size: Largest VEVENT accepted (all its lines, sub-components included), in characters
+
+    Returns:
+        An iterator of Event objects, VEVENTs that can't be parsed are skipped
+
+    Raises:
+        ValueError: If a line or VEVENT is over its limit
+    """
+    properties = None  # content lines of the VEVENT we are inside, if any
+    depth = 0  # nesting of sub-components (e.g. VALARM) inside the VEVENT
+    size = 0  # characters read since BEGIN:VEVENT
+
+    for line in iter_unfolded_lines(stream, chunk_size, max_line_length):
+        upper = line.upper()
+        if upper == "BEGIN:VEVENT":
+            properties, depth, size = [], 0, 0
+            continue
+        if properties is None:
+            continue
+
+        size += len(line)
+        if size > max_event_size:
+            raise ValueError(f"VEVENT larger than {max_event_size} characters")
+        if upper.startswith("BEGIN:"):
+            depth += 1
+        elif upper.startswith("END:"):
+            if depth:
+                depth -= 1
+            elif upper == "END:VEVENT":
+                try:
+                    event = build_event(properties, default_tz)
+                except ValueError:
+                    event = None
+                properties = None
+                if event is not None:
+                    yield event
+        elif depth == 0:
+            try:
+                properties.append(parse_content_line(line))
+            except ValueError:
+                continue
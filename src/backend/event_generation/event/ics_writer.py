@@ -0,0 +1,55 @@
+from functools import lru_cache
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from event_generation.event.event import Event, PRODID, build_vtimezone
+
+# Incremental .ics writer for large exports.
+# Instead of building one Calendar (or one string per Event.ics) for every event,
+# the calendar text is produced piece by piece from a generator of events, so the
+# memory used stays the same no matter how many events are exported.
+
+CALENDAR_HEADER = f"BEGIN:VCALENDAR\r\nPRODID:{PRODID}\r\nVERSION:2.0\r\n"
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+# chunks handed to the response are roughly this size, so thousands of small
+# events don't turn into thousands of tiny writes
+CHUNK_SIZE = 64 * 1024
+
+
+def is_known_time_zone(time_zone: str) -> bool:
+    """Whether vtimezone_text can build the zone, check before streaming starts"""
+    try:
+        ZoneInfo(time_zone)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+
+@lru_cache(maxsize=64)
+def vtimezone_text(time_zone: str) -> str:
+    # the VTIMEZONE block only depends on the zone name
+    return build_vtimezone(time_zone).to_ical().decode("utf-8")
+
+
+def iter_calendar(events: Iterable[Event], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the text of a VCALENDAR containing every event, in chunks of about chunk_size characters."""
+    zones = set()
+    buffer = [CALENDAR_HEADER]
+    size = len(CALENDAR_HEADER)
+
+    for event in events:
+        # each VTIMEZONE is written the first time its zone is used
+        if event.time_zone not in zones:
+            zones.add(event.time_zone)
+            buffer.append(vtimezone_text(event.time_zone))
+            size += len(buffer[-1])
+        buffer.append(event.to_ical_event().to_ical().decode("utf-8"))
+        size += len(buffer[-1])
+
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+
+    buffer.append(CALENDAR_FOOTER)
+    yield "".join(buffer)
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice, takewhile
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrule, DAILY, WEEKLY, MONTHLY, YEARLY, MO, TU, WE, TH, FR, SA, SU
+
+# Expands an Event's recurrence fields (the same ones used to build the RRULE in
+# date_parser) into concrete occurrences, so users can check a series before import.
+
+FREQUENCIES = {"DAILY": DAILY, "WEEKLY": WEEKLY, "MONTHLY": MONTHLY, "YEARLY": YEARLY}
+WEEKDAYS = {"MO": MO, "TU": TU, "WE": WE, "TH": TH, "FR": FR, "SA": SA, "SU": SU}
+
+# default preview window when the caller does not give one
+DEFAULT_WINDOW = timedelta(days=365)
+
+
+def rule_key(event) -> Optional[tuple]:
+    """Hashable description of the event's recurrence, or None if it does not repeat."""
+    if not (event.is_recurring and event.recurrence_pattern):
+        return None
+    pattern = event.recurrence_pattern.upper()
+    if pattern not in FREQUENCIES:
+        raise ValueError(f"Unsupported recurrence pattern: {event.recurrence_pattern}")
+
+    days = None
+    if pattern == "WEEKLY" and event.recurrence_days:
+        try:
+            days = tuple(WEEKDAYS[day.upper()[:2]] for day in event.recurrence_days)
+        except KeyError as ke:
+            raise ValueError(f"Unsupported recurrence day: {ke.args[0]}")
+
+    until = None
+    if event.recurrence_end_date:
+        # UNTIL is written as a date (see parse_recurring_pattern), which covers the whole day
+        until = event.recurrence_end_date.replace(hour=23, minute=59, second=59, tzinfo=None)
+        if event.start_time.tzinfo:
+            until = until.replace(tzinfo=event.start_time.tzinfo)
+
+    return (pattern, days, event.recurrence_count, until, event.start_time)
+
+
+@lru_cache(maxsize=256)
+def _get_rule(key: tuple) -> rrule:
+    # rrule objects are immutable, so one instance is shared by every event with the same rule.
+    # cache=False keeps dateutil from storing every occurrence it has iterated over.
+    pattern, days, count, until, dtstart = key
+    return rrule(FREQUENCIES[pattern], dtstart=dtstart, byweekday=days, count=count, until=until, cache=False)
+
+
+@lru_cache(maxsize=1024)
+def _expand(key: tuple, duration: timedelta, start: datetime, end: datetime, limit: int) -> Tuple[tuple, bool]:
+    # Walks the rule lazily from the window start, so series with thousands of
+    # occurrences (or no end at all) are never materialized.
+    occurrences = takewhile(lambda dt: dt < end, _get_rule(key).xafter(start, inc=True))
+    window = tuple((dt, dt + duration) for dt in islice(occurrences, limit + 1))
+    return window[:limit], len(window) > limit
+
+
+def _align(value: datetime, reference: datetime, time_zone: str) -> datetime:
+    # rrule cannot compare naive and aware datetimes, so make the window match dtstart
+    if reference.tzinfo and not value.tzinfo:
+        return value.replace(tzinfo=reference.tzinfo)
+    if not reference.tzinfo and value.tzinfo:
+        try:
+            zone = ZoneInfo(time_zone)
+        except ZoneInfoNotFoundError:
+            # a KeyError otherwise, callers report ValueError as a bad request
+            raise ValueError(f"Unknown time zone: {time_zone}")
+        return value.astimezone(zone).replace(tzinfo=None)
+    return value
+
+
+def get_occurrences(
+    event,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+    limit: int = 100,
+) -> Tuple[List[Tuple[datetime, datetime]], bool]:
+    """
+    Get the occurrences of an event that start inside [window_start, window_end)
+
+    Args:
+        event: The Event to expand
+        window_start: Start of the window, defaults to the event's start time
+        window_end: End of the window, defaults to one year after window_start
+        limit: Maximum number of occurrences to return
+
+    Returns:
+        A list of (start, end) pairs and whether more occurrences exist in the window
+    """
+    window_start = _align(window_start or event.start_time, event.start_time, event.time_zone)
+    window_end = _align(window_end or window_start + DEFAULT_WINDOW, event.start_time, event.time_zone)
+    duration = max(event.end_time - event.start_time, timedelta(0))
+
+    key = rule_key(event)
+    if key is None:
+        if window_start <= event.start_time < window_end and limit > 0:
+            return [(event.start_time, event.start_time + duration)], False
+        return [], False
+
+    occurrences, truncated = _expand(key, duration, window_start, window_end, limit)
+    return list(occurrences), truncated
+
+
+def cache_info() -> dict:
+    return {"rules": _get_rule.cache_info()._asdict(), "windows": _expand.cache_info()._asdict()}
@@ -0,0 +1,13 @@
+"""
+Request timing, tracing and Prometheus metrics, see metrics.py, timing.py, tracing.py, usage.py and middleware.py
+"""
+from event_generation.monitoring.metrics import REGISTRY, cache_collector, counter, gauge, histogram
+from event_generation.monitoring.timing import current_timer, lap, stage
+from event_generation.monitoring.tracing import annotate, span
+
+# provider call failures, by provider and what went wrong
+PROVIDER_ERRORS = counter(
+    "calendarize_provider_errors_total",
+    "Failed LLM provider calls and unusable responses",
+    ("provider", "kind"),
+)
@@ -0,0 +1,204 @@
+"""
+Structured, non-blocking logging
+Request handlers only put records on a bounded queue (QueueHandler); a background
+QueueListener thread formats them as one JSON object per line and writes them out, so a
+slow stdout or log pipeline never stalls the event loop. When the queue is full the record
+is dropped and counted instead of blocking the request.
+
+User content (the submitted text, event titles, descriptions, ...) is only logged through
+log_payload(): at DEBUG level, for a sampled fraction of requests, and redacted to its
+length and a short hash unless LOG_REDACT is turned off.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
+
+from event_generation.config.settings import Settings, get_settings
+from event_generation.monitoring.metrics import counter
+from event_generation.monitoring.tracing import current_span
+
+DROPPED_RECORDS = counter(
+    "calendarize_log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+)
+
+# fields that hold what the user typed or uploaded, or is derived from it
+USER_CONTENT_FIELDS = frozenset({
+    "text", "title", "description", "location", "attendees", "image_path",
+    "ics", "gcal_link", "outlook_link", "yahoo_link", "error",
+})
+
+# attributes every LogRecord has; anything else was passed with extra= and is logged as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def redact(value: Any) -> Any:
+    """Replace user content with its size and a hash, so repeated inputs can still be matched up"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    value = _jsonable(value)
+    text = json.dumps(value, default=str) if isinstance(value, dict) else str(value)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+    return f"<redacted {len(text)} chars sha256:{digest}>"
+
+
+def redact_fields(value: Any) -> Any:
+    """Redact the user content fields of (nested) dicts and models, keep everything else"""
+    value = _jsonable(value)
+    if isinstance(value, dict):
+        return {key: redact(item) if key in USER_CONTENT_FIELDS else redact_fields(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_fields(item) for item in value]
+    return value
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return value
+
+
+def log_payload(logger: logging.Logger, message: str, settings: Optional[Settings] = None, **fields):
+    """
+    Log request or response payloads at DEBUG level for a sample of calls
+
+    Nothing is serialized unless DEBUG is enabled for the logger and the call is sampled,
+    so leaving these calls in the request path costs a level check.
+
+    Args:
+        logger: Logger to write to
+        message: Log message
+        settings: Sample rate and redaction switch, defaults to the current settings
+        **fields: Payload fields, e.g. text=..., event=...
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    settings = settings or get_settings()
+    if settings.log_payload_sample_rate <= 0 or random.random() >= settings.log_payload_sample_rate:
+        return
+    payload = redact_fields(fields) if settings.log_redact else {key: _jsonable(value) for key, value in fields.items()}
+    logger.debug(message, extra={"payload": payload})
+
+
+def error_fields(error: Exception) -> Dict[str, Any]:
+    """
+    Type and field locations of an error, for logging it without the values that caused it
+
+    Validation messages quote the offending input, so the message itself only goes to log_payload().
+    """
+    fields = {"error_type": type(error).__name__}
+    if hasattr(error, "errors"):
+        fields["error_locations"] = [".".join(str(part) for part in item["loc"]) for item in error.errors()]
+    return fields
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, extra fields and exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records on a full queue instead of blocking the caller"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = super().prepare(record)
+        # the writer thread can't see the request's context, so link traced requests here
+        current = current_span()
+        if current is not None:
+            record.trace_id = current.trace.trace_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED_RECORDS.inc()
+
+
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+def parse_levels(levels: str) -> Dict[str, str]:
+    """'httpx=WARNING,google_calendar_api=DEBUG' -> {logger name: level}"""
+    result = {}
+    for item in levels.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            result[name.strip()] = level.strip().upper()
+    return result
+
+
+def configure_logging(settings: Optional[Settings] = None, stream: Optional[TextIO] = None) -> QueueListener:
+    """
+    Route all logging through the background writer
+
+    Adds a DroppingQueueHandler to the root logger and starts the listener thread that
+    writes to `stream`. Calling it again only re-applies the levels.
+
+    Args:
+        settings: LOG_LEVEL, LOG_LEVELS, LOG_FORMAT and LOG_QUEUE_SIZE, defaults to the current settings
+        stream: Where records are written, defaults to stderr
+
+    Returns:
+        The running listener
+    """
+    global _listener
+    settings = settings or get_settings()
+    root = logging.getLogger()
+    with _lock:
+        if _listener is None:
+            output = logging.StreamHandler(stream or sys.stderr)
+            if settings.log_format == "json":
+                output.setFormatter(JsonFormatter())
+            else:
+                output.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+            records = queue.Queue(maxsize=settings.log_queue_size)
+            root.addHandler(DroppingQueueHandler(records))
+            _listener = QueueListener(records, output, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+
+        root.setLevel(settings.log_level.upper())
+        for name, level in parse_levels(settings.log_levels).items():
+            logging.getLogger(name).setLevel(level)
+    return _listener
+
+
+def shutdown_logging():
+    """Write out the queued records and stop the writer thread"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, DroppingQueueHandler):
+                root.removeHandler(handler)
+        _listener = None
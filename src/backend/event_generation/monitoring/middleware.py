@@ -0,0 +1,88 @@
+"""
+Request metrics middleware
+Plain ASGI (no BaseHTTPMiddleware), so streaming responses like /export.ics pass through
+untouched. Each request gets a StageTimer; its stages go out as the Server-Timing header
+(and provider token usage as X-Provider-Usage) when the response starts, and request counts, durations and in-flight requests are
+recorded per route template (not per raw path, which would explode the label set).
+Sampled requests are traced; their traceparent goes back in the response headers.
+"""
+import time
+
+from event_generation.monitoring.metrics import counter, gauge, histogram
+from event_generation.monitoring.timing import start_timer
+from event_generation.monitoring.tracing import finish_trace, start_trace
+
+REQUESTS = counter(
+    "calendarize_requests_total",
+    "Finished HTTP requests",
+    ("route", "method", "status"),
+)
+REQUEST_SECONDS = histogram(
+    "calendarize_request_duration_seconds",
+    "Time from request start to the end of the response body",
+    ("route", "method"),
+)
+IN_FLIGHT = gauge(
+    "calendarize_requests_in_flight",
+    "Requests currently being handled",
+    ("method",),
+)
+
+
+def route_template(scope) -> str:
+    # FastAPI stores the matched route in the scope during routing
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _header(scope, name: bytes):
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        timer = start_timer(lambda: route_template(scope))
+        started = time.perf_counter()
+        status = 500
+        trace = start_trace(f"{method} {scope['path']}", scope["path"], _header(scope, b"traceparent"))
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timer.server_timing().encode("latin-1")))
+                usage = timer.usage_header()
+                if usage is not None:
+                    headers.append((b"x-provider-usage", usage.encode("latin-1")))
+                if trace is not None:
+                    headers.append((b"traceparent", trace.traceparent.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        in_flight = IN_FLIGHT.labels(method=method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            in_flight.dec()
+            route = route_template(scope)
+            REQUESTS.labels(route=route, method=method, status=status).inc()
+            REQUEST_SECONDS.labels(route=route, method=method).observe(time.perf_counter() - started)
+            if trace is not None:
+                trace.root.name = f"{method} {route}"
+                trace.root.attributes.update({"http.method": method, "http.route": route, "http.status_code": status})
+                if status >= 500:
+                    trace.root.error = f"HTTP {status}"
+                finish_trace(trace)
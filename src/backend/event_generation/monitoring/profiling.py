@@ -0,0 +1,150 @@
+"""
+On-demand request profiling
+An admin can add profile=1 to a /convert request to profile exactly that input (a huge
+image, a 50-event flyer). The handler's parse, Event construction and rendering then run
+under one of two profilers and the result is written to PROFILE_DIR:
+
+- pstats (default): cProfile, deterministic; open with `python -m pstats` or snakeviz
+- collapsed: a sampling profiler reading the handler thread's stack every PROFILE_INTERVAL
+  seconds; one "frame;frame;frame count" line per stack, the input of flamegraph.pl and
+  speedscope
+
+Profiling slows the request down, so at most PROFILE_MAX_CONCURRENT profiled requests run
+at once; further ones are refused rather than queued.
+"""
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from event_generation.config.settings import get_settings
+from event_generation.monitoring.metrics import counter
+
+PROFILES = counter(
+    "calendarize_profiles_total",
+    "Profiled requests, by format and whether a profiler slot was free",
+    ("format", "outcome"),
+)
+
+FORMATS = {"pstats": ".pstats", "collapsed": ".collapsed"}
+
+
+class ProfilerBusy(Exception):
+    """All profiler slots are taken"""
+
+
+_slots: Optional[threading.BoundedSemaphore] = None
+_slots_lock = threading.Lock()
+
+
+def _get_slots() -> threading.BoundedSemaphore:
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(max(1, get_settings().profile_max_concurrent))
+    return _slots
+
+
+class _Sampler:
+    """Counts the stacks of one thread, from the frame that started profiling down"""
+
+    def __init__(self, thread_id: int, entry_frame, interval: float):
+        self.thread_id = thread_id
+        self.entry_frame = entry_frame
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}.{getattr(code, 'co_qualname', code.co_name)}")
+                if frame is self.entry_frame:
+                    break
+                frame = frame.f_back
+            else:
+                continue  # not inside the profiled block (yet)
+            self.stacks[";".join(reversed(names))] += 1
+
+    def dump(self, path: Path):
+        with path.open("w", encoding="utf-8") as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f"{stack} {count}\n")
+
+
+class RequestProfile:
+    """
+    Profile the block it wraps and save the result
+
+    Use as `with RequestProfile("pstats") as profile: ...` on the thread doing the work,
+    then profile.save(). Entering raises ProfilerBusy when no slot is free.
+    """
+
+    def __init__(self, format: str = "pstats", interval: Optional[float] = None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown profile format {format!r}, use one of: {', '.join(FORMATS)}")
+        self.format = format
+        self.interval = interval or get_settings().profile_interval
+        self.profile_id = os.urandom(8).hex()
+        self._profiler = None
+
+    def __enter__(self) -> "RequestProfile":
+        if not _get_slots().acquire(blocking=False):
+            PROFILES.labels(format=self.format, outcome="busy").inc()
+            raise ProfilerBusy("Too many profiled requests running, try again shortly")
+        PROFILES.labels(format=self.format, outcome="started").inc()
+        if self.format == "pstats":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = _Sampler(threading.get_ident(), sys._getframe(1), self.interval)
+            self._profiler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if self.format == "pstats":
+                self._profiler.disable()
+            else:
+                self._profiler.stop()
+        finally:
+            _get_slots().release()
+
+    def save(self, directory: Optional[str] = None) -> Path:
+        """Write the profile to PROFILE_DIR/<profile_id>.<format> and return the path"""
+        folder = Path(directory or get_settings().profile_dir)
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"{self.profile_id}{FORMATS[self.format]}"
+        if self.format == "pstats":
+            pstats.Stats(self._profiler).dump_stats(path)
+        else:
+            self._profiler.dump(path)
+        return path
+
+
+def find_profile(profile_id: str, directory: Optional[str] = None) -> Optional[Path]:
+    """Saved profile by id, None if there is none (ids are hex, so no path tricks)"""
+    if not profile_id or any(char not in "0123456789abcdef" for char in profile_id):
+        return None
+    folder = Path(directory or get_settings().profile_dir)
+    for suffix in FORMATS.values():
+        path = folder / f"{profile_id}{suffix}"
+        if path.exists():
+            return path
+    return None
@@ -0,0 +1,108 @@
+"""
+Per-request stage timers
+The request middleware starts a StageTimer and keeps it in a context variable, so code
+deep inside a request (the parsers, the renderers) can record stages without passing it
+around. lap(name) closes the stage that ran since the previous lap; stage(name) times a
+block explicitly. Every stage is observed in a histogram and listed in the Server-Timing
+response header, and becomes a span when the request is traced (see tracing.py).
+Outside a request both are no-ops.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Tuple
+
+from event_generation.monitoring.metrics import histogram
+from event_generation.monitoring.tracing import record_span, span
+
+STAGE_SECONDS = histogram(
+    "calendarize_stage_duration_seconds",
+    "Time spent in each stage of a request",
+    ("route", "stage"),
+)
+
+
+class StageTimer:
+    """Stages of one request, in the order they finished"""
+
+    def __init__(self, route: Callable[[], str] = lambda: "unknown"):
+        self._route = route
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.stages: List[Tuple[str, float]] = []
+        self.usage: List[Any] = []  # provider TokenUsage of each call, see usage.py
+
+    @property
+    def route(self) -> str:
+        return self._route()
+
+    def lap(self, name: str) -> float:
+        now = time.perf_counter()
+        seconds, self._last = now - self._last, now
+        self.add(name, seconds)
+        return seconds
+
+    def add(self, name: str, seconds: float):
+        self.stages.append((name, seconds))
+        STAGE_SECONDS.labels(route=self.route, stage=name).observe(seconds)
+
+    def reset_lap(self):
+        """Start the next lap now, e.g. after waiting for something that isn't a stage"""
+        self._last = time.perf_counter()
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, stages in milliseconds plus the total so far"""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def usage_header(self) -> Optional[str]:
+        """Provider tokens and cost of the request so far, None without provider calls"""
+        if not self.usage:
+            return None
+        totals = {
+            "input": sum(usage.input_tokens for usage in self.usage),
+            "output": sum(usage.output_tokens for usage in self.usage),
+            "image": sum(usage.image_tokens for usage in self.usage),
+        }
+        entries = [f"{kind}={count}" for kind, count in totals.items()]
+        costs = [usage.cost_usd for usage in self.usage]
+        if None not in costs:
+            entries.append(f"cost_usd={sum(costs):.6f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[StageTimer]] = ContextVar("stage_timer", default=None)
+
+
+def start_timer(route: Callable[[], str] = lambda: "unknown") -> StageTimer:
+    timer = StageTimer(route)
+    _current.set(timer)
+    return timer
+
+
+def current_timer() -> Optional[StageTimer]:
+    return _current.get()
+
+
+def lap(name: str):
+    """Record the time since the previous lap as stage `name` of the current request"""
+    timer = _current.get()
+    if timer is not None:
+        record_span(name, timer.lap(name))
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as stage `name` of the current request"""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+        timer.reset_lap()
@@ -0,0 +1,318 @@
+"""
+Opt-in request tracing
+With TRACING on, a sampled share (TRACE_SAMPLE_RATE) of the requests to TRACE_ROUTES gets a
+trace: a root span for the request and a child span for every stage the StageTimer records
+(upload, prompt, llm, decode, validate, render, google_api, ...). The sampling decision is
+made once when the request starts (or taken from a sampled W3C traceparent header), so
+unsampled requests only pay for a context variable lookup per stage.
+
+Finished traces are queued and written by a background thread, either as one JSON span per
+line to a size-rotated file (TRACE_EXPORTER=file) or as OTLP/HTTP JSON to a local collector
+(TRACE_EXPORTER=otlp, e.g. the OpenTelemetry Collector or Jaeger on port 4318).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from event_generation.config.settings import Settings, get_settings
+from event_generation.monitoring.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+DROPPED_TRACES = counter(
+    "calendarize_traces_dropped_total",
+    "Sampled traces dropped because the export queue was full",
+)
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def end(self, end_ns: Optional[int] = None):
+        self.end_ns = end_ns or time.time_ns()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """The spans of one sampled request"""
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self.root = self.start_span(name, parent_id)
+
+    def start_span(self, name: str, parent_id: Optional[str], start_ns: Optional[int] = None) -> Span:
+        span = Span(self, name, parent_id, start_ns)
+        self.spans.append(span)
+        return span
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.root.span_id}-01"
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(header: Optional[str]):
+    """(trace id, parent span id) of a sampled W3C traceparent header, else None"""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 1
+    except ValueError:
+        return None
+    return (parts[1], parts[2]) if sampled else None
+
+
+def start_trace(name: str, path: str, traceparent: Optional[str] = None,
+                settings: Optional[Settings] = None) -> Optional[Trace]:
+    """
+    Head sampling: start a trace for this request, or return None
+
+    Args:
+        name: Root span name
+        path: Request path, only TRACE_ROUTES are traced
+        traceparent: Incoming header; a sampled parent is always followed
+        settings: Defaults to the current settings
+
+    Returns:
+        The trace, now the current one, or None when the request isn't traced
+    """
+    settings = settings or get_settings()
+    trace = None
+    if settings.tracing and path in _routes(settings.trace_routes):
+        parent = parse_traceparent(traceparent)
+        if parent is not None or random.random() < settings.trace_sample_rate:
+            trace = Trace(name, *(parent or (None, None)))
+    # always set, a keep-alive connection runs its requests in the same context
+    _current.set(trace.root if trace is not None else None)
+    return trace
+
+
+def _routes(routes: str) -> frozenset:
+    return frozenset(route.strip() for route in routes.split(",") if route.strip())
+
+
+def finish_trace(trace: Trace, settings: Optional[Settings] = None):
+    """End the root span and hand the spans to the exporter"""
+    trace.root.end()
+    for span in trace.spans:
+        if span.end_ns is None:
+            span.end(trace.root.end_ns)
+    try:
+        exporter = get_exporter(settings)
+    except (ValueError, OSError) as e:
+        logger.error(f"Trace exporter unavailable: {str(e)}")
+        return
+    exporter.submit([span.as_dict() for span in trace.spans])
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def annotate(**attributes):
+    """Add attributes to the current span, if the request is traced"""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def record_span(name: str, seconds: float, **attributes):
+    """Add an already finished child span that ended now and took `seconds`"""
+    parent = _current.get()
+    if parent is None:
+        return
+    end = time.time_ns()
+    span = parent.trace.start_span(name, parent.span_id, end - int(seconds * 1e9))
+    span.attributes.update(attributes)
+    span.end(end)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Trace a block as a child of the current span; the block's spans nest inside it"""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.trace.start_span(name, parent.span_id)
+    child.attributes.update(attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+class JsonlFileExporter:
+    """One JSON span per line, the file rotated by size"""
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, spans: List[Dict[str, Any]]):
+        for item in spans:
+            self._handler.emit(logging.makeLogRecord({"msg": json.dumps(item, default=str)}))
+
+    def close(self):
+        self._handler.close()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter:
+    """OTLP/HTTP with the JSON encoding, accepted by the OpenTelemetry Collector and Jaeger"""
+
+    def __init__(self, endpoint: str, service_name: str = "calendarize", timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=timeout)
+
+    def payload(self, spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "calendarize"},
+                "spans": [{
+                    "traceId": item["trace_id"],
+                    "spanId": item["span_id"],
+                    "parentSpanId": item["parent_span_id"] or "",
+                    "name": item["name"],
+                    "kind": 2 if item["parent_span_id"] is None else 1,  # server / internal
+                    "startTimeUnixNano": str(item["start_time_unix_nano"]),
+                    "endTimeUnixNano": str(item["end_time_unix_nano"]),
+                    "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in item["attributes"].items()],
+                    "status": {"code": 2, "message": item["error"]} if item["error"] else {"code": 0},
+                } for item in spans],
+            }],
+        }]}
+
+    def export(self, spans: List[Dict[str, Any]]):
+        response = self._client.post(self.endpoint, json=self.payload(spans))
+        response.raise_for_status()
+
+    def close(self):
+        self._client.close()
+
+
+class BackgroundExporter:
+    """Queues finished traces and exports them from a worker thread, dropping them when it falls behind"""
+
+    def __init__(self, exporter, max_queue: int = 1024):
+        self.exporter = exporter
+        self._queue: "queue.Queue[Optional[List[Dict[str, Any]]]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, spans: List[Dict[str, Any]]):
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            DROPPED_TRACES.inc()
+
+    def _run(self):
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            try:
+                self.exporter.export(spans)
+            except Exception as e:
+                logger.warning(f"Trace export failed: {str(e)}")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Export what is queued, then stop"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.exporter.close()
+
+
+_exporter: Optional[BackgroundExporter] = None
+_lock = threading.Lock()
+
+
+def create_exporter(settings: Settings):
+    if settings.trace_exporter == "otlp":
+        return OtlpHttpExporter(settings.trace_otlp_endpoint)
+    if settings.trace_exporter == "file":
+        return JsonlFileExporter(settings.trace_file, settings.trace_file_max_bytes, settings.trace_file_backups)
+    raise ValueError(f"Unknown TRACE_EXPORTER: {settings.trace_exporter!r}")
+
+
+def get_exporter(settings: Optional[Settings] = None) -> BackgroundExporter:
+    """The shared exporter, created on the first sampled trace"""
+    global _exporter
+    if _exporter is None:
+        with _lock:
+            if _exporter is None:
+                _exporter = BackgroundExporter(create_exporter(settings or get_settings()))
+                atexit.register(shutdown_tracing)
+    return _exporter
+
+
+def set_exporter(exporter) -> BackgroundExporter:
+    """Export through `exporter` from now on, e.g. a list collecting spans in tests"""
+    global _exporter
+    shutdown_tracing()
+    with _lock:
+        _exporter = BackgroundExporter(exporter)
+    return _exporter
+
+
+def shutdown_tracing():
+    global _exporter
+    with _lock:
+        exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.shutdown()
@@ -0,0 +1,151 @@
+"""
+Provider token usage and cost
+The parsers hand every provider response to record_usage(), which reads the token counts
+the provider reports (Gemini usage_metadata, OpenAI usage), counts them per provider,
+model, route and input type (text or image), estimates the cost from the price table and
+attaches the usage to the current request's StageTimer.
+
+Prices are USD per million tokens. TOKEN_PRICES overrides or extends the defaults:
+"model=input/output,model=input/output", e.g. "gemini-2.0-flash-lite=0.075/0.30".
+Image tokens are billed as input tokens; they are counted separately where the provider
+breaks them out (Gemini does, OpenAI chat completions don't).
+"""
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from event_generation.config.settings import get_settings
+from event_generation.monitoring.metrics import counter, histogram
+from event_generation.monitoring.timing import current_timer
+from event_generation.monitoring.tracing import annotate
+
+logger = logging.getLogger(__name__)
+
+# USD per million (input, output) tokens
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gemini-2.0-flash-lite": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+TOKENS = counter(
+    "calendarize_provider_tokens_total",
+    "Tokens reported by the LLM provider",
+    ("provider", "model", "route", "input_type", "kind"),
+)
+COST = counter(
+    "calendarize_provider_cost_usd_total",
+    "Estimated LLM provider cost from the price table",
+    ("provider", "model", "route", "input_type"),
+)
+REQUEST_TOKENS = histogram(
+    "calendarize_request_tokens",
+    "Input plus output tokens of one provider call",
+    ("provider", "route", "input_type"),
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000),
+)
+
+
+@dataclass
+class TokenUsage:
+    provider: str
+    model: str
+    input_tokens: int = 0  # includes the image tokens
+    output_tokens: int = 0
+    image_tokens: int = 0
+    cost_usd: Optional[float] = None  # None when the model isn't in the price table
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "image_tokens": self.image_tokens,
+            "cost_usd": self.cost_usd,
+        }
+
+
+def gemini_usage(response, model: str) -> TokenUsage:
+    metadata = getattr(response, "usage_metadata", None)
+    usage = TokenUsage("gemini", model)
+    if metadata is None:
+        return usage
+    usage.input_tokens = getattr(metadata, "prompt_token_count", None) or 0
+    usage.output_tokens = getattr(metadata, "candidates_token_count", None) or 0
+    # per-modality breakdown, only in newer SDK versions
+    for detail in getattr(metadata, "prompt_tokens_details", None) or ():
+        if "IMAGE" in str(getattr(detail, "modality", "")).upper():
+            usage.image_tokens += getattr(detail, "token_count", None) or 0
+    return usage
+
+
+def openai_usage(response, model: str) -> TokenUsage:
+    reported = getattr(response, "usage", None)
+    usage = TokenUsage("openai", getattr(response, "model", None) or model)
+    if reported is None:
+        return usage
+    usage.input_tokens = getattr(reported, "prompt_tokens", None) or 0
+    usage.output_tokens = getattr(reported, "completion_tokens", None) or 0
+    return usage
+
+
+@lru_cache(maxsize=8)
+def parse_prices(prices: str) -> Dict[str, Tuple[float, float]]:
+    """'model=input/output,...' on top of DEFAULT_PRICES"""
+    table = dict(DEFAULT_PRICES)
+    for item in prices.split(","):
+        if "=" not in item:
+            continue
+        model, price = item.split("=", 1)
+        try:
+            input_price, output_price = (float(part) for part in price.split("/"))
+        except ValueError:
+            logger.warning(f"Ignoring invalid token price for {model.strip()}: {price!r}")
+            continue
+        table[model.strip()] = (input_price, output_price)
+    return table
+
+
+def estimate_cost(usage: TokenUsage, prices: Dict[str, Tuple[float, float]]) -> Optional[float]:
+    # versioned model names ("gpt-4o-mini-2024-07-18") fall back to the longest matching prefix
+    price = prices.get(usage.model)
+    if price is None:
+        matches = [name for name in prices if usage.model.startswith(name)]
+        if not matches:
+            return None
+        price = prices[max(matches, key=len)]
+    return (usage.input_tokens * price[0] + usage.output_tokens * price[1]) / 1_000_000
+
+
+def record_usage(usage: TokenUsage, input_type: str) -> TokenUsage:
+    """
+    Count a provider call's tokens and cost and attach them to the current request
+
+    Args:
+        usage: Token counts read from the provider response
+        input_type: "text" or "image"
+
+    Returns:
+        The usage, with cost_usd filled in when the model has a price
+    """
+    usage.cost_usd = estimate_cost(usage, parse_prices(get_settings().token_prices))
+    timer = current_timer()
+    route = timer.route if timer is not None else "none"
+
+    labels = {"provider": usage.provider, "model": usage.model, "route": route, "input_type": input_type}
+    TOKENS.labels(**labels, kind="input").inc(usage.input_tokens)
+    TOKENS.labels(**labels, kind="output").inc(usage.output_tokens)
+    TOKENS.labels(**labels, kind="image").inc(usage.image_tokens)
+    if usage.cost_usd is not None:
+        COST.labels(**labels).inc(usage.cost_usd)
+    REQUEST_TOKENS.labels(provider=usage.provider, route=route, input_type=input_type).observe(
+        usage.input_tokens + usage.output_tokens
+    )
+    if timer is not None:
+        timer.usage.append(usage)
+    annotate(**{f"llm.{key}": value for key, value in usage.as_dict().items() if value is not None})
+    return usage
@@ -0,0 +1,48 @@
+"""
+LLM parsers that turn text and images into Event objects
+Each parser module imports its provider SDK at module level, and those SDKs take most of
+the app's import time. create_parser() imports only the module of the configured provider,
+so importing main never loads an SDK that the deployment doesn't use.
+"""
+import importlib
+
+from event_generation.config.settings import Settings, get_settings
+
+# MODEL setting -> (module, class)
+PROVIDERS = {
+    "gemini": ("event_generation.nlp_parsers.gemini_parser", "GeminiParser"),
+    "openai": ("event_generation.nlp_parsers.openai_parser", "OpenAiParser"),
+}
+DEFAULT_PROVIDER = "gemini"
+
+
+def get_parser_class(settings: Settings = None):
+    """Parser class of the configured provider, importing its SDK on first use"""
+    provider = ((settings or get_settings()).model or DEFAULT_PROVIDER).lower()
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown MODEL {provider!r}, expected one of: {', '.join(PROVIDERS)}")
+    module_name, class_name = PROVIDERS[provider]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_parser(settings: Settings = None):
+    """A parser for the configured provider"""
+    return get_parser_class(settings)()
+
+
+_shared = (None, None)  # (settings, parser)
+
+
+def get_parser(settings: Settings = None):
+    """
+    Parser shared by all requests, so the provider client keeps its connections open
+
+    A new parser is created when the settings object changes, i.e. after a reload.
+    """
+    global _shared
+    settings = settings or get_settings()
+    shared_settings, parser = _shared
+    if parser is None or shared_settings is not settings:
+        parser = create_parser(settings)
+        _shared = (settings, parser)
+    return parser
@@ -15,9 +15,13 @@ from pydantic import ValidationError
 # Local application imports
 from event_generation.event.event import Event
 from event_generation.event.date_parser import parse_datetime
+from event_generation.monitoring import PROVIDER_ERRORS, lap
+from event_generation.monitoring.logs import error_fields, log_payload
+from event_generation.monitoring.usage import openai_usage, record_usage
 from event_generation.config.readenv import get_openai_key
+from event_generation.config.settings import get_settings
 
-logging.basicConfig(level=logging.ERROR)  # Configure logging
+logger = logging.getLogger(__name__)
 
 
 # private Helper function to encode the image
@@ -30,7 +34,16 @@ def encode_image(image_path):
 class OpenAiParser:
     def __init__(self):
         # Initialize OpenAI client with API key
-        self.client = OpenAI(api_key=get_openai_key())
+        settings = get_settings()
+        self.client = OpenAI(
+            api_key=get_openai_key(), timeout=settings.provider_timeout, base_url=settings.openai_base_url
+        )
+        self.model = settings.openai_model
+        self.provider = "openai"
+
+    def warm_up(self):
+        # cheap metadata request: opens the TLS connection and checks the key without using tokens
+        self.client.models.retrieve(self.model)
 
     def parse(self, text: str, local_time: str, local_tz: str, image_path=None) -> Event:
         # send request to OpenAI API to extract event details into a JSON object
@@ -139,18 +152,18 @@ class OpenAiParser:
                         }}
 
                         """
-            print("\nsending request to OpenAI API: ", text)
-            print("Time Info: ", time_info)
-            print(f"Current Timezone: {current_time_zone}")
+            lap("prompt")
+            logger.debug(
+                "Sending request to %s", self.provider,
+                extra={"model": self.model, "text_chars": len(text), "has_image": image_path is not None},
+            )
+            log_payload(logger, "Provider request", text=text, time_info=time_info, time_zone=current_time_zone, image_path=image_path)
             if image_path:
                 base64_image = encode_image(image_path)
-                print(f"Image Path: {image_path}")
-            print()
-            print("\nwaiting on response from OpenAI API...")
 
             if image_path:
                 response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
+                    model=self.model,
                     messages=[
                         {
                             "role": "system",
@@ -176,7 +189,7 @@ class OpenAiParser:
                 )
             else:
                 response = self.client.chat.completions.create(
-                    model="gpt-4o-mini",
+                    model=self.model,
                     messages=[
                         {
                             "role": "system",
@@ -189,30 +202,35 @@ class OpenAiParser:
 
         # catch any errors gracefully
         except ConnectionError as ce:
-            logging.error(
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="connection").inc()
+            logger.error(
                 "Connection error while sending request to OpenAI API: %s", ce
             )
             return "A connection error occurred while communicating with OpenAI API. Please check your internet connection."
 
         except ValueError as ve:
-            logging.error("Invalid input or response from OpenAI: %s", ve)
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="request").inc()
+            logger.error("Invalid input or response from OpenAI: %s", ve)
             return (
                 "An error occurred due to an invalid input or response from OpenAI API."
             )
 
         except Exception as e:
-            logging.error("Unexpected error: %s", e)
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="unexpected").inc()
+            logger.error("Unexpected error: %s", e)
             return f"An unexpected error occurred: {e}"
 
         # Parse the response from OpenAI API into a JSON object
         try:
+            lap("llm")
+            record_usage(openai_usage(response, self.model), "image" if image_path else "text")
             event_data = json.loads(response.choices[0].message.content)
+            lap("decode")
             # Ensure required fields exist
             event_list = []
             # Create Event object by parsing Json fields
             for event in event_data["events"]:
-                print("\nEvent:\n", json.dumps(event, indent=4))
-                print()
+                log_payload(logger, "Provider event", event=event)
                 if not event.get("title") or not event.get("start_time"):
                     raise ValueError("Missing required fields: 'title' and/or 'start_time'")
                 new_event = Event(
@@ -241,21 +259,25 @@ class OpenAiParser:
                     ),
                 )
                 event_list.append(new_event)
+            lap("validate")
 
         # Catch any errors gracefully
         except ValueError as ve:
-            logging.error("ValueError: %s", ve, exc_info=True)
-            print(f"Error: {ve}")  # Log to console for debugging
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="invalid_response").inc()
+            logger.error("Invalid event data", extra=error_fields(ve))
+            log_payload(logger, "Invalid event data", error=str(ve))
             return f"Invalid event data: {ve}"
 
         except ValidationError as ve:
-            logging.error("Pydantic Validation Error: %s", ve, exc_info=True)
-            print(f"Pydantic Validation Error: {ve}")
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="validation").inc()
+            logger.error("Event data validation failed", extra=error_fields(ve))
+            log_payload(logger, "Event data validation failed", error=str(ve))
             return f"Event data validation failed: {ve}"
 
         except Exception as e:
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="unexpected_response").inc()
             error_trace = traceback.format_exc()  # Capture full stack trace
-            logging.error("Unexpected Error: %s %s", e, error_trace)
+            logger.error("Unexpected Error: %s %s", e, error_trace)
             return "An unexpected error occurred. Please check the logs."
 
         return event_list
@@ -8,18 +8,19 @@ import base64
 # Third-party imports
 # from dotenv import load_dotenv
 # from pathlib import Path
-from openai import OpenAI
-from google import genai as Gemini
-from google.genai import types
+# the provider SDKs are imported when a Parser is created, only the configured one is loaded
 from pydantic import ValidationError
 # import tzlocal as tz
 
 # Local application imports
 from event_generation.event.event import Event
 from event_generation.event.date_parser import parse_datetime
+from event_generation.monitoring import PROVIDER_ERRORS, lap
+from event_generation.monitoring.logs import error_fields, log_payload
+from event_generation.monitoring.usage import gemini_usage, openai_usage, record_usage
 from event_generation.config.readenv import get_gemini_key, get_openai_key, get_model
 
-logging.basicConfig(level=logging.ERROR)  # Configure logging
+logger = logging.getLogger(__name__)
 
 
 # private Helper function to encode the image
@@ -32,11 +33,15 @@ def encode_image(image_path):
 class Parser:
     def __init__(self):
         if (get_model() == "gemini"):
+            from google import genai as Gemini
             self.client = Gemini.Client(api_key=get_gemini_key())
             self.model = "gemini-2.0-flash-lite"
+            self.provider = "gemini"
         else:
+            from openai import OpenAI
             self.client = OpenAI(api_key=get_openai_key())
             self.model = "gpt-4o-mini"
+            self.provider = "openai"
 
     def parse(self, text, local_time, local_tz, image_path=None):
         # send request to OpenAI API to extract event details into a JSON object
@@ -145,13 +150,17 @@ class Parser:
                         }}
                         """
             
-            print("Time Info: ", time_info)
-            print(f"Current Timezone: {current_time_zone}")
+            lap("prompt")
+            logger.debug(
+                "Sending request to %s", self.provider,
+                extra={"model": self.model, "text_chars": len(text), "has_image": image_path is not None},
+            )
+            log_payload(logger, "Provider request", text=text, time_info=time_info, time_zone=current_time_zone, image_path=image_path)
+
+            from google.genai import types
 
             # If the user provided an image_path, read bytes and create a Part object
             if image_path:
-                print(f"Image Path: {image_path}")
-
                 # Read the image bytes
                 with open(image_path, "rb") as f:
                     image_bytes = f.read()
@@ -162,8 +171,6 @@ class Parser:
                     mime_type="image/jpeg"  # or image/png, etc., depending on your file
                 )
 
-                print("\nwaiting on response from Gemini API...")
-
                 # Pass the text and the image Part together in the 'contents' list
                 response = self.client.models.generate_content(
                     model=self.model,
@@ -184,23 +191,28 @@ class Parser:
 
         # catch any errors gracefully
         except ConnectionError as ce:
-            logging.error(
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="connection").inc()
+            logger.error(
                 "Connection error while sending request to OpenAI API: %s", ce
             )
             return "A connection error occurred while communicating with OpenAI API. Please check your internet connection."
 
         except ValueError as ve:
-            logging.error("Invalid input or response from OpenAI: %s", ve)
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="request").inc()
+            logger.error("Invalid input or response from OpenAI: %s", ve)
             return (
                 "An error occurred due to an invalid input or response from OpenAI API."
             )
 
         except Exception as e:
-            logging.error("Unexpected error: %s", e)
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="unexpected").inc()
+            logger.error("Unexpected error: %s", e)
             return f"An unexpected error occurred: {e}"
 
         # Parse the response from OpenAI API into a JSON object
         try:
+            lap("llm")
+            record_usage((gemini_usage if self.provider == "gemini" else openai_usage)(response, self.model), "image" if image_path else "text")
 
             # print("\nResponse from Gemini API:\n", response)
             # print()
@@ -223,14 +235,14 @@ class Parser:
 
             # Now parse the cleaned JSON text
             event_data = json.loads(clean_text)
+            lap("decode")
             # print("\nParsed Event Data:\n", json.dumps(event_data, indent=4))
             # Ensure required fields exist
 
             event_list = []
             # Create Event object by parsing Json fields
             for event in event_data["events"]:
-                print("\nEvent:\n", json.dumps(event, indent=4))
-                print()
+                log_payload(logger, "Provider event", event=event)
                 if not event.get("title") or not event.get("start_time"):
                     raise ValueError("Missing required fields: 'title' and/or 'start_time'")
                 new_event = Event(
@@ -259,21 +271,25 @@ class Parser:
                     ),
                 )
                 event_list.append(new_event)
+            lap("validate")
 
         # Catch any errors gracefully
         except ValueError as ve:
-            logging.error("ValueError: %s", ve, exc_info=True)
-            print(f"Error: {ve}")  # Log to console for debugging
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="invalid_response").inc()
+            logger.error("Invalid event data", extra=error_fields(ve))
+            log_payload(logger, "Invalid event data", error=str(ve))
             return f"Invalid event data: {ve}"
 
         except ValidationError as ve:
-            logging.error("Pydantic Validation Error: %s", ve, exc_info=True)
-            print(f"Pydantic Validation Error: {ve}")
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="validation").inc()
+            logger.error("Event data validation failed", extra=error_fields(ve))
+            log_payload(logger, "Event data validation failed", error=str(ve))
             return f"Event data validation failed: {ve}"
 
         except Exception as e:
+            PROVIDER_ERRORS.labels(provider=self.provider, kind="unexpected_response").inc()
             error_trace = traceback.format_exc()  # Capture full stack trace
-            logging.error("Unexpected Error: %s %s", e, error_trace)
+            logger.error("Unexpected Error: %s %s", e, error_trace)
             return "An unexpected error occurred. Please check the logs."
 
         return event_list
@@ -0,0 +1,237 @@
+"""
+Offline end-to-end benchmark for POST /convert
+Drives main:app in-process (httpx ASGITransport) at a fixed concurrency, with the real
+GeminiParser / OpenAiParser talking to a replay transport instead of the provider. The
+responses in recordings/convert_responses.json are in each provider's wire format, so the
+SDK's response parsing, our JSON decoding, Event validation and rendering all run as in
+production; only the network round-trip is replaced (optionally by a fixed delay).
+
+Cases: text-only, the bundled single_event.png / two_events.png / multiple_events.png and
+a long newsletter-style text with 24 events. Reports throughput and p50/p95/p99 latency
+per provider and case.
+
+Run from src/backend:
+    python -m event_generation.testing.bench_convert [--provider gemini] [--case text]
+        [--requests 200] [--concurrency 8] [--provider-latency-ms 0] [--json]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+from base64 import b64decode, urlsafe_b64decode
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import unquote
+
+import httpx
+
+TESTING_DIR = Path(__file__).resolve().parent
+RECORDINGS = TESTING_DIR / "recordings" / "convert_responses.json"
+PROVIDERS = ("gemini", "openai")
+CASES = ("text", "single_event", "two_events", "multiple_events", "long_text")
+LOCAL_TIME = "2025-03-01T10:00:00Z"
+LOCAL_TZ = "America/Los_Angeles"
+
+
+def load_recordings(path: Path = RECORDINGS) -> Dict[str, Any]:
+    with path.open(encoding="utf-8") as recordings:
+        return json.load(recordings)
+
+
+def case_image(case: Dict[str, Any]) -> Optional[bytes]:
+    return (TESTING_DIR / case["image"]).read_bytes() if case["image"] else None
+
+
+def fingerprint(text: str, image: Optional[bytes]) -> str:
+    """What a recorded response is looked up by: the user's text and image, not the (changing) prompt"""
+    digest = hashlib.sha256(text.encode("utf-8"))
+    digest.update(image or b"")
+    return digest.hexdigest()
+
+
+class ReplayTransport:
+    """Answers provider calls with the recorded response for the same text and image"""
+
+    def __init__(self, provider: str, recordings: Dict[str, Any], latency: float = 0.0):
+        self.provider = provider
+        self.latency = latency
+        self.calls = 0
+        self._responses = {
+            fingerprint(case["text"], case_image(case)): recordings[provider][name]
+            for name, case in recordings["cases"].items()
+        }
+
+    def _lookup(self, text: str, image: Optional[bytes]) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)  # the SDKs are synchronous, like the real round-trip
+        key = fingerprint(text, image)
+        if key not in self._responses:
+            raise KeyError(f"No recorded {self.provider} response for this input")
+        return self._responses[key]
+
+    def gemini_request(self, http_request, stream: bool = False):
+        # google-genai opens a new requests.Session per call, so there is no transport to
+        # mount; this replaces the SDK's request method and its response parsing still runs
+        from google.genai._api_client import HttpResponse
+
+        parts = http_request.data["contents"][0]["parts"]
+        text = "".join(part.get("text", "") for part in parts)
+        # the SDK sends inline data url-safe base64 encoded, without padding
+        images = [urlsafe_b64decode(part["inlineData"]["data"] + "==") for part in parts if "inlineData" in part]
+        body = self._lookup(text, images[0] if images else None)
+        return HttpResponse({"content-type": "application/json"}, [json.dumps(body)])
+
+    def openai_handler(self, request: httpx.Request) -> httpx.Response:
+        content = json.loads(request.content)["messages"][-1]["content"]
+        text, image = content if isinstance(content, str) else "", None
+        if not isinstance(content, str):
+            for part in content:
+                if part["type"] == "text":
+                    text += part["text"]
+                else:
+                    image = b64decode(unquote(part["image_url"]["url"]).split(",", 1)[1])
+        return httpx.Response(200, json=self._lookup(text, image))
+
+
+def replay_parser(provider: str, transport: ReplayTransport):
+    """The provider's real parser class, wired to the replay transport"""
+    from event_generation.config.settings import Settings
+    from event_generation.nlp_parsers import get_parser_class
+
+    parser = get_parser_class(Settings(model=provider))()
+    if provider == "gemini":
+        parser.client._api_client._request = transport.gemini_request
+    else:
+        from openai import OpenAI
+
+        parser.client = OpenAI(
+            api_key="replay", max_retries=0,
+            http_client=httpx.Client(transport=httpx.MockTransport(transport.openai_handler)),
+        )
+    return parser
+
+
+def recorded_events(body: Dict[str, Any], provider: str) -> List[Dict[str, Any]]:
+    if provider == "openai":
+        content = body["choices"][0]["message"]["content"]
+    else:
+        content = body["candidates"][0]["content"]["parts"][0]["text"].removeprefix("```json").removesuffix("```")
+    return json.loads(content)["events"]
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    if not ordered:
+        return math.nan
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    done = len(latencies) + errors
+    return {
+        "requests": done,
+        "errors": errors,
+        "rps": round(done / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def drive(app, case: Dict[str, Any], expected_events: int, requests: int, concurrency: int) -> Dict[str, Any]:
+    """POST the case to /convert `requests` times with at most `concurrency` in flight"""
+    image = case_image(case)
+    data = {"text": case["text"], "local_tz": LOCAL_TZ, "local_time": LOCAL_TIME}
+    latencies: List[float] = []
+    errors = 0
+    tokens = 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", timeout=None) as client:
+        async def one():
+            nonlocal errors, tokens
+            files = {"file": (case["image"], image, "image/png")} if image else None
+            started = time.perf_counter()
+            response = await client.post("/convert", data=data, files=files)
+            elapsed = time.perf_counter() - started
+            if response.status_code != 200 or len(response.json()) != expected_events:
+                errors += 1
+                return
+            latencies.append(elapsed)
+            usage = dict(item.split("=") for item in response.headers.get("x-provider-usage", "").split(", ") if "=" in item)
+            tokens += int(usage.get("input", 0)) + int(usage.get("output", 0))
+
+        async def worker(count: int):
+            for _ in range(count):
+                await one()
+
+        started = time.perf_counter()
+        shares = [requests // concurrency + (1 if index < requests % concurrency else 0) for index in range(concurrency)]
+        await asyncio.gather(*(worker(count) for count in shares if count))
+        elapsed = time.perf_counter() - started
+
+    result = summarize(latencies, errors, elapsed)
+    result["tokens_per_request"] = round(tokens / len(latencies)) if latencies else 0
+    return result
+
+
+def run(providers: Sequence[str] = PROVIDERS, cases: Sequence[str] = CASES, requests: int = 200,
+        concurrency: int = 8, provider_latency: float = 0.0) -> List[Dict[str, Any]]:
+    """Benchmark every provider and case, returning one result row each"""
+    import main
+
+    recordings = load_recordings()
+    original = main.get_parser
+    rows = []
+    try:
+        for provider in providers:
+            transport = ReplayTransport(provider, recordings, provider_latency)
+            parser = replay_parser(provider, transport)
+            main.get_parser = lambda: parser
+            for name in cases:
+                expected = len(recorded_events(recordings[provider][name], provider))
+                # one untimed request per case so first-use costs don't land in the percentiles
+                asyncio.run(drive(main.app, recordings["cases"][name], expected, 1, 1))
+                result = asyncio.run(drive(main.app, recordings["cases"][name], expected, requests, concurrency))
+                rows.append({"provider": provider, "case": name, "events": expected, **result})
+    finally:
+        main.get_parser = original
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline /convert benchmark with recorded provider responses")
+    parser.add_argument("--provider", action="append", choices=PROVIDERS, help="default: all")
+    parser.add_argument("--case", action="append", choices=CASES, help="default: all")
+    parser.add_argument("--requests", type=int, default=200, help="requests per provider and case")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--provider-latency-ms", type=float, default=0.0, help="simulated provider round-trip")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    # the parsers refuse to start without keys; the replay transport never sends them anywhere
+    os.environ.setdefault("GEMINI_API_KEY", "replay")
+    os.environ.setdefault("OPENAI_API_KEY", "replay")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from event_generation.config.settings import reload_settings
+    reload_settings()
+
+    rows = run(args.provider or PROVIDERS, args.case or CASES, args.requests, args.concurrency,
+               args.provider_latency_ms / 1000)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    columns = ("provider", "case", "events", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "tokens_per_request")
+    print(f"concurrency {args.concurrency}, provider latency {args.provider_latency_ms:g} ms")
+    print(f"{'provider':<9}{'case':<16}" + "".join(f"{column:>10}" for column in columns[2:-1]) + f"{'tokens/req':>12}")
+    for row in rows:
+        print(f"{row['provider']:<9}{row['case']:<16}" + "".join(f"{row[column]!s:>10}" for column in columns[2:-1])
+              + f"{row['tokens_per_request']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Microbenchmark for event_generation.event.date_parser.parse_datetime
+
+Compares the layered parser against plain dateutil on the three fields the
+parsers convert for every event: start_time, end_time and recurrence_end_date.
+
+Run from src/backend:
+    python -m event_generation.testing.bench_date_parser
+"""
+import timeit
+
+from dateutil.parser import parse
+
+from event_generation.event import date_parser as dp
+
+# values shaped like the ones the LLM returns for each field
+FIELDS = {
+    "start_time": ["20250220T170000", "20250301T090000", "2025-03-15T14:30:00"],
+    "end_time": ["20250220T180000", "20250301T235900", "2025-03-15T16:00"],
+    "recurrence_end_date": ["20250530", "20251212", "2025-06-01"],
+}
+
+
+def bench(func, values, number):
+    # best of 5 runs, reported per call in microseconds
+    timer = timeit.Timer(lambda: [func(value) for value in values])
+    best = min(timer.repeat(repeat=5, number=number))
+    return best / (number * len(values)) * 1e6
+
+
+def main(number=2000):
+    print(f"{'field':<22}{'dateutil (us)':>15}{'layered (us)':>15}{'speedup':>10}")
+    for field, values in FIELDS.items():
+        baseline = bench(parse, values, number)
+        layered = bench(dp.parse_datetime, values, number)
+        print(f"{field:<22}{baseline:>15.2f}{layered:>15.2f}{baseline / layered:>9.1f}x")
+
+    dp.reset_parse_stats()
+    for values in FIELDS.values():
+        for value in values:
+            dp.parse_datetime(value)
+    print("tier usage:", dp.get_parse_stats())
+
+
+if __name__ == "__main__":
+    main()
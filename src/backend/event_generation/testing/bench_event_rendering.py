@@ -0,0 +1,212 @@
+"""
+Microbenchmarks for Event construction, rendering and date parsing
+Times the per-event work of every /convert response on a seeded corpus shaped like real
+parser output: mostly timed events, plus all-day, recurring (weekly with days, daily with a
+count, monthly until a date, yearly) and many-attendee events, a quarter of them in unusual
+zones (half-hour and 45-minute offsets, +14:00, southern-hemisphere DST).
+
+Every benchmark reports the best per-call time of several passes over the corpus. Absolute
+times depend on the machine, so each is also divided by a fixed pure-Python calibration loop
+measured in the same run; the baseline comparison uses that relative cost, and a benchmark
+regresses when it is more than --tolerance slower than the stored baseline.
+
+Run from src/backend:
+    python -m event_generation.testing.bench_event_rendering [--events 500] [--repeat 5]
+        [--json] [--tolerance 0.25] [--save-baseline]
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from event_generation.event import date_parser as dp
+from event_generation.event.event import Event
+
+BASELINE = Path(__file__).resolve().parent / "baselines" / "event_rendering.json"
+DEFAULT_TOLERANCE = 0.25
+
+COMMON_ZONES = ("America/Los_Angeles", "America/New_York", "America/Chicago", "Europe/London", "UTC")
+UNUSUAL_ZONES = (
+    "Asia/Kathmandu", "Asia/Kolkata", "America/St_Johns", "Australia/Lord_Howe",
+    "Pacific/Chatham", "Pacific/Kiritimati", "Africa/Casablanca", "America/Sao_Paulo",
+)
+# share of each kind of event in the corpus
+KINDS = {"timed": 0.45, "all_day": 0.15, "recurring": 0.30, "many_attendees": 0.10}
+UNUSUAL_ZONE_SHARE = 0.25
+# date strings as the providers return them; a few need the dateutil fallback
+DATE_FORMATS = {
+    "%Y%m%dT%H%M00": 0.70, "%Y-%m-%dT%H:%M:%S": 0.15, "%Y%m%d": 0.10, "%B %d, %Y %I:%M %p": 0.05,
+}
+TITLES = ("AM 112 Lecture", "Dentist", "Team standup", "Mia's birthday", "Farmers market", "Q3 planning offsite")
+LOCATIONS = (None, "Porter Acad 144", "Online", "1156 High St, Santa Cruz, CA 95064")
+
+
+def make_event_fields(rng: random.Random, kind: str) -> Dict[str, Any]:
+    """Event keyword arguments for one event of the given kind"""
+    zones = UNUSUAL_ZONES if rng.random() < UNUSUAL_ZONE_SHARE else COMMON_ZONES
+    start = datetime(2025, 1, 1) + timedelta(days=rng.randrange(365), minutes=rng.randrange(7 * 4, 22 * 4) * 15)
+    fields = {
+        "title": rng.choice(TITLES),
+        "time_zone": rng.choice(zones),
+        "start_time": start,
+        "end_time": start + timedelta(minutes=rng.choice((30, 60, 90, 120))),
+        "description": "Bring the signed form. Details: https://example.com/event?id=" + str(rng.randrange(10**6)),
+        "location": rng.choice(LOCATIONS),
+        "attendees": [],
+    }
+    if kind == "all_day":
+        start = start.replace(hour=0, minute=0)
+        fields.update(is_all_day=True, start_time=start, end_time=start + timedelta(days=rng.choice((0, 0, 2))))
+    elif kind == "recurring":
+        pattern = rng.choice(("WEEKLY", "WEEKLY", "DAILY", "MONTHLY", "YEARLY"))
+        fields.update(is_recurring=True, recurrence_pattern=pattern)
+        if pattern == "WEEKLY":
+            fields["recurrence_days"] = rng.sample(["MO", "TU", "WE", "TH", "FR"], rng.randint(1, 3))
+        if rng.random() < 0.5:
+            fields["recurrence_count"] = rng.randint(2, 30)
+        else:
+            fields["recurrence_end_date"] = start + timedelta(days=rng.randint(14, 180))
+    elif kind == "many_attendees":
+        fields["attendees"] = [f"person{index}@example.com" for index in range(rng.randint(10, 60))]
+    return fields
+
+
+def make_corpus(number_of_events: int, seed: int = 0) -> Dict[str, List[Any]]:
+    """Seeded corpus: Event kwargs, rendered Events and provider-style date strings"""
+    rng = random.Random(seed)
+    kinds = rng.choices(list(KINDS), weights=list(KINDS.values()), k=number_of_events)
+    fields = [make_event_fields(rng, kind) for kind in kinds]
+    formats = rng.choices(list(DATE_FORMATS), weights=list(DATE_FORMATS.values()), k=number_of_events)
+    dates = [item["start_time"].strftime(date_format) for item, date_format in zip(fields, formats)]
+    rendered = []
+    for item in fields:
+        event = Event(**item)
+        event.set_ical_string()
+        event.set_gcal_link()
+        event.set_outlook_link()
+        rendered.append(event)
+    return {"kinds": kinds, "fields": fields, "events": [Event(**item) for item in fields], "rendered": rendered, "dates": dates}
+
+
+def benchmarks(corpus: Dict[str, List[Any]]) -> Dict[str, Callable[[], None]]:
+    """Name -> one pass over the corpus"""
+    fields, events, rendered, dates = corpus["fields"], corpus["events"], corpus["rendered"], corpus["dates"]
+
+    def each(function, items):
+        return lambda: [function(item) for item in items]
+
+    return {
+        "event_construct": each(lambda item: Event(**item), fields),
+        "set_ical_string": each(Event.set_ical_string, events),
+        "set_gcal_link": each(Event.set_gcal_link, events),
+        "set_outlook_link": each(Event.set_outlook_link, events),
+        "model_dump_json": each(Event.model_dump_json, rendered),
+        "parse_datetime": each(dp.parse_datetime, dates),
+        "parse_recurring_pattern": each(dp.parse_recurring_pattern, events),
+        "get_ical_rrule": each(dp.get_ical_rrule, events),
+    }
+
+
+def _calibration():
+    # fixed interpreter-bound work: dict, string and list operations like the code under test
+    items = {f"key{index}": index for index in range(200)}
+    return sorted(",".join(items).split(","), key=len)
+
+
+def best_us(function: Callable[[], Any], calls: int, repeat: int) -> float:
+    """Best time of `repeat` passes, per call in microseconds"""
+    return min(timeit.Timer(function).repeat(repeat=repeat, number=1)) / calls * 1e6
+
+
+def run(number_of_events: int = 500, repeat: int = 5, seed: int = 0, only: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Run the benchmarks, returning machine-readable results"""
+    corpus = make_corpus(number_of_events, seed)
+    timings = {}
+    calibrations = []
+    for name, function in benchmarks(corpus).items():
+        if only and name not in only:
+            continue
+        # calibrated between the benchmarks, so a slow phase of the machine affects both
+        calibrations.append(best_us(lambda: [_calibration() for _ in range(100)], 100, 3))
+        function()  # warm caches (ZoneInfo, regexes) outside the timed passes
+        timings[name] = best_us(function, number_of_events, repeat)
+    calibration = min(calibrations, default=1.0)
+    results = {name: {"us_per_call": round(us, 3), "relative": round(us / calibration, 4)} for name, us in timings.items()}
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "events": number_of_events,
+        "seed": seed,
+        "calibration_us": round(calibration, 3),
+        "benchmarks": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Compare relative costs against a baseline
+
+    Returns:
+        One row per benchmark with its change and a status: ok, regression, faster or new
+    """
+    rows = []
+    for name, result in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None:
+            rows.append({"name": name, "status": "new", "change": None})
+            continue
+        change = result["relative"] / previous["relative"] - 1
+        status = "regression" if change > tolerance else "faster" if change < -tolerance else "ok"
+        rows.append({"name": name, "status": status, "change": round(change, 4)})
+    return rows
+
+
+def load_baseline(path: Path = BASELINE) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8") as baseline:
+        return json.load(baseline)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event rendering and date parsing microbenchmarks")
+    parser.add_argument("--events", type=int, default=500, help="corpus size")
+    parser.add_argument("--repeat", type=int, default=5, help="passes per benchmark, the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", action="append", help="run only this benchmark (repeatable)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="print the results and comparison as JSON")
+    args = parser.parse_args()
+
+    results = run(args.events, args.repeat, args.seed, args.only)
+    baseline = load_baseline(args.baseline)
+    rows = compare(results, baseline, args.tolerance) if baseline else []
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if args.json:
+        print(json.dumps({**results, "tolerance": args.tolerance, "comparison": rows}, indent=2))
+    else:
+        changes = {row["name"]: row for row in rows}
+        print(f"{args.events} events, calibration {results['calibration_us']:.2f} us, python {results['python']}")
+        print(f"{'benchmark':<26}{'us/call':>10}{'relative':>10}{'change':>10}  status")
+        for name, result in results["benchmarks"].items():
+            row = changes.get(name, {"status": "no baseline", "change": None})
+            change = f"{row['change']:+.0%}" if row["change"] is not None else "-"
+            print(f"{name:<26}{result['us_per_call']:>10.2f}{result['relative']:>10.3f}{change:>10}  {row['status']}")
+
+    if any(row["status"] == "regression" for row in rows) and not args.save_baseline:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
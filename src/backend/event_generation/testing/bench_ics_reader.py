@@ -0,0 +1,69 @@
+"""
+Throughput benchmark for event_generation.event.ics_reader
+
+Generates a synthetic .ics export and reads it with the streaming reader and with
+icalendar.Calendar.from_ical, reporting events per second and peak memory.
+
+Run from src/backend:
+    python -m event_generation.testing.bench_ics_reader [number_of_events]
+"""
+import io
+import sys
+import time
+import tracemalloc
+
+from icalendar import Calendar
+
+from event_generation.event.ics_reader import iter_events
+
+EVENT_TEMPLATE = (
+    "BEGIN:VEVENT\r\n"
+    "SUMMARY:Imported event {index}\r\n"
+    "DTSTART;TZID=America/Los_Angeles:20250220T170000\r\n"
+    "DTEND;TZID=America/Los_Angeles:20250220T180000\r\n"
+    "DESCRIPTION:A description long enough that it has to be folded over more than one\r\n"
+    "  line by the exporter\\, like most real calendar exports do.\r\n"
+    "LOCATION:Porter Acad 144\r\n"
+    "RRULE:FREQ=WEEKLY;BYDAY=TU,TH;COUNT=10\r\n"
+    "UID:{index}@calendarize.tech\r\n"
+    "BEGIN:VALARM\r\n"
+    "ACTION:DISPLAY\r\n"
+    "TRIGGER:-PT15M\r\n"
+    "END:VALARM\r\n"
+    "END:VEVENT\r\n"
+)
+
+
+def make_calendar(number_of_events: int) -> bytes:
+    body = "".join(EVENT_TEMPLATE.format(index=index) for index in range(number_of_events))
+    return ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + body + "END:VCALENDAR\r\n").encode("utf-8")
+
+
+def measure(label, func, data):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func(data)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12}{count:>10}{count / elapsed:>16.0f}{peak / 2**20:>14.1f}")
+
+
+def streaming(data):
+    return sum(1 for _ in iter_events(io.BytesIO(data)))
+
+
+def whole_file(data):
+    return len(Calendar.from_ical(data).walk("VEVENT"))
+
+
+def main(number_of_events=20000):
+    data = make_calendar(number_of_events)
+    print(f"input: {len(data) / 2**20:.1f} MiB")
+    print(f"{'reader':<12}{'events':>10}{'events/sec':>16}{'peak MiB':>14}")
+    measure("streaming", streaming, data)
+    measure("from_ical", whole_file, data)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
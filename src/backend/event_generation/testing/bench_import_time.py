@@ -0,0 +1,86 @@
+"""
+Import-time benchmark for main:app
+Imports `main` in fresh interpreters with `python -X importtime` and reports the median
+total and the slowest modules. Provider SDKs must not show up at all: they are imported
+lazily by nlp_parsers.create_parser(). test_import_time.py enforces the budget.
+
+Run from src/backend:
+    python -m event_generation.testing.bench_import_time [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1300"))
+# provider SDKs that a plain `import main` must not load
+LAZY_MODULES = ("openai", "google.genai")
+
+
+def import_times(module: str = "main") -> Dict[str, Tuple[int, int]]:
+    """Run one `python -X importtime -c 'import module'`, returning module -> (self us, cumulative us)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(module: str = "main", runs: int = 5) -> List[Dict[str, Tuple[int, int]]]:
+    """import_times() of several fresh interpreters, after one warm-up run that writes the .pyc files"""
+    import_times(module)
+    return [import_times(module) for _ in range(runs)]
+
+
+def total_ms(times: Dict[str, Tuple[int, int]], module: str = "main") -> float:
+    return times[module][1] / 1000
+
+
+def loaded_lazy_modules(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    return sorted(
+        name for name in times
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time of main:app")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = measure(args.module, args.runs)
+    totals = [total_ms(times, args.module) for times in runs]
+    median = statistics.median(totals)
+    print(f"import {args.module}: median {median:.0f} ms, min {min(totals):.0f} ms, max {max(totals):.0f} ms "
+          f"over {args.runs} runs (budget {IMPORT_BUDGET_MS:.0f} ms)")
+
+    # slowest top-level packages by cumulative time in the median run
+    times = sorted(runs, key=lambda times: total_ms(times, args.module))[len(runs) // 2]
+    packages = {}
+    for name, (_, cumulative) in times.items():
+        top = name.split(".")[0]
+        packages[top] = max(packages.get(top, 0), cumulative)
+    print(f"\n{'package':<32}{'cumulative (ms)':>16}")
+    for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<32}{cumulative / 1000:>16.1f}")
+
+    lazy = loaded_lazy_modules(times)
+    print(f"\nprovider SDK modules loaded: {len(lazy)}")
+    if median > IMPORT_BUDGET_MS or lazy:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
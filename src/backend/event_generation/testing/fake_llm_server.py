@@ -0,0 +1,474 @@
+"""
+Local stand-in for the Gemini and OpenAI APIs
+Implements the endpoints GeminiParser and OpenAiParser use (generateContent and chat
+completions), their streaming variants (streamGenerateContent?alt=sse and stream=true) and
+the model lookups of the warm-up, so the whole HTTP path (connection reuse, timeouts,
+retries, streaming) can be load tested without provider keys or costs.
+
+Inputs recorded in recordings/convert_responses.json get their recorded events back; any
+other input gets a templated event built from the text. Latency follows a configurable
+distribution; streams send the JSON a few characters ("tokens") at a time. 429s, 500s and
+malformed (truncated) event JSON can be injected at random or for the next N calls.
+
+Point the backend at it with:
+    GEMINI_BASE_URL=http://127.0.0.1:8006/
+    OPENAI_BASE_URL=http://127.0.0.1:8006/v1
+
+Run from src/backend:
+    python -m event_generation.testing.fake_llm_server --port 8006 --latency-ms 800 --jitter-ms 300 \\
+        --distribution lognormal --rate-limit-rate 0.02
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from base64 import b64decode, urlsafe_b64decode
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from event_generation.testing.bench_convert import case_image, fingerprint, load_recordings, recorded_events
+
+GEMINI_PATH = re.compile(r"^/v1(?:beta|alpha)?/models/([^/:]+):(generateContent|streamGenerateContent)$")
+GEMINI_MODEL_PATH = re.compile(r"^/v1(?:beta|alpha)?/models/([^/:]+)$")
+OPENAI_CHAT_PATH = "/v1/chat/completions"
+OPENAI_MODEL_PATH = re.compile(r"^/v1/models/([^/]+)$")
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+IMAGE_TOKENS = {"gemini": 258, "openai": 25501}
+SYSTEM_PROMPT_TOKENS = 1712
+
+# (status, headers, body) of a non-streaming response
+ApiResponse = Tuple[int, Dict[str, str], bytes]
+
+
+def _json_response(status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> ApiResponse:
+    return status, {"Content-Type": "application/json; charset=UTF-8", **(headers or {})}, json.dumps(payload).encode("utf-8")
+
+
+def _error(provider: str, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> ApiResponse:
+    if provider == "gemini":
+        names = {400: "INVALID_ARGUMENT", 401: "UNAUTHENTICATED", 404: "NOT_FOUND", 429: "RESOURCE_EXHAUSTED"}
+        payload = {"error": {"code": status, "message": message, "status": names.get(status, "INTERNAL")}}
+    else:
+        kinds = {400: "invalid_request_error", 401: "invalid_request_error", 404: "invalid_request_error", 429: "rate_limit_error"}
+        payload = {"error": {"message": message, "type": kinds.get(status, "server_error"), "param": None, "code": None}}
+    return _json_response(status, payload, headers)
+
+
+def _tokens(text: str, chars_per_token: int) -> int:
+    return max(1, math.ceil(len(text) / chars_per_token))
+
+
+@dataclass
+class FakeLlmConfig:
+    """Behaviour knobs, can be changed while running through POST /_fake/config"""
+    latency_ms: float = 0.0  # typical time to the response (to the first chunk when streaming)
+    jitter_ms: float = 0.0  # spread of the distribution, see sample_latency()
+    distribution: str = "fixed"  # fixed, uniform, normal, lognormal or exponential
+    token_interval_ms: float = 0.0  # streaming: pause between chunks
+    chars_per_token: int = 4  # streaming chunk size, also used to estimate token counts
+    error_rate: float = 0.0  # probability of a 500
+    rate_limit_rate: float = 0.0  # probability of a 429
+    retry_after: int = 1  # Retry-After seconds of injected 429s
+    malformed_rate: float = 0.0  # probability of a 200 whose event JSON is cut off
+    require_key: bool = True  # reject calls without an API key
+    seed: Optional[int] = None
+
+    def update(self, values: dict):
+        known = {field.name for field in fields(self)}
+        for name, value in values.items():
+            if name in known:
+                setattr(self, name, value)
+
+
+class FakeLlmState:
+    """Canned responses, injected failures and counters of the fake server"""
+
+    def __init__(self, config: Optional[FakeLlmConfig] = None):
+        self.config = config or FakeLlmConfig()
+        self.lock = threading.Lock()
+        self.random = random.Random(self.config.seed)
+        self._fail_next: List[object] = []  # statuses or "malformed" for the next calls
+        self._canned: Dict[str, Dict[str, str]] = {}  # provider -> fingerprint -> event JSON text
+        recordings = load_recordings()
+        for provider in ("gemini", "openai"):
+            self._canned[provider] = {
+                fingerprint(case["text"], case_image(case)): json.dumps({"events": recorded_events(recordings[provider][name], provider)})
+                for name, case in recordings["cases"].items()
+            }
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self._fail_next.clear()
+            self.counts = {
+                "requests": 0, "streams": 0, "errors": 0, "throttled": 0, "malformed": 0,
+                "canned": 0, "templated": 0, "input_tokens": 0, "output_tokens": 0,
+            }
+
+    def fail_next(self, count: int = 1, status=500):
+        """Make the next `count` generate calls fail with `status` (429, 500, ...) or "malformed" """
+        with self.lock:
+            self._fail_next.extend([status] * count)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {**self.counts, "config": asdict(self.config)}
+
+    def sample_latency(self) -> float:
+        """Seconds; jitter_ms is the range (uniform), standard deviation (normal) or log-scale spread (lognormal)"""
+        config = self.config
+        mean, spread = config.latency_ms / 1000, config.jitter_ms / 1000
+        with self.lock:
+            if config.distribution == "uniform":
+                value = mean + self.random.uniform(0, spread)
+            elif config.distribution == "normal":
+                value = self.random.gauss(mean, spread)
+            elif config.distribution == "lognormal":
+                # median latency_ms, heavy right tail like real model latencies
+                value = mean * math.exp(self.random.gauss(0, spread / mean)) if mean else 0.0
+            elif config.distribution == "exponential":
+                value = self.random.expovariate(1 / mean) if mean else 0.0
+            else:
+                value = mean
+        return max(0.0, value)
+
+    def _injected(self) -> Optional[object]:
+        """Failure to inject into this call: an HTTP status, "malformed" or None"""
+        with self.lock:
+            self.counts["requests"] += 1
+            if self._fail_next:
+                return self._fail_next.pop(0)
+            roll = self.random.random()
+            if roll < self.config.rate_limit_rate:
+                return 429
+            roll -= self.config.rate_limit_rate
+            if roll < self.config.error_rate:
+                return 500
+            roll -= self.config.error_rate
+            if roll < self.config.malformed_rate:
+                return "malformed"
+        return None
+
+    def _count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counts[name] += amount
+
+    def events_json(self, provider: str, text: str, image: Optional[bytes]) -> str:
+        """The recorded events for a known input, else one event templated from the text"""
+        canned = self._canned[provider].get(fingerprint(text, image))
+        if canned is not None:
+            self._count("canned")
+            return canned
+        self._count("templated")
+        start = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+        title = " ".join(text.split()[:6]) or "Event from image"
+        return json.dumps({"events": [{
+            "title": title, "is_all_day": False,
+            "start_time": start.strftime("%Y%m%dT%H%M00"),
+            "end_time": (start + timedelta(hours=1)).strftime("%Y%m%dT%H%M00"),
+            "time_zone": "America/Los_Angeles", "description": f"Generated by the fake LLM server from: {text[:200]}",
+            "location": None, "attendees": [], "is_recurring": False, "recurrence_pattern": None,
+            "recurrence_days": None, "recurrence_count": None, "recurrence_end_date": None,
+        }]})
+
+    def generate(self, provider: str, text: str, image: Optional[bytes]):
+        """
+        Run one generate call
+
+        Returns:
+            (error response or None, model output text, (input tokens, output tokens, image tokens))
+        """
+        injected = self._injected()
+        if injected == 429:
+            self._count("throttled")
+            return _error(provider, 429, "Resource has been exhausted (e.g. check quota).",
+                          {"Retry-After": str(self.config.retry_after)}), None, None
+        if isinstance(injected, int):
+            self._count("errors")
+            return _error(provider, injected, "Injected error from the fake LLM server."), None, None
+
+        output = self.events_json(provider, text, image)
+        if injected == "malformed":
+            self._count("malformed")
+            output = output[: max(1, len(output) // 2)]
+        if provider == "gemini":
+            output = f"```json\n{output}\n```"
+        image_tokens = IMAGE_TOKENS[provider] if image else 0
+        usage = (
+            SYSTEM_PROMPT_TOKENS + _tokens(text, self.config.chars_per_token) + image_tokens if text else SYSTEM_PROMPT_TOKENS + image_tokens,
+            _tokens(output, self.config.chars_per_token),
+            image_tokens,
+        )
+        self._count("input_tokens", usage[0])
+        self._count("output_tokens", usage[1])
+        return None, output, usage
+
+    def chunks(self, output: str) -> Iterator[str]:
+        size = max(1, self.config.chars_per_token)
+        for start in range(0, len(output), size):
+            yield output[start:start + size]
+
+
+def gemini_request_input(body: dict) -> Tuple[str, Optional[bytes]]:
+    parts = (body.get("contents") or [{}])[-1].get("parts", [])
+    text = "".join(part.get("text", "") for part in parts)
+    images = [part.get("inlineData") or part.get("inline_data") for part in parts]
+    images = [image["data"] for image in images if image]
+    # the SDK sends url-safe base64 without padding
+    return text, urlsafe_b64decode(images[0] + "==") if images else None
+
+
+def openai_request_input(body: dict) -> Tuple[str, Optional[bytes]]:
+    content = (body.get("messages") or [{}])[-1].get("content", "")
+    if isinstance(content, str):
+        return content, None
+    text, image = "", None
+    for part in content:
+        if part.get("type") == "text":
+            text += part["text"]
+        elif part.get("type") == "image_url":
+            image = b64decode(unquote(part["image_url"]["url"]).split(",", 1)[1])
+    return text, image
+
+
+def gemini_chunk(text: str, usage: Optional[Tuple[int, int, int]], model: str, finished: bool) -> dict:
+    chunk = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}], "modelVersion": model}
+    if finished:
+        chunk["candidates"][0]["finishReason"] = "STOP"
+    if usage:
+        details = [{"modality": "TEXT", "tokenCount": usage[0] - usage[2]}]
+        if usage[2]:
+            details.append({"modality": "IMAGE", "tokenCount": usage[2]})
+        chunk["usageMetadata"] = {
+            "promptTokenCount": usage[0], "candidatesTokenCount": usage[1],
+            "totalTokenCount": usage[0] + usage[1], "promptTokensDetails": details,
+        }
+    return chunk
+
+
+def openai_completion(output: str, usage: Tuple[int, int, int], model: str, completion_id: str) -> dict:
+    return {
+        "id": completion_id, "object": "chat.completion", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": output, "refusal": None},
+                     "logprobs": None, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": usage[0], "completion_tokens": usage[1], "total_tokens": usage[0] + usage[1]},
+    }
+
+
+def openai_chunk(delta: dict, model: str, completion_id: str, finish_reason: Optional[str] = None,
+                 usage: Optional[Tuple[int, int, int]] = None) -> dict:
+    chunk = {
+        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}],
+    }
+    if usage:
+        chunk["usage"] = {"prompt_tokens": usage[0], "completion_tokens": usage[1], "total_tokens": usage[0] + usage[1]}
+    return chunk
+
+
+class FakeLlmHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: FakeLlmState = None
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/_fake/stats":
+            self._send(*_json_response(200, self.state.stats()))
+            return
+        match = GEMINI_MODEL_PATH.match(path)
+        if match:
+            self._send(*_json_response(200, {"name": f"models/{match.group(1)}", "displayName": match.group(1)}))
+            return
+        match = OPENAI_MODEL_PATH.match(path)
+        if match:
+            self._send(*_json_response(200, {"id": match.group(1), "object": "model", "created": 0, "owned_by": "fake"}))
+            return
+        self._send(*_error("openai" if path.startswith("/v1/") else "gemini", 404, "Not Found"))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        url = urlsplit(self.path)
+        if url.path == "/_fake/config":
+            self.state.config.update(json.loads(body or b"{}"))
+            self._send(*_json_response(200, self.state.stats()))
+            return
+        if url.path == "/_fake/reset":
+            self.state.reset()
+            self._send(*_json_response(200, self.state.stats()))
+            return
+
+        match = GEMINI_PATH.match(url.path)
+        if match:
+            query = parse_qs(url.query)
+            key = self.headers.get("x-goog-api-key") or (query.get("key") or [None])[0]
+            self.generate("gemini", match.group(1), json.loads(body or b"{}"), key, match.group(2) == "streamGenerateContent")
+        elif url.path == OPENAI_CHAT_PATH:
+            request = json.loads(body or b"{}")
+            authorization = self.headers.get("Authorization") or ""
+            key = authorization[7:] if authorization.lower().startswith("bearer ") else None
+            self.generate("openai", request.get("model", "gpt-4o-mini"), request, key, bool(request.get("stream")))
+        else:
+            self._send(*_error("gemini", 404, "Not Found"))
+
+    def generate(self, provider: str, model: str, request: dict, key: Optional[str], stream: bool):
+        if self.state.config.require_key and not key:
+            self._send(*_error(provider, 401, "API key not valid. Please pass a valid API key."))
+            return
+        text, image = gemini_request_input(request) if provider == "gemini" else openai_request_input(request)
+        time.sleep(self.state.sample_latency())
+        error, output, usage = self.state.generate(provider, text, image)
+        if error is not None:
+            self._send(*error)
+            return
+        if not stream:
+            if provider == "gemini":
+                self._send(*_json_response(200, gemini_chunk(output, usage, model, finished=True)))
+            else:
+                self._send(*_json_response(200, openai_completion(output, usage, model, f"chatcmpl-{uuid.uuid4().hex}")))
+            return
+
+        self.state._count("streams")
+        self._stream(self._events(provider, model, output, usage, request))
+
+    def _events(self, provider: str, model: str, output: str, usage, request: dict) -> Iterator[str]:
+        """Server-sent events of a streamed response, one model "token" per event"""
+        chunks = list(self.state.chunks(output))
+        if provider == "gemini":
+            for index, chunk in enumerate(chunks):
+                last = index == len(chunks) - 1
+                yield json.dumps(gemini_chunk(chunk, usage if last else None, model, finished=last))
+            return
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        yield json.dumps(openai_chunk({"role": "assistant", "content": ""}, model, completion_id))
+        for chunk in chunks:
+            yield json.dumps(openai_chunk({"content": chunk}, model, completion_id))
+        yield json.dumps(openai_chunk({}, model, completion_id, "stop"))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            final = openai_chunk({}, model, completion_id, usage=usage)
+            final["choices"] = []
+            yield json.dumps(final)
+        yield "[DONE]"
+
+    def _stream(self, events: Iterator[str]):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        interval = self.state.config.token_interval_ms / 1000
+        for index, event in enumerate(events):
+            if index and interval:
+                time.sleep(interval)
+            data = f"data: {event}\r\n\r\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, status: int, headers: Dict[str, str], body: bytes):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeLlmServer:
+    """
+    Runs the fake Gemini/OpenAI API on a background thread
+
+    Usage:
+        with FakeLlmServer(config=FakeLlmConfig(latency_ms=200)) as server:
+            settings = Settings(gemini_base_url=server.gemini_base_url, openai_base_url=server.openai_base_url, ...)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[FakeLlmConfig] = None):
+        self.state = FakeLlmState(config)
+        handler = type("Handler", (FakeLlmHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def gemini_base_url(self) -> str:
+        return self.url
+
+    @property
+    def openai_base_url(self) -> str:
+        return self.url + "v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Gemini and OpenAI APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8006)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="typical response time (time to first chunk when streaming)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="spread of the latency distribution")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--token-interval-ms", type=float, default=0.0, help="pause between streamed chunks")
+    parser.add_argument("--chars-per-token", type=int, default=4)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="probability of a 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="probability of truncated event JSON")
+    parser.add_argument("--no-auth", action="store_true", help="accept calls without an API key")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeLlmConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        distribution=args.distribution,
+        token_interval_ms=args.token_interval_ms,
+        chars_per_token=args.chars_per_token,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        malformed_rate=args.malformed_rate,
+        require_key=not args.no_auth,
+        seed=args.seed,
+    )
+    server = FakeLlmServer(args.host, args.port, config)
+    print(f"Fake LLM API listening on {server.url}")
+    print(f"  GEMINI_BASE_URL={server.gemini_base_url}")
+    print(f"  OPENAI_BASE_URL={server.openai_base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Load generator for a running deployment
+Sends /convert and /calendar/add-event traffic to a target URL and reports achieved
+throughput, latency percentiles, a latency histogram and a breakdown of the errors.
+
+Two ways to apply load:
+- closed loop (--concurrency N): N clients each send their next request as soon as the last
+  one finished, so the offered load drops when the server slows down
+- open loop (--rate R): requests start at R per second whatever the server does, the way
+  independent users arrive. Latency is measured from the scheduled start, so queueing
+  behind a slow server is counted instead of hidden (coordinated omission)
+
+--steps runs the same mode at several levels one after another, e.g. --rate with
+--steps 1,2,4,8,16; the level where throughput stops following the offered load while
+latency climbs is the deployment's saturation point.
+
+/convert requests come from a corpus of texts and images: the recorded benchmark cases by
+default, or a directory of .txt and image files (--corpus). /calendar/add-event needs a
+signed-in session (--session, the calendarize_session cookie) and creates real events in
+that account, so point it at a test account or at testing/fake_calendar_server.py.
+Against testing/fake_llm_server.py, /convert load costs no provider tokens.
+
+Run from src/backend:
+    python -m event_generation.testing.load_generator http://localhost:8000 --concurrency 8 --duration 30
+    python -m event_generation.testing.load_generator http://localhost:8000 --rate 5 --steps 1,2,4,8 \\
+        --duration 20 --mix convert=9,add-event=1 --session <cookie> [--json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from event_generation.testing.bench_convert import LOCAL_TIME, LOCAL_TZ, case_image, load_recordings, percentile
+
+ENDPOINTS = {"convert": "/convert", "add-event": "/calendar/add-event"}
+SESSION_COOKIE = "calendarize_session"  # API_interaction.session_store.SESSION_COOKIE
+IMAGE_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp"}
+# upper bounds of the histogram buckets in milliseconds, the last one is open
+HISTOGRAM_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, math.inf)
+
+
+@dataclass
+class ConvertInput:
+    text: str
+    image: Optional[bytes] = None
+    image_name: Optional[str] = None
+
+
+def load_corpus(directory: Optional[Path] = None) -> List[ConvertInput]:
+    """
+    /convert inputs
+
+    Args:
+        directory: .txt files (one input each) and images (sent with an empty text), None for the recorded cases
+
+    Returns:
+        The inputs, never empty
+    """
+    if directory is None:
+        cases = load_recordings()["cases"].values()
+        return [ConvertInput(case["text"], case_image(case), case["image"]) for case in cases]
+    corpus = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix == ".txt":
+            corpus.append(ConvertInput(path.read_text(encoding="utf-8")))
+        elif path.suffix.lower() in IMAGE_TYPES:
+            corpus.append(ConvertInput("", path.read_bytes(), path.name))
+    if not corpus:
+        raise ValueError(f"No .txt or image files in {directory}")
+    return corpus
+
+
+def add_event_body(rng: random.Random) -> Dict[str, str]:
+    start = datetime(2030, 1, 1, 9) + timedelta(days=rng.randrange(365), minutes=rng.randrange(32) * 15)
+    return {
+        "title": f"Load test event {rng.randrange(10**9)}",
+        "description": "Created by event_generation/testing/load_generator.py",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+    }
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """"convert=9,add-event=1" -> endpoint weights"""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r}, use one of: {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def classify(response: Optional[httpx.Response], error: Optional[Exception], endpoint: str) -> Optional[str]:
+    """Error kind of one request, None when it succeeded"""
+    if error is not None:
+        if isinstance(error, httpx.TimeoutException):
+            return "timeout"
+        if isinstance(error, httpx.TransportError):
+            return "connection"
+        return type(error).__name__
+    if response.status_code >= 400:
+        return f"http_{response.status_code}"
+    if endpoint == "convert":
+        try:
+            if not isinstance(response.json(), list):
+                return "invalid_body"
+        except ValueError:
+            return "invalid_body"
+    return None
+
+
+class Recorder:
+    """Latencies and outcomes of one load step"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Counter = Counter()
+        self.requests: Counter = Counter()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def add(self, endpoint: str, latency: float, error: Optional[str]):
+        self.requests[endpoint] += 1
+        if error:
+            self.errors[f"{endpoint}:{error}"] += 1
+        else:
+            self.latencies.setdefault(endpoint, []).append(latency)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        latencies = [value for values in self.latencies.values() for value in values]
+        done = sum(self.requests.values())
+        result = {
+            "requests": done,
+            "errors": sum(self.errors.values()),
+            "error_breakdown": dict(self.errors.most_common()),
+            "elapsed_s": round(elapsed, 2),
+            "rps": round(done / elapsed, 2) if elapsed > 0 else None,
+            "ok_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+            **latency_summary(latencies),
+            "histogram": histogram(latencies),
+            "endpoints": {
+                endpoint: {"requests": count, **latency_summary(self.latencies.get(endpoint, []))}
+                for endpoint, count in self.requests.items()
+            },
+        }
+        return result
+
+
+def latency_summary(latencies: Sequence[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {"p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1),
+    }
+
+
+def histogram(latencies: Sequence[float], bounds_ms: Sequence[float] = HISTOGRAM_MS) -> List[Tuple[Optional[float], int]]:
+    """(upper bound in ms, None for the open last bucket, count) per bucket, up to the last non-empty one"""
+    counts = [0] * len(bounds_ms)
+    for latency in latencies:
+        milliseconds = latency * 1000
+        counts[next(index for index, bound in enumerate(bounds_ms) if milliseconds <= bound)] += 1
+    last = max((index for index, count in enumerate(counts) if count), default=-1)
+    return [(bound if bound != math.inf else None, count) for bound, count in zip(bounds_ms, counts)][: last + 1]
+
+
+class LoadGenerator:
+    """Sends the configured request mix and records the outcomes"""
+
+    def __init__(self, client: httpx.AsyncClient, corpus: List[ConvertInput], mix: Dict[str, float],
+                 seed: Optional[int] = None):
+        self.client = client
+        self.corpus = corpus
+        self.endpoints = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(seed)
+
+    async def send(self, recorder: Recorder, scheduled: Optional[float] = None):
+        """One request; latency counts from `scheduled` (open loop) or from now"""
+        endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+        started = scheduled if scheduled is not None else time.perf_counter()
+        response, error = None, None
+        try:
+            if endpoint == "convert":
+                item = self.rng.choice(self.corpus)
+                files = {"file": (item.image_name, item.image, IMAGE_TYPES.get(Path(item.image_name).suffix.lower(), "image/png"))} if item.image else None
+                data = {"text": item.text, "local_tz": LOCAL_TZ, "local_time": LOCAL_TIME}
+                response = await self.client.post(ENDPOINTS[endpoint], data=data, files=files)
+            else:
+                response = await self.client.post(ENDPOINTS[endpoint], json=add_event_body(self.rng))
+        except Exception as e:
+            error = e
+        recorder.add(endpoint, time.perf_counter() - started, classify(response, error, endpoint))
+
+    async def closed_loop(self, concurrency: int, duration: Optional[float] = None, requests: Optional[int] = None) -> Recorder:
+        """`concurrency` clients back to back, for `duration` seconds or `requests` requests"""
+        recorder = Recorder()
+        deadline = recorder.started + duration if duration else math.inf
+        remaining = requests if requests is not None else math.inf
+
+        async def client():
+            nonlocal remaining
+            while remaining > 0 and time.perf_counter() < deadline:
+                remaining -= 1
+                await self.send(recorder)
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        recorder.finished = time.perf_counter()
+        return recorder
+
+    async def open_loop(self, rate: float, duration: Optional[float] = None, requests: Optional[int] = None,
+                        max_in_flight: int = 1000) -> Recorder:
+        """
+        Start `rate` requests per second at fixed intervals
+
+        Arrivals that would exceed max_in_flight outstanding requests are not sent and count
+        as "overload" errors, so a stalled server can't exhaust the generator's memory.
+        """
+        recorder = Recorder()
+        total = requests if requests is not None else math.ceil(rate * (duration or 0))
+        in_flight = set()
+        for index in range(total):
+            scheduled = recorder.started + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                recorder.add("overload", 0.0, "max_in_flight")
+                continue
+            task = asyncio.create_task(self.send(recorder, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        # the step lasts at least its arrival window, also when the last requests fail fast
+        recorder.finished = max(time.perf_counter(), recorder.started + total / rate)
+        return recorder
+
+
+async def run(url: str, mode: str, levels: Sequence[float], duration: Optional[float] = None,
+              requests: Optional[int] = None, mix: Optional[Dict[str, float]] = None,
+              corpus: Optional[List[ConvertInput]] = None, session: Optional[str] = None,
+              timeout: float = 60.0, max_in_flight: int = 1000, seed: Optional[int] = None,
+              transport: Optional[httpx.AsyncBaseTransport] = None) -> List[Dict[str, Any]]:
+    """
+    Run one load step per level
+
+    Args:
+        url: Base URL of the deployment
+        mode: "closed" (levels are concurrencies) or "open" (levels are requests per second)
+        levels: Load levels, run in order
+        duration: Seconds per step (or requests per step when given)
+        mix: Endpoint weights, default convert only
+        transport: httpx transport to use instead of the network (tests)
+
+    Returns:
+        The summary of each step
+    """
+    mix = mix or {"convert": 1.0}
+    corpus = corpus or load_corpus()
+    cookies = {SESSION_COOKIE: session} if session else None
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    rows = []
+    async with httpx.AsyncClient(base_url=url, cookies=cookies, timeout=timeout, limits=limits, transport=transport) as client:
+        generator = LoadGenerator(client, corpus, mix, seed)
+        for level in levels:
+            if mode == "closed":
+                recorder = await generator.closed_loop(int(level), duration, requests)
+            else:
+                recorder = await generator.open_loop(level, duration, requests, max_in_flight)
+            rows.append({"mode": mode, ("concurrency" if mode == "closed" else "rate"): level, **recorder.summary()})
+    return rows
+
+
+def print_step(row: Dict[str, Any]):
+    level = f"concurrency {row['concurrency']:g}" if row["mode"] == "closed" else f"offered {row['rate']:g} rps"
+    print(f"\n== {level}: {row['requests']} requests in {row['elapsed_s']} s, "
+          f"{row['rps']} rps ({row['ok_rps']} ok), {row['errors']} errors")
+    if row["p50_ms"] is not None:
+        print(f"latency p50 {row['p50_ms']} ms, p90 {row['p90_ms']} ms, p99 {row['p99_ms']} ms, max {row['max_ms']} ms")
+    peak = max((count for _, count in row["histogram"]), default=0)
+    for bound, count in row["histogram"]:
+        label = f"<= {bound:g} ms" if bound is not None else f"> {HISTOGRAM_MS[-2]:g} ms"
+        print(f"  {label:>12} {count:>7} {'#' * round(40 * count / peak) if peak else ''}")
+    for kind, count in row["error_breakdown"].items():
+        print(f"  error {kind}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send /convert and /calendar/add-event load to a deployment")
+    parser.add_argument("url", help="base URL, e.g. http://localhost:8000")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, help="closed loop with this many clients (default 4)")
+    load.add_argument("--rate", type=float, help="open loop at this many requests per second")
+    parser.add_argument("--steps", help="comma-separated levels to run in turn instead of a single one")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds per step")
+    parser.add_argument("--requests", type=int, help="requests per step instead of --duration")
+    parser.add_argument("--mix", default="convert=1", help='endpoint weights, e.g. "convert=9,add-event=1"')
+    parser.add_argument("--corpus", type=Path, help="directory of .txt and image files, default the recorded cases")
+    parser.add_argument("--session", help="calendarize_session cookie for /calendar/add-event")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per request")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="open loop: outstanding request cap")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    mode = "open" if args.rate is not None else "closed"
+    levels = [float(level) for level in args.steps.split(",")] if args.steps else [args.rate if mode == "open" else args.concurrency or 4]
+    mix = parse_mix(args.mix)
+    if "add-event" in mix and not args.session:
+        parser.error("/calendar/add-event needs --session")
+
+    rows = asyncio.run(run(
+        args.url, mode, levels, None if args.requests else args.duration, args.requests, mix,
+        load_corpus(args.corpus), args.session, args.timeout, args.max_in_flight, args.seed,
+    ))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        print_step(row)
+    if len(rows) > 1:
+        print(f"\n{'level':>8}{'rps':>10}{'ok rps':>10}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+        for row in rows:
+            level = row["concurrency"] if mode == "closed" else row["rate"]
+            print(f"{level:>8g}{row['rps']!s:>10}{row['ok_rps']!s:>10}{row['errors']:>8}{row['p50_ms']!s:>10}{row['p99_ms']!s:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from collections import Counter
+
+from event_generation.event.event import Event
+from event_generation.testing.bench_event_rendering import (
+    UNUSUAL_ZONES, benchmarks, compare, load_baseline, make_corpus, run,
+)
+
+
+def test_corpus_covers_every_kind_of_event():
+    corpus = make_corpus(200)
+
+    assert set(Counter(corpus["kinds"])) == {"timed", "all_day", "recurring", "many_attendees"}
+    events = corpus["events"]
+    assert any(event.is_all_day for event in events)
+    assert {event.recurrence_pattern for event in events if event.is_recurring} == {"DAILY", "WEEKLY", "MONTHLY", "YEARLY"}
+    assert max(len(event.attendees) for event in events) >= 10
+    assert any(event.time_zone in UNUSUAL_ZONES for event in events)
+    assert all(rendered.ics and rendered.gcal_link and rendered.outlook_link for rendered in corpus["rendered"])
+    # the same seed gives the same corpus, so runs are comparable
+    assert make_corpus(200)["dates"] == corpus["dates"]
+
+
+def test_run_reports_every_benchmark():
+    results = run(number_of_events=20, repeat=1)
+
+    assert set(results["benchmarks"]) == set(benchmarks(make_corpus(1)))
+    assert all(result["us_per_call"] > 0 and result["relative"] > 0 for result in results["benchmarks"].values())
+    assert results["calibration_us"] > 0
+
+
+def test_stored_baseline_matches_the_benchmarks():
+    baseline = load_baseline()
+
+    assert set(baseline["benchmarks"]) == set(benchmarks(make_corpus(1)))
+
+
+def test_compare_applies_the_tolerance():
+    baseline = {"benchmarks": {"a": {"relative": 1.0}, "b": {"relative": 1.0}, "c": {"relative": 1.0}}}
+    results = {"benchmarks": {"a": {"relative": 1.2}, "b": {"relative": 1.3}, "c": {"relative": 0.5}, "d": {"relative": 1.0}}}
+
+    statuses = {row["name"]: row["status"] for row in compare(results, baseline, tolerance=0.25)}
+
+    assert statuses == {"a": "ok", "b": "regression", "c": "faster", "d": "new"}
+
+
+def test_rendering_survives_unusual_zones():
+    for zone in UNUSUAL_ZONES:
+        event = Event(time_zone=zone)
+        event.set_ical_string()
+        assert f"TZID:{zone}" in event.ics
@@ -0,0 +1,39 @@
+import pytest
+
+import event_generation.config.settings as settings_module
+from event_generation.config.settings import Settings
+from event_generation.testing.bench_convert import CASES, PROVIDERS, percentile, run
+
+
+@pytest.fixture(autouse=True)
+def replay_keys(monkeypatch):
+    monkeypatch.setattr(settings_module, "_settings", Settings(gemini_api_key="replay", openai_api_key="replay"))
+
+
+@pytest.mark.parametrize("provider", PROVIDERS)
+def test_recorded_responses_replay_through_convert(provider):
+    rows = run(providers=[provider], requests=4, concurrency=2)
+
+    assert [row["case"] for row in rows] == list(CASES)
+    for row in rows:
+        assert row["errors"] == 0, row
+        assert row["requests"] == 4
+        assert row["tokens_per_request"] > 0
+    events = {row["case"]: row["events"] for row in rows}
+    assert events == {"text": 2, "single_event": 2, "two_events": 3, "multiple_events": 4, "long_text": 24}
+
+
+def test_concurrent_requests_overlap_their_provider_calls():
+    # 8 requests with a 200 ms provider round-trip take 1.6 s when they run one at a time
+    [row] = run(providers=["openai"], cases=["text"], requests=8, concurrency=8, provider_latency=0.2)
+
+    assert row["errors"] == 0
+    assert row["requests"] / row["rps"] < 0.8
+    assert row["p99_ms"] < 800
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([3.0], 95) == 3.0
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+
+import pytest
+from dateutil.parser import parse
+
+from event_generation.event import date_parser as dp
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    dp.reset_parse_stats()
+
+
+@pytest.mark.parametrize("text", [
+    "20250220T170000",
+    "20250220T1700",
+    "2025-02-20T17:00:00",
+    "2025-02-20 17:00",
+    "20250130",
+    "2025-01-30",
+])
+def test_fixed_formats_match_dateutil(text):
+    assert dp.parse_datetime(text) == parse(text)
+    assert dp.get_parse_stats() == {"fixed": 1, "iso": 0, "dateutil": 0}
+
+
+def test_iso_fast_path_keeps_offset():
+    result = dp.parse_datetime("2025-02-20T17:00:00+00:00")
+    assert result == datetime(2025, 2, 20, 17, 0, tzinfo=timezone.utc)
+    assert dp.get_parse_stats()["iso"] == 1
+
+
+def test_falls_back_to_dateutil():
+    assert dp.parse_datetime("March 15 2025 2pm") == datetime(2025, 3, 15, 14, 0)
+    assert dp.get_parse_stats()["dateutil"] == 1
+
+
+def test_invalid_value_returns_none():
+    # month 13 matches the compact pattern but is rejected by every tier
+    assert dp.parse_datetime("20251301T100000") is None
+    assert dp.get_parse_stats() == {"fixed": 0, "iso": 0, "dateutil": 1}
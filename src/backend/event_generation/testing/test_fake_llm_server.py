@@ -0,0 +1,106 @@
+import json
+import time
+
+import httpx
+import pytest
+
+import event_generation.config.settings as settings_module
+from event_generation.config.settings import Settings
+from event_generation.event.event import Event
+from event_generation.nlp_parsers import create_parser
+from event_generation.testing.bench_convert import LOCAL_TIME, LOCAL_TZ, TESTING_DIR, load_recordings
+from event_generation.testing.fake_llm_server import FakeLlmConfig, FakeLlmServer
+
+
+@pytest.fixture
+def server():
+    with FakeLlmServer(config=FakeLlmConfig(seed=1)) as server:
+        yield server
+
+
+def parser_for(server, provider, monkeypatch):
+    monkeypatch.setattr(settings_module, "_settings", Settings(
+        model=provider, gemini_api_key="fake", openai_api_key="fake", provider_timeout=5,
+        gemini_base_url=server.gemini_base_url, openai_base_url=server.openai_base_url,
+    ))
+    parser = create_parser()
+    if provider == "openai":
+        parser.client = parser.client.with_options(max_retries=0)
+    return parser
+
+
+@pytest.mark.parametrize("provider", ["gemini", "openai"])
+def test_parsers_get_recorded_events(server, provider, monkeypatch):
+    parser = parser_for(server, provider, monkeypatch)
+    cases = load_recordings()["cases"]
+
+    parser.warm_up()
+    events = parser.parse(cases["text"]["text"], LOCAL_TIME, LOCAL_TZ)
+    image_events = parser.parse(cases["two_events"]["text"], LOCAL_TIME, LOCAL_TZ, str(TESTING_DIR / "two_events.png"))
+
+    assert len(events) == 2 and all(isinstance(event, Event) for event in events)
+    assert len(image_events) == 3
+    stats = server.state.stats()
+    assert stats["canned"] == 2 and stats["input_tokens"] > 0
+
+
+def test_unknown_input_gets_a_templated_event(server, monkeypatch):
+    events = parser_for(server, "gemini", monkeypatch).parse("Coffee with Sam", LOCAL_TIME, LOCAL_TZ)
+
+    assert [event.title for event in events] == ["Coffee with Sam"]
+    assert server.state.stats()["templated"] == 1
+
+
+@pytest.mark.parametrize("provider", ["gemini", "openai"])
+def test_injected_failures_reach_the_parser(server, provider, monkeypatch):
+    parser = parser_for(server, provider, monkeypatch)
+    server.state.fail_next(status=429)
+    server.state.fail_next(status=500)
+    server.state.fail_next(status="malformed")
+
+    for _ in range(3):
+        assert isinstance(parser.parse("Coffee with Sam", LOCAL_TIME, LOCAL_TZ), str)
+    stats = server.state.stats()
+    assert (stats["throttled"], stats["errors"], stats["malformed"]) == (1, 1, 1)
+
+
+def test_rate_limits_look_like_the_provider(server):
+    server.state.config.update({"rate_limit_rate": 1.0, "retry_after": 7})
+
+    response = httpx.post(server.url + "v1/chat/completions", headers={"Authorization": "Bearer fake"},
+                          json={"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "7"
+    assert response.json()["error"]["type"] == "rate_limit_error"
+    assert httpx.post(server.url + "v1/chat/completions", json={}).status_code == 401
+
+
+def test_streams_arrive_chunk_by_chunk():
+    config = FakeLlmConfig(latency_ms=50, token_interval_ms=5, chars_per_token=16)
+    with FakeLlmServer(config=config) as server:
+        body = {"contents": [{"parts": [{"text": "Coffee with Sam"}], "role": "user"}]}
+        started = time.perf_counter()
+        with httpx.stream("POST", server.url + "v1beta/models/gemini-2.0-flash-lite:streamGenerateContent?alt=sse",
+                          headers={"x-goog-api-key": "fake"}, json=body) as response:
+            chunks = [json.loads(line[6:]) for line in response.iter_lines() if line.startswith("data: ")]
+        elapsed = time.perf_counter() - started
+
+    text = "".join(chunk["candidates"][0]["content"]["parts"][0]["text"] for chunk in chunks)
+    assert len(chunks) > 10
+    assert json.loads(text.removeprefix("```json").removesuffix("```"))["events"][0]["title"] == "Coffee with Sam"
+    assert "usageMetadata" in chunks[-1] and "usageMetadata" not in chunks[0]
+    assert elapsed >= 0.05 + 0.005 * (len(chunks) - 1)
+
+
+def test_openai_stream_ends_with_done(server):
+    body = {"model": "gpt-4o-mini", "stream": True, "stream_options": {"include_usage": True},
+            "messages": [{"role": "user", "content": "Coffee with Sam"}]}
+    with httpx.stream("POST", server.url + "v1/chat/completions", headers={"Authorization": "Bearer fake"}, json=body) as response:
+        events = [line[6:] for line in response.iter_lines() if line.startswith("data: ")]
+
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event) for event in events[:-1]]
+    assert chunks[-1]["usage"]["completion_tokens"] > 0
+    text = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks if chunk["choices"])
+    assert json.loads(text)["events"][0]["title"] == "Coffee with Sam"
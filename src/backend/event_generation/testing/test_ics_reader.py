@@ -0,0 +1,94 @@
+import io
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from event_generation.event.ics_reader import MAX_LINE_LENGTH, iter_events, iter_unfolded_lines
+
+CALENDAR = (
+    b"BEGIN:VCALENDAR\r\n"
+    b"VERSION:2.0\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"SUMMARY:Slug Ai Meeting\r\n"
+    b"DTSTART;TZID=America/Los_Angeles:20250220T170000\r\n"
+    b"DTEND;TZID=America/Los_Angeles:20250220T180000\r\n"
+    b"DESCRIPTION:Weekly meeting\\, bring\r\n"
+    b"  snacks\r\n"
+    b"ATTENDEE;CN=\"Slug: Ai\":mailto:slug@ucsc.edu\r\n"
+    b"RRULE:FREQ=WEEKLY;BYDAY=TU,TH;UNTIL=20250530T000000Z\r\n"
+    b"BEGIN:VALARM\r\n"
+    b"DESCRIPTION:Reminder\r\n"
+    b"END:VALARM\r\n"
+    b"END:VEVENT\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"SUMMARY:Holiday\r\n"
+    b"DTSTART;VALUE=DATE:20250704\r\n"
+    b"END:VEVENT\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"SUMMARY:Call\r\n"
+    b"DTSTART:20250301T150000Z\r\n"
+    b"DURATION:PT30M\r\n"
+    b"END:VEVENT\r\n"
+    b"END:VCALENDAR\r\n"
+)
+
+
+def test_unfolding_across_chunk_boundaries():
+    # tiny chunks split lines, CRLF pairs and folds between reads
+    lines = list(iter_unfolded_lines(io.BytesIO(CALENDAR), chunk_size=7))
+    assert "DESCRIPTION:Weekly meeting\\, bring snacks" in lines
+    assert lines[0] == "BEGIN:VCALENDAR" and lines[-1] == "END:VCALENDAR"
+
+
+def test_events_are_read_one_by_one():
+    meeting, holiday, call = iter_events(io.BytesIO(CALENDAR), chunk_size=7)
+
+    assert meeting.title == "Slug Ai Meeting"
+    assert meeting.time_zone == "America/Los_Angeles"
+    assert meeting.start_time == datetime(2025, 2, 20, 17, 0)
+    assert meeting.description == "Weekly meeting, bring snacks"
+    assert meeting.attendees == ["slug@ucsc.edu"]
+    assert meeting.recurrence_days == ["TU", "TH"]
+    assert meeting.recurrence_end_date == datetime(2025, 5, 30)
+
+    assert holiday.is_all_day
+    assert holiday.end_time == datetime(2025, 7, 5)
+
+    assert call.time_zone == "UTC"
+    assert call.end_time == datetime(2025, 3, 1, 15, 30, tzinfo=timezone.utc)
+
+
+def test_oversized_lines_and_events_are_rejected():
+    folded = b"BEGIN:VEVENT\r\nDESCRIPTION:" + b"\r\n x" * 200 + b"\r\nEND:VEVENT\r\n"
+    with pytest.raises(ValueError, match="Line longer than 100"):
+        list(iter_unfolded_lines(io.BytesIO(folded), chunk_size=7, max_line_length=100))
+    with pytest.raises(ValueError, match="Line longer than 100"):
+        list(iter_unfolded_lines(io.BytesIO(b"x" * 1000), chunk_size=64, max_line_length=100))
+
+    # a VEVENT without END:VEVENT
+    unterminated = b"BEGIN:VEVENT\r\n" + b"COMMENT:filler\r\n" * 1000
+    with pytest.raises(ValueError, match="VEVENT larger than 1000"):
+        list(iter_events(io.BytesIO(unterminated), max_event_size=1000))
+    assert len(list(iter_events(io.BytesIO(CALENDAR), max_event_size=1000))) == 3
+
+
+def test_import_endpoint_rejects_oversized_lines():
+    calendar = b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nDESCRIPTION:" + b"x" * MAX_LINE_LENGTH + b"\r\n"
+    response = TestClient(main.app).post("/import", files={"file": ("calendar.ics", calendar)})
+    assert response.status_code == 422
+    assert "Line longer than" in response.json()["detail"]
+
+
+def test_import_endpoint_counts_everything_and_bounds_the_limit():
+    client = TestClient(main.app)
+
+    def post(limit):
+        return client.post("/import", files={"file": ("calendar.ics", CALENDAR)}, data={"limit": str(limit)})
+
+    body = post(2).json()
+    assert body["count"] == 3
+    assert [event["title"] for event in body["events"]] == ["Slug Ai Meeting", "Holiday"]
+    assert post(0).status_code == 422
+    assert post(1001).status_code == 422
@@ -0,0 +1,75 @@
+import io
+import json
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from icalendar import Calendar
+
+import main
+
+from event_generation.event.event import Event
+from event_generation.event.ics_reader import iter_events
+from event_generation.event.ics_writer import iter_calendar
+
+
+def make_events(number, time_zone="America/Los_Angeles"):
+    for index in range(number):
+        yield Event(
+            title=f"Lecture {index}",
+            time_zone=time_zone,
+            start_time=datetime(2025, 1, 6, 9, 0),
+            end_time=datetime(2025, 1, 6, 10, 0),
+            description="Intro to PDEs, bring a calculator",
+        )
+
+
+def test_chunks_form_one_valid_calendar():
+    events = list(make_events(200)) + list(make_events(3, time_zone="Asia/Kolkata"))
+    chunks = list(iter_calendar(iter(events), chunk_size=4096))
+
+    assert len(chunks) > 1
+    calendar = Calendar.from_ical("".join(chunks))
+    assert len(calendar.walk("VEVENT")) == 203
+    # one VTIMEZONE per distinct zone
+    assert [str(tz["TZID"]) for tz in calendar.walk("VTIMEZONE")] == ["America/Los_Angeles", "Asia/Kolkata"]
+
+
+def test_round_trip_through_streaming_reader():
+    text = "".join(iter_calendar(make_events(5)))
+    events = list(iter_events(io.BytesIO(text.encode("utf-8"))))
+    assert [event.title for event in events] == [f"Lecture {index}" for index in range(5)]
+    assert events[0].description == "Intro to PDEs, bring a calculator"
+
+
+def test_matches_single_event_ics():
+    event = next(make_events(1))
+    event.set_ical_string()
+    exported = Calendar.from_ical("".join(iter_calendar([event])))
+    single = Calendar.from_ical(event.ics)
+    assert exported.walk("VEVENT")[0]["SUMMARY"] == single.walk("VEVENT")[0]["SUMMARY"]
+    assert exported.walk("VTIMEZONE")[0].to_ical() == single.walk("VTIMEZONE")[0].to_ical()
+
+
+def export_body(time_zones):
+    return [json.loads(event.model_dump_json()) for time_zone in time_zones for event in make_events(1, time_zone)]
+
+
+def test_export_rejects_unknown_zones_before_streaming():
+    client = TestClient(main.app)
+
+    response = client.post("/export.ics", json=export_body(["America/Los_Angeles", "Mars/Olympus_Mons"]))
+    assert response.status_code == 422
+    assert "Mars/Olympus_Mons" in response.json()["detail"]
+
+    malformed = client.post("/export.ics", content=b"[{", headers={"content-type": "application/json"})
+    assert malformed.status_code == 422
+
+
+def test_ndjson_export_skips_unknown_zones():
+    lines = "\n".join(json.dumps(item) for item in export_body(["Asia/Kolkata", "Mars/Olympus_Mons", "UTC"]))
+
+    response = TestClient(main.app).post("/export.ics", content=lines, headers={"content-type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    calendar = Calendar.from_ical(response.text)
+    assert [str(tz["TZID"]) for tz in calendar.walk("VTIMEZONE")] == ["Asia/Kolkata", "UTC"]
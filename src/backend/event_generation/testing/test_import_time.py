@@ -0,0 +1,31 @@
+import statistics
+
+import pytest
+
+from event_generation.config.settings import Settings
+from event_generation.nlp_parsers import get_parser_class
+from event_generation.testing.bench_import_time import (
+    IMPORT_BUDGET_MS, loaded_lazy_modules, measure, total_ms,
+)
+
+
+@pytest.fixture(scope="module")
+def runs():
+    return measure("main", runs=3)
+
+
+def test_main_import_is_within_budget(runs):
+    median = statistics.median(total_ms(times) for times in runs)
+    assert median <= IMPORT_BUDGET_MS, f"import main took {median:.0f} ms, budget {IMPORT_BUDGET_MS:.0f} ms"
+
+
+def test_main_import_does_not_load_provider_sdks(runs):
+    assert loaded_lazy_modules(runs[0]) == []
+
+
+def test_parser_class_follows_configured_model():
+    assert get_parser_class(Settings(model="openai")).__name__ == "OpenAiParser"
+    assert get_parser_class(Settings(model="Gemini")).__name__ == "GeminiParser"
+    assert get_parser_class(Settings()).__name__ == "GeminiParser"
+    with pytest.raises(ValueError, match="Unknown MODEL"):
+        get_parser_class(Settings(model="llama"))
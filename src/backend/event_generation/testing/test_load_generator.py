@@ -0,0 +1,65 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+import main
+from event_generation.event.event import Event
+from event_generation.testing.load_generator import ConvertInput, histogram, load_corpus, parse_mix, run
+
+
+class SleepyParser:
+    provider = "fake"
+
+    def parse(self, text, local_time, local_tz, image_path=None):
+        time.sleep(0.01)
+        if text == "fail":
+            return "Invalid event data"
+        start = datetime(2025, 3, 3, 10)
+        return [Event(title=text or "Flyer", time_zone=local_tz, start_time=start, end_time=start + timedelta(hours=1))]
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    monkeypatch.setattr(main, "get_parser", lambda: SleepyParser())
+    return httpx.ASGITransport(app=main.app, raise_app_exceptions=False)
+
+
+def test_closed_loop_runs_the_requested_number(transport):
+    rows = asyncio.run(run("http://load", "closed", [1, 4], requests=12, transport=transport, seed=1))
+
+    assert [row["concurrency"] for row in rows] == [1, 4]
+    for row in rows:
+        assert row["requests"] == 12 and row["errors"] == 0
+        assert row["p50_ms"] >= 10
+        assert sum(count for _, count in row["histogram"]) == 12
+        assert row["endpoints"]["convert"]["requests"] == 12
+
+
+def test_open_loop_keeps_the_arrival_rate_and_breaks_down_errors(transport):
+    corpus = [ConvertInput("Dentist"), ConvertInput("fail")]
+    mix = parse_mix("convert=1,add-event=1")
+
+    [row] = asyncio.run(run("http://load", "open", [40], duration=0.5, mix=mix, corpus=corpus, transport=transport, seed=3))
+
+    assert row["requests"] == 20
+    assert 0.45 <= row["elapsed_s"] < 2
+    # add-event without a session, and a parser error reported as a bad gateway
+    assert set(row["error_breakdown"]) == {"add-event:http_401", "convert:http_502"}
+    assert row["errors"] == sum(row["error_breakdown"].values()) < row["requests"]
+
+
+def test_histogram_buckets():
+    assert histogram([0.005, 0.02, 0.02, 0.2]) == [(10, 1), (25, 2), (50, 0), (100, 0), (250, 1)]
+    assert histogram([60.0])[-1] == (None, 1)
+    assert histogram([]) == []
+
+
+def test_default_corpus_and_mix():
+    corpus = load_corpus()
+    assert any(item.image for item in corpus) and any(item.text for item in corpus)
+    assert parse_mix("convert=9,add-event=1") == {"convert": 9.0, "add-event": 1.0}
+    with pytest.raises(ValueError, match="Unknown endpoint"):
+        parse_mix("delete=1")
@@ -0,0 +1,94 @@
+import io
+import json
+import logging
+import queue
+from datetime import datetime, timedelta
+
+from event_generation.config.settings import Settings
+from event_generation.event.event import Event
+from event_generation.monitoring.logs import (
+    DROPPED_RECORDS, DroppingQueueHandler, JsonFormatter, configure_logging, error_fields, log_payload, redact,
+    redact_fields, shutdown_logging,
+)
+
+
+def make_record(message, *args, **extra):
+    record = logging.LogRecord("calendarize", logging.INFO, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record("Sending request to %s", "gemini", model="m", text_chars=12))
+
+    entry = json.loads(line)
+    assert entry["message"] == "Sending request to gemini"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "calendarize"
+    assert entry["model"] == "m"
+    assert entry["text_chars"] == 12
+
+
+def test_redaction_keeps_structure_and_hashes_user_content():
+    start = datetime(2025, 3, 3, 10)
+    event = Event(title="Dentist with Sam", time_zone="UTC", start_time=start, end_time=start + timedelta(hours=1),
+                  attendees=["sam@example.com"])
+
+    redacted = redact_fields({"event": event, "text": "dentist monday 10am"})
+
+    assert redacted["event"]["time_zone"] == "UTC"
+    assert redacted["event"]["is_recurring"] is False
+    assert "Dentist" not in json.dumps(redacted)
+    assert "sam@example.com" not in json.dumps(redacted)
+    assert redacted["text"] == redact("dentist monday 10am")
+    assert redacted["text"].startswith("<redacted 19 chars sha256:")
+
+
+def test_payload_logs_are_sampled(caplog):
+    logger = logging.getLogger("calendarize.test_payload")
+    caplog.set_level(logging.DEBUG, logger=logger.name)
+
+    log_payload(logger, "never", Settings(log_payload_sample_rate=0.0), text="hello")
+    log_payload(logger, "always", Settings(log_payload_sample_rate=1.0), text="hello")
+    log_payload(logger, "raw", Settings(log_payload_sample_rate=1.0, log_redact=False), text="hello")
+
+    assert [record.message for record in caplog.records] == ["always", "raw"]
+    assert caplog.records[0].payload["text"].startswith("<redacted 5 chars")
+    assert caplog.records[1].payload == {"text": "hello"}
+
+
+def test_error_fields_leave_out_the_rejected_values():
+    try:
+        Event(title="Dentist with Sam", time_zone="UTC", start_time="Dentist at noon", end_time=None)
+    except ValueError as error:
+        fields = error_fields(error)
+
+    assert fields == {"error_type": "ValidationError", "error_locations": ["start_time", "end_time"]}
+    assert error_fields(ValueError("Missing 'Dentist'")) == {"error_type": "ValueError"}
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    dropped = DROPPED_RECORDS.labels().value
+
+    handler.handle(make_record("first"))
+    handler.handle(make_record("second"))
+
+    assert handler.queue.qsize() == 1
+    assert DROPPED_RECORDS.labels().value == dropped + 1
+
+
+def test_configure_logging_writes_json_lines_from_the_background_thread():
+    shutdown_logging()
+    stream = io.StringIO()
+    configure_logging(Settings(log_level="INFO", log_levels="calendarize.noisy=ERROR"), stream=stream)
+    try:
+        logging.getLogger("calendarize.test").info("hello", extra={"route": "/convert"})
+        logging.getLogger("calendarize.noisy").warning("filtered")
+    finally:
+        # stopping the listener writes out everything still queued
+        shutdown_logging()
+        logging.getLogger("calendarize.noisy").setLevel(logging.NOTSET)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["message"], line["route"]) for line in lines] == [("hello", "/convert")]
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+import main
+from event_generation.event.event import Event
+from event_generation.monitoring import PROVIDER_ERRORS, lap
+from event_generation.monitoring.metrics import Registry, cache_collector, counter, gauge, histogram
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = counter("app_requests_total", "Requests", ("route",), registry=registry)
+    in_flight = gauge("app_in_flight", "In flight", registry=registry)
+    latency = histogram("app_latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    registry.register_collector(cache_collector("app_cache", lambda: {"zones": (3, 1)}))
+
+    requests.labels(route='/say "hi"').inc(2)
+    in_flight.inc()
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+    text = registry.render()
+
+    assert '# TYPE app_requests_total counter' in text
+    assert 'app_requests_total{route="/say \\"hi\\""} 2' in text
+    assert 'app_in_flight 1' in text
+    assert 'app_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'app_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'app_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert 'app_latency_seconds_count 3' in text
+    assert 'app_latency_seconds_sum 5.55' in text
+    assert 'app_cache_hit_ratio{cache="zones"} 0.75' in text
+
+
+class StagedParser:
+    provider = "fake"
+
+    def parse(self, text, local_time, local_tz, image_path=None):
+        for name in ("prompt", "llm", "decode"):
+            lap(name)
+        PROVIDER_ERRORS.labels(provider=self.provider, kind="invalid_response").inc()
+        start = datetime(2025, 3, 3, 10)
+        lap("validate")
+        return [Event(title=text, time_zone=local_tz, start_time=start, end_time=start + timedelta(hours=1))]
+
+
+def test_convert_reports_stages_in_server_timing_and_metrics(monkeypatch):
+    monkeypatch.setattr(main, "get_parser", lambda: StagedParser())
+    client = TestClient(main.app)
+
+    response = client.post("/convert", data={"text": "Dentist", "local_tz": "UTC", "local_time": "2025-03-01T10:00:00Z"})
+
+    assert response.status_code == 200
+    stages = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert stages == ["upload", "prompt", "llm", "decode", "validate", "render", "total"]
+
+    metrics = client.get("/metrics").text
+    assert 'calendarize_stage_duration_seconds_count{route="/convert",stage="llm"}' in metrics
+    assert 'calendarize_requests_total{route="/convert",method="POST",status="200"}' in metrics
+    assert 'calendarize_provider_errors_total{provider="fake",kind="invalid_response"}' in metrics
+    assert 'calendarize_cache_hit_ratio{cache="vtimezone"}' in metrics
+    assert 'calendarize_requests_in_flight{method="GET"} 1' in metrics
+
+
+def test_unmatched_paths_share_one_label():
+    client = TestClient(main.app)
+    client.get("/no/such/page/123")
+    assert 'calendarize_requests_total{route="unmatched",method="GET",status="404"}' in client.get("/metrics").text
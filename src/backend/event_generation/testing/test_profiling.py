@@ -0,0 +1,88 @@
+import pstats
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import event_generation.config.settings as settings_module
+import event_generation.monitoring.profiling as profiling
+import main
+from event_generation.config.settings import Settings
+from event_generation.event.event import Event
+from event_generation.monitoring.profiling import ProfilerBusy, RequestProfile
+
+DATA = {"text": "Dentist", "local_tz": "UTC", "local_time": "2025-03-01T10:00:00Z"}
+
+
+def busy_parse(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class SlowParser:
+    provider = "fake"
+
+    def parse(self, text, local_time, local_tz, image_path=None):
+        busy_parse(0.05)
+        start = datetime(2025, 3, 3, 10)
+        return [Event(title=text, time_zone=local_tz, start_time=start, end_time=start + timedelta(hours=1))]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings_module, "_settings", Settings(admin_token="secret", profile_dir=str(tmp_path)))
+    monkeypatch.setattr(profiling, "_slots", None)
+    monkeypatch.setattr(main, "get_parser", lambda: SlowParser())
+    return TestClient(main.app)
+
+
+def test_profile_requires_the_admin_token(client):
+    assert client.post("/convert?profile=1", data=DATA).status_code == 403
+    assert client.post("/convert?profile=1", data=DATA, headers={"X-Admin-Token": "wrong"}).status_code == 403
+    # without profile=1 nothing changes
+    response = client.post("/convert", data=DATA)
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+def test_pstats_profile_covers_parse_and_rendering(client, tmp_path):
+    response = client.post("/convert?profile=1", data=DATA, headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["ics"]
+    profile_id = response.headers["x-profile-id"]
+    stats = pstats.Stats(str(tmp_path / f"{profile_id}.pstats"))
+    functions = {name for _, _, name in stats.stats}
+    assert {"busy_parse", "set_ical_string", "set_gcal_link"} <= functions
+
+    download = client.get(f"/profiles/{profile_id}", headers={"X-Admin-Token": "secret"})
+    assert download.status_code == 200
+    assert client.get(f"/profiles/{profile_id}").status_code == 403
+    assert client.get("/profiles/..%2Fsecret", headers={"X-Admin-Token": "secret"}).status_code == 404
+
+
+def test_collapsed_profile_samples_the_handler(client, tmp_path):
+    response = client.post(
+        "/convert?profile=1&profile_format=collapsed", data=DATA, headers={"X-Admin-Token": "secret"}
+    )
+
+    lines = (tmp_path / f"{response.headers['x-profile-id']}.collapsed").read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert stack.startswith("main.convert;main.run_convert;")
+    assert "busy_parse" in stack
+    assert int(count) > 0
+
+
+def test_concurrent_profiles_are_capped(client):
+    with RequestProfile("pstats"):
+        with pytest.raises(ProfilerBusy):
+            with RequestProfile("pstats"):
+                pass
+        response = client.post("/convert?profile=1", data=DATA, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 429
+    # the slot is free again
+    with RequestProfile("pstats"):
+        pass
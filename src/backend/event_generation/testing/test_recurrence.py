@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from event_generation.event.event import Event
+from event_generation.event.recurrence import get_occurrences
+
+
+def make_event(**kwargs):
+    fields = dict(
+        title="Slug Ai Meeting",
+        start_time=datetime(2025, 2, 18, 17, 0),
+        end_time=datetime(2025, 2, 18, 18, 0),
+        is_recurring=True,
+        recurrence_pattern="WEEKLY",
+        recurrence_days=["TU", "TH"],
+    )
+    fields.update(kwargs)
+    return Event(**fields)
+
+
+def test_weekly_days_inside_window():
+    occurrences, truncated = get_occurrences(
+        make_event(), datetime(2025, 2, 18), datetime(2025, 3, 1)
+    )
+    assert [start.day for start, _ in occurrences] == [18, 20, 25, 27]
+    assert all(end - start == timedelta(hours=1) for start, end in occurrences)
+    assert not truncated
+
+
+def test_count_and_end_date_bound_the_series():
+    occurrences, _ = get_occurrences(make_event(recurrence_count=3))
+    assert len(occurrences) == 3
+
+    # the end date is inclusive for the whole day
+    occurrences, _ = get_occurrences(make_event(recurrence_end_date=datetime(2025, 2, 25)))
+    assert occurrences[-1][0] == datetime(2025, 2, 25, 17, 0)
+
+
+def test_far_window_of_unbounded_series_is_truncated():
+    event = make_event(recurrence_pattern="DAILY", recurrence_days=None)
+    occurrences, truncated = get_occurrences(
+        event, datetime(2035, 1, 1), datetime(2036, 1, 1), limit=10
+    )
+    assert occurrences[0][0] == datetime(2035, 1, 1, 17, 0)
+    assert len(occurrences) == 10
+    assert truncated
+
+
+def test_non_recurring_event():
+    event = make_event(is_recurring=False)
+    assert get_occurrences(event) == ([(event.start_time, event.end_time)], False)
+    assert get_occurrences(event, datetime(2026, 1, 1)) == ([], False)
+
+
+def test_unknown_pattern():
+    with pytest.raises(ValueError):
+        get_occurrences(make_event(recurrence_pattern="HOURLY"))
+
+
+def test_preview_rejects_unknown_zone():
+    # an aware window against a floating event is converted through the event's zone
+    event = make_event(time_zone="Mars/Olympus_Mons").model_dump(mode="json")
+    response = TestClient(main.app).post(
+        "/preview", json={"event": event, "window_start": "2025-02-18T00:00:00+00:00"}
+    )
+    assert response.status_code == 422
+    assert "Mars/Olympus_Mons" in response.json()["detail"]
@@ -0,0 +1,89 @@
+import dataclasses
+import os
+import signal
+
+import pytest
+
+import event_generation.config.settings as settings_module
+from event_generation.config import readenv
+from event_generation.config.settings import Settings, get_settings, install_reload_handler, reload_settings
+
+
+@pytest.fixture(autouse=True)
+def restore_settings(monkeypatch):
+    monkeypatch.setattr(settings_module, "_settings", None)
+    yield
+
+
+def test_from_env_types_values_and_prefers_environment(tmp_path):
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("MODEL=gemini\nGEMINI_API_KEY=from-file\nSERVICE_CACHE_SIZE=8\n")
+
+    settings = Settings.from_env({"GEMINI_API_KEY": "from-env", "PROVIDER_TIMEOUT": "2.5"}, dotenv)
+
+    assert settings.model == "gemini"
+    assert settings.gemini_api_key == "from-env"
+    assert settings.service_cache_size == 8
+    assert settings.provider_timeout == 2.5
+    assert settings.openai_api_key is None
+
+
+def test_settings_are_immutable():
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        Settings().model = "openai"
+
+
+def test_invalid_value_is_reported():
+    with pytest.raises(ValueError, match="SESSION_MAX_AGE"):
+        Settings.from_env({"SESSION_MAX_AGE": "forever"}, None)
+
+
+def test_getters_read_the_cached_settings(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Settings, "from_env", classmethod(lambda cls: calls.append(1) or cls(gemini_api_key="key", model="gemini")))
+
+    assert [readenv.get_gemini_key() for _ in range(3)] == ["key"] * 3
+    assert readenv.get_model() == "gemini"
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        readenv.get_openai_key()
+
+
+def test_reload_swaps_settings_and_keeps_previous_on_error(monkeypatch):
+    monkeypatch.setenv("MODEL", "gemini")
+    first = get_settings()
+    monkeypatch.setenv("MODEL", "openai")
+    assert get_settings() is first
+
+    assert reload_settings().model == "openai"
+    monkeypatch.setenv("SERVICE_CACHE_SIZE", "many")
+    assert reload_settings().model == "openai"
+
+
+def test_reload_reaches_running_objects_and_warns_about_restart_keys(monkeypatch, caplog):
+    from API_interaction.availability import BusyCache
+
+    monkeypatch.setenv("BUSY_CACHE_TTL", "30")
+    cache = BusyCache()
+    assert cache.ttl == 30
+
+    monkeypatch.setenv("BUSY_CACHE_TTL", "5")
+    monkeypatch.setenv("BUSY_CACHE_SIZE", "7")
+    reload_settings()
+
+    assert cache.ttl == 5
+    assert "busy_cache_size" in caplog.text and "busy_cache_ttl" not in caplog.text
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="no SIGHUP on this platform")
+def test_sighup_reloads(monkeypatch):
+    previous = signal.getsignal(signal.SIGHUP)
+    monkeypatch.setenv("MODEL", "gemini")
+    get_settings()
+    try:
+        assert install_reload_handler()
+        monkeypatch.setenv("MODEL", "openai")
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert get_settings().model == "openai"
+    finally:
+        signal.signal(signal.SIGHUP, previous)
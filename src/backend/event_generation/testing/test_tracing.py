@@ -0,0 +1,121 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import event_generation.config.settings as settings_module
+import main
+from event_generation.config.settings import Settings
+from event_generation.event.event import Event
+from event_generation.monitoring import lap, span
+from event_generation.monitoring.tracing import (
+    JsonlFileExporter, OtlpHttpExporter, set_exporter, shutdown_tracing, start_trace,
+)
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+    def close(self):
+        pass
+
+
+class StagedParser:
+    provider = "fake"
+
+    def parse(self, text, local_time, local_tz, image_path=None):
+        lap("prompt")
+        with span("provider_call", attempt=1):
+            lap("llm")
+        lap("decode")
+        start = datetime(2025, 3, 3, 10)
+        return [Event(title=text, time_zone=local_tz, start_time=start, end_time=start + timedelta(hours=1))]
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    def configure(**values):
+        monkeypatch.setattr(settings_module, "_settings", Settings(tracing=True, **values))
+        return set_exporter(ListExporter()).exporter
+
+    monkeypatch.setattr(main, "get_parser", lambda: StagedParser())
+    yield configure
+    shutdown_tracing()
+
+
+def convert(client, **headers):
+    data = {"text": "Dentist", "local_tz": "UTC", "local_time": "2025-03-01T10:00:00Z"}
+    return client.post("/convert", data=data, headers=headers)
+
+
+def test_sampled_convert_exports_stage_spans(traced):
+    exporter = traced(trace_sample_rate=1.0)
+    response = convert(TestClient(main.app))
+    shutdown_tracing()
+
+    trace_id = response.headers["traceparent"].split("-")[1]
+    spans = {item["name"]: item for item in exporter.spans}
+    root = spans["POST /convert"]
+    assert {item["trace_id"] for item in exporter.spans} == {trace_id}
+    assert root["parent_span_id"] is None
+    assert root["attributes"]["http.status_code"] == 200
+    for name in ("upload", "prompt", "decode", "render", "provider_call"):
+        assert spans[name]["parent_span_id"] == root["span_id"]
+    # laps inside a span nest under it
+    assert spans["llm"]["parent_span_id"] == spans["provider_call"]["span_id"]
+    assert spans["provider_call"]["attributes"] == {"attempt": 1}
+
+
+def test_head_sampling_follows_a_sampled_parent(traced):
+    exporter = traced(trace_sample_rate=0.0)
+    client = TestClient(main.app)
+
+    assert "traceparent" not in convert(client).headers
+    parent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+    response = convert(client, traceparent=parent)
+    shutdown_tracing()
+
+    assert response.headers["traceparent"].startswith("00-0af7651916cd43dd8448eb211c80319c-")
+    root = next(item for item in exporter.spans if item["name"] == "POST /convert")
+    assert root["parent_span_id"] == "b7ad6b7169203331"
+
+
+def test_untraced_routes_and_disabled_tracing_start_nothing():
+    settings = Settings(tracing=True, trace_sample_rate=1.0)
+    assert start_trace("GET /", "/", settings=settings) is None
+    assert start_trace("POST /convert", "/convert", settings=Settings(trace_sample_rate=1.0)) is None
+    assert start_trace("POST /convert", "/convert", settings=settings) is not None
+
+
+def test_file_exporter_rotates(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonlFileExporter(str(path), max_bytes=300, backups=2)
+    for number in range(10):
+        exporter.export([{"name": f"span-{number}", "padding": "x" * 50}])
+    exporter.close()
+
+    assert json.loads(path.read_text().splitlines()[-1])["name"] == "span-9"
+    assert (tmp_path / "traces.jsonl.1").exists()
+    assert not (tmp_path / "traces.jsonl.3").exists()
+
+
+def test_otlp_payload_shape():
+    item = {
+        "trace_id": "0af7651916cd43dd8448eb211c80319c", "span_id": "b7ad6b7169203331", "parent_span_id": None,
+        "name": "POST /convert", "start_time_unix_nano": 1, "end_time_unix_nano": 2,
+        "attributes": {"http.status_code": 200, "llm.cost_usd": 0.5}, "error": None,
+    }
+    exporter = OtlpHttpExporter("http://localhost:4318/v1/traces")
+    payload = exporter.payload([item])
+    exporter.close()
+
+    otlp_span = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp_span["traceId"] == item["trace_id"]
+    assert otlp_span["startTimeUnixNano"] == "1"
+    assert {"key": "http.status_code", "value": {"intValue": "200"}} in otlp_span["attributes"]
+    assert {"key": "llm.cost_usd", "value": {"doubleValue": 0.5}} in otlp_span["attributes"]
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from event_generation.event.event import Event
+from event_generation.monitoring.usage import (
+    TokenUsage, estimate_cost, gemini_usage, openai_usage, parse_prices, record_usage,
+)
+
+
+def test_reads_gemini_usage_metadata_with_image_tokens():
+    response = SimpleNamespace(usage_metadata=SimpleNamespace(
+        prompt_token_count=1800,
+        candidates_token_count=120,
+        prompt_tokens_details=[
+            SimpleNamespace(modality="MediaModality.TEXT", token_count=1542),
+            SimpleNamespace(modality="MediaModality.IMAGE", token_count=258),
+        ],
+    ))
+
+    usage = gemini_usage(response, "gemini-2.0-flash-lite")
+
+    assert (usage.input_tokens, usage.output_tokens, usage.image_tokens) == (1800, 120, 258)
+    # older SDKs and recorded responses without metadata count as zero
+    assert gemini_usage(SimpleNamespace(), "gemini-2.0-flash-lite").input_tokens == 0
+
+
+def test_reads_openai_usage_and_reported_model():
+    response = SimpleNamespace(model="gpt-4o-mini-2024-07-18", usage=SimpleNamespace(prompt_tokens=900, completion_tokens=80))
+
+    usage = openai_usage(response, "gpt-4o-mini")
+
+    assert (usage.model, usage.input_tokens, usage.output_tokens) == ("gpt-4o-mini-2024-07-18", 900, 80)
+
+
+def test_cost_uses_overrides_and_versioned_model_prefixes():
+    prices = parse_prices("gpt-4o-mini=1/2,broken=x")
+
+    assert estimate_cost(TokenUsage("openai", "gpt-4o-mini-2024-07-18", 1_000_000, 500_000), prices) == pytest.approx(2.0)
+    assert estimate_cost(TokenUsage("gemini", "gemini-2.0-flash-lite", 1_000_000, 0), prices) == pytest.approx(0.075)
+    assert estimate_cost(TokenUsage("other", "mystery-model", 10, 10), prices) is None
+    assert "broken" not in prices
+
+
+class MeteredParser:
+    provider = "gemini"
+
+    def parse(self, text, local_time, local_tz, image_path=None):
+        response = SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=2000, candidates_token_count=100))
+        record_usage(gemini_usage(response, "gemini-2.0-flash-lite"), "text")
+        start = datetime(2025, 3, 3, 10)
+        return [Event(title=text, time_zone=local_tz, start_time=start, end_time=start + timedelta(hours=1))]
+
+
+def test_convert_reports_usage_in_header_and_metrics(monkeypatch):
+    monkeypatch.setattr(main, "get_parser", lambda: MeteredParser())
+    client = TestClient(main.app)
+
+    response = client.post("/convert", data={"text": "Dentist", "local_tz": "UTC", "local_time": "2025-03-01T10:00:00Z"})
+
+    assert response.headers["x-provider-usage"] == "input=2000, output=100, image=0, cost_usd=0.000180"
+    metrics = client.get("/metrics").text
+    labels = 'provider="gemini",model="gemini-2.0-flash-lite",route="/convert",input_type="text"'
+    assert f'calendarize_provider_tokens_total{{{labels},kind="input"}}' in metrics
+    assert f'calendarize_provider_cost_usd_total{{{labels}}}' in metrics
+    assert "x-provider-usage" not in client.get("/").headers
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from event_generation.config.settings import Settings
+from event_generation.warmup import WarmupState, run_warmup
+
+
+def wait_until_ready(client, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.status_code == 200:
+            return response.json()
+        time.sleep(0.02)
+    raise AssertionError("warm-up did not finish")
+
+
+def test_failed_and_slow_steps_are_recorded_but_do_not_block_readiness():
+    async def slow():
+        await asyncio.sleep(1)
+
+    def broken():
+        raise RuntimeError("provider down")
+
+    state = asyncio.run(run_warmup(WarmupState(), [("ok", lambda: 1), ("broken", broken), ("slow", slow)], 0.05))
+
+    assert state.ready
+    assert state.steps["ok"]["ok"]
+    assert "provider down" in state.steps["broken"]["error"]
+    assert not state.steps["slow"]["ok"] and "TimeoutError" in state.steps["slow"]["error"]
+
+
+def test_ready_only_after_warmup(monkeypatch):
+    release = asyncio.Event()
+    monkeypatch.setattr(main, "warmup_steps", lambda settings: [("gate", release.wait)])
+
+    assert TestClient(main.app).get("/ready").status_code == 503
+    with TestClient(main.app) as client:
+        assert client.get("/ready").status_code == 503
+        client.portal.call(release.set)
+        report = wait_until_ready(client)
+    assert report["steps"]["gate"]["ok"]
+
+
+def test_lifespan_runs_local_warmup_steps(monkeypatch):
+    monkeypatch.setattr(main, "get_settings", lambda: Settings(warmup_connections=False, warmup_time_zones="UTC,Asia/Tokyo"))
+    with TestClient(main.app) as client:
+        report = wait_until_ready(client)
+    steps = report["steps"]
+    assert steps["time_zones"]["ok"] and steps["render"]["ok"] and steps["calendar_discovery"]["ok"]
+    assert "provider_connection" not in steps and "google_connection" not in steps
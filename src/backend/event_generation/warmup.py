@@ -0,0 +1,114 @@
+"""
+Startup warm-up
+The first requests after a deploy used to pay for TLS handshakes with the provider and
+Google, first-use ZoneInfo loads, pydantic validator builds and the icalendar code paths.
+run_warmup() runs a list of steps once in the app lifespan and WarmupState records the
+outcome; /ready reports success only afterwards, so the load balancer skips cold workers.
+
+A failing step is logged and recorded but does not keep the worker unready forever:
+a provider outage at deploy time must not take the whole service out of rotation.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from event_generation.event.event import Event
+from event_generation.event.ics_writer import iter_calendar, vtimezone_text
+
+logger = logging.getLogger(__name__)
+
+Step = Tuple[str, Callable[[], Any]]
+
+
+class WarmupState:
+    """Progress of the warm-up, exposed by the readiness endpoint"""
+
+    def __init__(self):
+        self.ready = False
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+
+    def report(self) -> Dict[str, Any]:
+        duration = None
+        if self.started is not None:
+            duration = round(((self.finished or time.monotonic()) - self.started) * 1000, 1)
+        return {"ready": self.ready, "duration_ms": duration, "steps": self.steps}
+
+
+def parse_time_zones(names: str) -> Tuple[str, ...]:
+    return tuple(name.strip() for name in names.split(",") if name.strip())
+
+
+def preload_time_zones(names: Iterable[str]) -> int:
+    """Load each zone and build its VTIMEZONE block, both are cached for later requests"""
+    count = 0
+    for name in names:
+        ZoneInfo(name)
+        vtimezone_text(name)
+        count += 1
+    return count
+
+
+def render_sample_event(time_zone: str = "America/Los_Angeles") -> int:
+    """Run one event through validation and every renderer /convert and /export.ics use"""
+    start = datetime.now().replace(second=0, microsecond=0) + timedelta(days=1)
+    event = Event.model_validate({
+        "title": "Warm-up",
+        "time_zone": time_zone,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "description": "Startup warm-up",
+        "location": "Online",
+        "is_recurring": True,
+        "recurrence_pattern": "WEEKLY",
+        "recurrence_days": ["MO", "WE"],
+        "recurrence_count": 4,
+    })
+    event.set_gcal_link()
+    event.set_outlook_link()
+    event.set_ical_string()
+    calendar = "".join(iter_calendar([event]))
+    return len(event.model_dump_json()) + len(calendar)
+
+
+async def _run_step(function: Callable[[], Any], timeout: float) -> Any:
+    if inspect.iscoroutinefunction(function):
+        return await asyncio.wait_for(function(), timeout)
+    # blocking steps run in a thread so the worker keeps answering liveness checks
+    return await asyncio.wait_for(asyncio.to_thread(function), timeout)
+
+
+async def run_warmup(state: WarmupState, steps: Sequence[Step], timeout: float) -> WarmupState:
+    """
+    Run the warm-up steps one after another and mark the state ready
+
+    Args:
+        state: Where progress and per-step timings are recorded
+        steps: (name, function) pairs; functions may be sync or async
+        timeout: Seconds each step may take
+
+    Returns:
+        The state, with ready set
+    """
+    state.started = time.monotonic()
+    for name, function in steps:
+        started = time.perf_counter()
+        try:
+            await _run_step(function, timeout)
+            state.steps[name] = {"ok": True}
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e!r}")
+            state.steps[name] = {"ok": False, "error": repr(e)}
+        state.steps[name]["ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    state.finished = time.monotonic()
+    state.ready = True
+    logger.info(f"Warm-up finished in {state.report()['duration_ms']} ms")
+    return state
@@ -1,24 +1,121 @@
-from fastapi import FastAPI, File, UploadFile, Form
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+import asyncio
+import logging
+import secrets
 import shutil
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, Field, ValidationError
 from typing import Optional
-# from backend.event_generation.nlp_parsers.openai_parser import OpenAiParser
-from event_generation.nlp_parsers.gemini_parser import GeminiParser
+# the provider SDK is imported on first use, see nlp_parsers/__init__.py
+from event_generation.nlp_parsers import get_parser
+from event_generation.config.settings import Settings, get_settings
+from event_generation.event import date_parser, recurrence
+from event_generation.event.ics_writer import vtimezone_text
+from event_generation.monitoring import REGISTRY, cache_collector, lap
+from event_generation.monitoring.logs import configure_logging, log_payload
+from event_generation.monitoring.middleware import MetricsMiddleware
+from event_generation.monitoring.profiling import ProfilerBusy, RequestProfile, find_profile
+from event_generation.warmup import WarmupState, parse_time_zones, preload_time_zones, render_sample_event, run_warmup
+from event_generation.event.event import Event
+from event_generation.event.recurrence import get_occurrences
+from event_generation.event.ics_reader import iter_events
+from event_generation.event.ics_writer import is_known_time_zone, iter_calendar
+from API_interaction.gc_event_adder import calendar_lifespan, router as calendar_router
+from API_interaction.async_calendar_client import get_async_client
+from API_interaction.calendar_service import get_discovery_document, service_cache
+import API_interaction.gc_event_adder as gc_event_adder
 
+logger = logging.getLogger("calendarize")
 
-app = FastAPI()
+
+def warmup_steps(settings: Settings) -> list:
+    # everything the first /convert and calendar requests would otherwise pay for
+    steps = [
+        ("time_zones", lambda: preload_time_zones(parse_time_zones(settings.warmup_time_zones))),
+        ("render", render_sample_event),
+        ("calendar_discovery", lambda: get_discovery_document(get_settings().google_api_root_url)),
+        ("provider_sdk", lambda: get_parser(settings)),
+    ]
+    if settings.warmup_connections:
+        steps += [
+            ("provider_connection", lambda: get_parser(settings).warm_up()),
+            ("google_connection", get_async_client().warm_up),
+        ]
+    return steps
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    # the calendar endpoints' token refresher and connection pools live as long as the app
+    async with calendar_lifespan(app):
+        # warm up in the background, /ready answers 503 until it's done
+        settings = get_settings()
+        app.state.warmup = WarmupState()
+        warmup = asyncio.create_task(run_warmup(app.state.warmup, warmup_steps(settings), settings.warmup_timeout))
+        try:
+            yield
+        finally:
+            warmup.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+app.state.warmup = WarmupState()
 UPLOAD_FOLDER = Path("uploads")
 UPLOAD_FOLDER.mkdir(exist_ok=True)
+SPOOL_SIZE = 1024 * 1024  # request bodies larger than this are spooled to disk
 
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["https://calendarize.tech", "https://calendarize.ratcliff.cc", "http://localhost:3000"],
+    allow_origins=list(dict.fromkeys(
+        ["https://calendarize.tech", "https://calendarize.ratcliff.cc", "http://localhost:3000", get_settings().frontend_url]
+    )),
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods (GET, POST, etc.)
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["Server-Timing", "X-Provider-Usage", "X-Profile-Id"],
 )
+# outermost, so the Server-Timing header and request metrics cover everything below
+app.add_middleware(MetricsMiddleware)
+
+
+def cache_stats() -> dict:
+    # cache name -> (hits, misses), read on every /metrics scrape
+    expansions = recurrence.cache_info()
+    zones = vtimezone_text.cache_info()
+    tiers = date_parser.get_parse_stats()
+    busy = gc_event_adder.busy_cache.stats()
+    services = service_cache.stats()
+    return {
+        "recurrence_rules": (expansions["rules"]["hits"], expansions["rules"]["misses"]),
+        "recurrence_windows": (expansions["windows"]["hits"], expansions["windows"]["misses"]),
+        "vtimezone": (zones.hits, zones.misses),
+        # "hits" are values the fast fixed-format tier handled without falling back
+        "date_parser_fixed_format": (tiers["fixed"], tiers["iso"] + tiers["dateutil"]),
+        "busy_intervals": (busy["hits"], busy["misses"]),
+        "calendar_services": (services["hits"], services["misses"]),
+    }
+
+
+REGISTRY.register_collector(cache_collector("calendarize_cache", cache_stats))
+
+
+# Google Calendar endpoints (login, add-event, conflicts, ...), served by this process
+app.include_router(calendar_router, prefix="/calendar")
+
+
+class PreviewRequest(BaseModel):
+    event: Event
+    window_start: Optional[datetime] = None
+    window_end: Optional[datetime] = None
+    limit: int = Field(default=100, ge=1, le=1000)
 
 
 @app.get("/")
@@ -32,24 +129,40 @@ async def root():
     }
 
 
-@app.post("/convert")
-async def convert(
-                file: Optional[UploadFile] = File(None),
-                text: Optional[str] = Form(None),
-                local_tz: str = Form(...),
-                local_time: str = Form(...),
-                ):
+@app.get("/ready")
+async def ready(request: Request):
+    # readiness for the load balancer: only true once the startup warm-up has finished
+    state = request.app.state.warmup
+    return JSONResponse(state.report(), status_code=200 if state.ready else 503)
+
 
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+def require_admin(request: Request):
+    # operator-only switches; disabled entirely unless ADMIN_TOKEN is set
+    token = get_settings().admin_token
+    supplied = request.headers.get("x-admin-token", "")
+    if not token or not secrets.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def run_convert(file: Optional[UploadFile], text: Optional[str], local_tz: str, local_time: str):
     file_path = None
     if file is not None:
-        file_path = UPLOAD_FOLDER / file.filename
+        # requests now run concurrently, so each upload gets its own name (keeping the extension)
+        file_path = UPLOAD_FOLDER / f"{secrets.token_hex(8)}{Path(file.filename or '').suffix}"
         with file_path.open("wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
+    lap("upload")
 
     if text is None:
         text = ""
 
-    parser = GeminiParser()
+    parser = get_parser()
     # Pass file_path (or None) to the parser
     event_list = parser.parse(text, local_time, local_tz, file_path)
 
@@ -58,11 +171,158 @@ async def convert(
         try:
             file_path.unlink()
         except Exception as e:
-            print("ERROR: could not remove file:", e)
+            # the error would quote the user's file name
+            logger.error(f"Could not remove uploaded file: {type(e).__name__}")
+
+    # the parsers report provider failures and unusable model output as a message
+    if isinstance(event_list, str):
+        raise HTTPException(status_code=502, detail=event_list)
 
     for event in event_list:
         event.set_gcal_link()
         event.set_outlook_link()
         event.set_ical_string()
-        print(event)
+        log_payload(logger, "Rendered event", event=event)
+    lap("render")
     return event_list
+
+
+@app.post("/convert")
+def convert(
+                request: Request,
+                response: Response,
+                file: Optional[UploadFile] = File(None),
+                text: Optional[str] = Form(None),
+                local_tz: str = Form(...),
+                local_time: str = Form(...),
+                profile: bool = Query(False),
+                profile_format: str = Query("pstats"),
+                ):
+    # The provider call blocks for its whole round-trip, so this is a plain def: FastAPI
+    # runs it in the threadpool and concurrent requests don't wait for each other.
+    if not profile:
+        return run_convert(file, text, local_tz, local_time)
+
+    # profile=1: profile this exact request, see event_generation/monitoring/profiling.py
+    require_admin(request)
+    try:
+        profiler = RequestProfile(profile_format)
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+    try:
+        with profiler:
+            event_list = run_convert(file, text, local_tz, local_time)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    profiler.save()
+    response.headers["X-Profile-Id"] = profiler.profile_id
+    return event_list
+
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request):
+    # download a profile saved by /convert?profile=1
+    require_admin(request)
+    path = find_profile(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=path.name, media_type="application/octet-stream")
+
+
+@app.post("/preview")
+async def preview(request: PreviewRequest):
+    # list the concrete dates a (possibly recurring) event produces inside the window
+    try:
+        occurrences, truncated = get_occurrences(
+            request.event, request.window_start, request.window_end, request.limit
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=422, detail=str(ve))
+
+    return {
+        "occurrences": [{"start_time": start, "end_time": end} for start, end in occurrences],
+        "truncated": truncated,
+    }
+
+
+@app.post("/import")
+def import_ics(
+                file: UploadFile = File(...),
+                local_tz: str = Form("UTC"),
+                limit: int = Form(1000, ge=1, le=1000),
+                ):
+    # Stream the VEVENTs out of an existing .ics export without loading the whole calendar.
+    # Every event is counted, only the first `limit` are returned.
+    # Parsing is blocking, so this is a plain def and runs in the threadpool, off the event loop.
+    events = []
+    count = 0
+    started = time.perf_counter()
+    try:
+        for event in iter_events(file.file, default_tz=local_tz):
+            count += 1
+            if len(events) < limit:
+                events.append(event)
+    except ValueError as ve:
+        # a line or VEVENT over the reader's size limits
+        raise HTTPException(status_code=422, detail=str(ve))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "count": count,
+        "events_per_second": round(count / elapsed, 1) if elapsed > 0 else None,
+        "events": events,
+    }
+
+
+def iter_ndjson_events(body):
+    # one Event JSON object per line
+    with body:
+        for line in body:
+            if line.strip():
+                try:
+                    event = Event.model_validate_json(line)
+                except ValidationError as ve:
+                    logger.warning("Skipping invalid event in export", extra={"errors": ve.error_count()})
+                    continue
+                # the response has already started, an unknown zone can't fail the request any more
+                if not is_known_time_zone(event.time_zone):
+                    logger.warning("Skipping event with an unknown time zone in export", extra={"time_zone": event.time_zone})
+                    continue
+                yield event
+
+
+@app.post("/export.ics")
+async def export_ics(request: Request):
+    # Send every event as one .ics file, generated incrementally.
+    # Large exports should use an application/x-ndjson body so the events are never all in memory;
+    # a plain JSON list of events is accepted as well.
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        # The body has to be read before the response starts (Starlette listens for the
+        # disconnect on the same channel while streaming), so spool it to disk first.
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        events = iter_ndjson_events(body)
+    else:
+        try:
+            items = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid JSON body")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=422, detail="Expected a list of events")
+        try:
+            events = [Event.model_validate(item) for item in items]
+        except ValidationError as ve:
+            raise HTTPException(status_code=422, detail=str(ve))
+        # checked before the 200 goes out, a failing zone mid-stream would truncate the file
+        unknown = sorted({event.time_zone for event in events if not is_known_time_zone(event.time_zone)})
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown time zone: {', '.join(unknown)}")
+
+    # no Content-Length, so the response goes out with chunked transfer encoding
+    return StreamingResponse(
+        iter_calendar(events),
+        media_type="text/calendar",
+        headers={"Content-Disposition": 'attachment; filename="calendarize.ics"'},
+    )